@@ -1,13 +1,512 @@
+import asyncio
+import fnmatch
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
 import redis
+from loguru import logger
 
 from .config import settings
+from .metrics import CACHE_GET, CACHE_REFRESHES, CACHE_SET, timed
+
+MEMORY_URL_SCHEME = "memory://"
+# Data versions back HTTP validators (ETag, Last-Modified)
+VERSION_PREFIX = "version:"
+# Held by the caller refreshing a stale entry
+REFRESH_LOCK_PREFIX = "refresh_lock:"
+# Next to a value set with set_cache_if_newer, holds the order it was set with
+ORDER_SUFFIX = ":order"
+
+# Sets KEYS[1] to ARGV[2] unless the order in KEYS[2] is above ARGV[1]. The
+# order advances either way; with ARGV[4] = "0" a missing value stays missing.
+SET_IF_NEWER_SCRIPT = """
+local current = redis.call('GET', KEYS[2])
+if current and current > ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[1], 'EX', ARGV[3])
+if ARGV[4] == '1' or redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# Takes or renews the lease KEYS[2] on item ARGV[1] for ARGV[2] seconds, if
+# the item is still in the processing list KEYS[1]
+LEASE_SCRIPT = """
+if not redis.call('LPOS', KEYS[1], ARGV[1]) then
+    return 0
+end
+redis.call('SET', KEYS[2], '1', 'EX', ARGV[2])
+return 1
+"""
+
+# Takes item ARGV[1] off the processing list KEYS[1] unless its lease KEYS[2]
+# is held, and with ARGV[2] = "1" puts it back on the queue KEYS[3]
+RECLAIM_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return 0
+end
+if redis.call('LREM', KEYS[1], 0, ARGV[1]) == 0 then
+    return 0
+end
+if ARGV[2] == '1' then
+    redis.call('RPUSH', KEYS[3], ARGV[1])
+end
+return 1
+"""
+
+
+class _Pipeline:
+    def __init__(self, client: "InMemoryRedis"):
+        self._client = client
+        self._calls: list = []
+
+    def __getattr__(self, name: str):
+        method = getattr(self._client, name)
+
+        def queue(*args, **kwargs) -> "_Pipeline":
+            self._calls.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self) -> list:
+        calls, self._calls = self._calls, []
+        return [method(*args, **kwargs) for method, args, kwargs in calls]
+
+
+class InMemoryRedis:
+    """Process-local stand-in for the subset of redis.Redis the app uses.
+
+    Selected with a ``memory://`` Redis URL for local runs and load tests
+    without a Redis server. Nothing is shared between processes.
+    """
+
+    def __init__(self):
+        self._values: dict[str, bytes] = {}
+        self._expiry: dict[str, float] = {}
+        self._lists: dict[str, list[bytes]] = {}
+        self._sets: dict[str, set[bytes]] = {}
+        self._sorted_sets: dict[str, dict[bytes, float]] = {}
+        self._lock = threading.Condition()
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    def _expire(self, key: str) -> None:
+        if key in self._expiry and self._expiry[key] <= time.monotonic():
+            self._values.pop(key, None)
+            self._expiry.pop(key, None)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            self._expire(key)
+            return self._values.get(key)
+
+    def set(self, key: str, value, ex: int | None = None, nx: bool = False):
+        with self._lock:
+            self._expire(key)
+            if nx and key in self._values:
+                return None
+            self._values[key] = self._encode(value)
+            if ex is None:
+                self._expiry.pop(key, None)
+            else:
+                self._expiry[key] = time.monotonic() + ex
+            return True
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self.get(key) for key in keys]
+
+    def setex(self, key: str, expiration: int, value) -> bool:
+        return bool(self.set(key, value, ex=expiration))
+
+    def delete(self, *keys: str) -> int:
+        removed = 0
+        with self._lock:
+            for key in keys:
+                removed += self._values.pop(key, None) is not None
+                removed += self._lists.pop(key, None) is not None
+                removed += self._sets.pop(key, None) is not None
+                removed += self._sorted_sets.pop(key, None) is not None
+                self._expiry.pop(key, None)
+        return removed
+
+    def scan_iter(self, match: str = "*"):
+        with self._lock:
+            keys = [key for key in self._values if fnmatch.fnmatchcase(key, match)]
+        return iter(keys)
+
+    def exists(self, *keys: str) -> int:
+        with self._lock:
+            for key in keys:
+                self._expire(key)
+            return sum(
+                key in self._values or key in self._sets or key in self._sorted_sets
+                for key in keys
+            )
+
+    def sadd(self, key: str, *members) -> int:
+        with self._lock:
+            items = self._sets.setdefault(key, set())
+            added = {self._encode(member) for member in members} - items
+            items.update(added)
+            return len(added)
+
+    def smembers(self, key: str) -> "set[bytes]":
+        with self._lock:
+            return set(self._sets.get(key, ()))
+
+    def zadd(self, key: str, mapping: dict) -> int:
+        with self._lock:
+            items = self._sorted_sets.setdefault(key, {})
+            encoded = {self._encode(m): float(s) for m, s in mapping.items()}
+            added = len(encoded.keys() - items.keys())
+            items.update(encoded)
+            return added
+
+    def zrem(self, key: str, *members) -> int:
+        with self._lock:
+            items = self._sorted_sets.get(key, {})
+            return sum(
+                items.pop(self._encode(member), None) is not None for member in members
+            )
+
+    def zscore(self, key: str, member) -> float | None:
+        with self._lock:
+            return self._sorted_sets.get(key, {}).get(self._encode(member))
+
+    def zcard(self, key: str) -> int:
+        with self._lock:
+            return len(self._sorted_sets.get(key, {}))
+
+    def zrange(
+        self,
+        key: str,
+        start: int,
+        end: int,
+        desc: bool = False,
+        withscores: bool = False,
+    ) -> list:
+        with self._lock:
+            items = sorted(
+                self._sorted_sets.get(key, {}).items(),
+                key=lambda item: (item[1], item[0]),
+                reverse=desc,
+            )
+        # Redis ranges are inclusive, with -1 for the last element
+        items = items[start : None if end == -1 else end + 1]
+        return items if withscores else [member for member, _ in items]
+
+    def zrevrange(self, key: str, start: int, end: int, withscores: bool = False):
+        return self.zrange(key, start, end, desc=True, withscores=withscores)
+
+    def pipeline(self, transaction: bool = True) -> _Pipeline:
+        return _Pipeline(self)
+
+    def register_script(self, script: str) -> Callable:
+        # Only the scripts this module defines, run atomically under the lock
+        emulated = _EMULATED_SCRIPTS[script]
+
+        def run(keys: list[str], args: list) -> int:
+            with self._lock:
+                return emulated(self, keys, [str(arg) for arg in args])
+
+        return run
+
+    def rpush(self, queue: str, value) -> int:
+        with self._lock:
+            items = self._lists.setdefault(queue, [])
+            items.append(self._encode(value))
+            self._lock.notify_all()
+            return len(items)
+
+    def lrange(self, queue: str, start: int, end: int) -> list[bytes]:
+        with self._lock:
+            items = self._lists.get(queue, [])
+            return items[start : None if end == -1 else end + 1]
+
+    def lpos(self, queue: str, value) -> int | None:
+        with self._lock:
+            items = self._lists.get(queue, [])
+            encoded = self._encode(value)
+            return items.index(encoded) if encoded in items else None
+
+    def lrem(self, queue: str, count: int, value) -> int:
+        # Only count 0, which removes every occurrence, is used
+        with self._lock:
+            items = self._lists.get(queue, [])
+            encoded = self._encode(value)
+            kept = [item for item in items if item != encoded]
+            removed = len(items) - len(kept)
+            if removed:
+                self._lists[queue] = kept
+            return removed
+
+    def _wait_for(self, take: Callable[[], Any], timeout: float) -> Any:
+        deadline = time.monotonic() + timeout if timeout else None
+        with self._lock:
+            while True:
+                item = take()
+                if item is not None:
+                    return item
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._lock.wait(remaining)
+
+    def blpop(self, queues: list[str], timeout: float = 0):
+        def take():
+            for queue in queues:
+                if self._lists.get(queue):
+                    return queue.encode(), self._lists[queue].pop(0)
+            return None
+
+        return self._wait_for(take, timeout)
+
+    def blmove(
+        self,
+        first_list: str,
+        second_list: str,
+        timeout: float,
+        src: str = "LEFT",
+        dest: str = "RIGHT",
+    ) -> bytes | None:
+        def take():
+            if not self._lists.get(first_list):
+                return None
+            item = self._lists[first_list].pop(0 if src == "LEFT" else -1)
+            target = self._lists.setdefault(second_list, [])
+            target.insert(0 if dest == "LEFT" else len(target), item)
+            return item
+
+        return self._wait_for(take, timeout)
+
+
+def _set_if_newer(client: InMemoryRedis, keys: list[str], args: list[str]) -> int:
+    value_key, order_key = keys
+    order, value, expiration, fill = args
+    current = client.get(order_key)
+    if current is not None and current > order.encode():
+        return 0
+    client.set(order_key, order, ex=int(expiration))
+    if fill == "1" or client.get(value_key) is not None:
+        client.set(value_key, value, ex=int(expiration))
+        return 1
+    return 0
+
+
+def _lease(client: InMemoryRedis, keys: list[str], args: list[str]) -> int:
+    processing, lease_key = keys
+    item, ttl = args
+    if client.lpos(processing, item) is None:
+        return 0
+    client.set(lease_key, "1", ex=int(ttl))
+    return 1
 
-redis_client = redis.Redis.from_url(settings.redis_url)
+
+def _reclaim(client: InMemoryRedis, keys: list[str], args: list[str]) -> int:
+    processing, lease_key, queue = keys
+    item, requeue = args
+    if client.get(lease_key) is not None:
+        return 0
+    if client.lrem(processing, 0, item) == 0:
+        return 0
+    if requeue == "1":
+        client.rpush(queue, item)
+    return 1
+
+
+_EMULATED_SCRIPTS = {
+    SET_IF_NEWER_SCRIPT: _set_if_newer,
+    LEASE_SCRIPT: _lease,
+    RECLAIM_SCRIPT: _reclaim,
+}
+
+
+def create_redis_client(url: str):
+    if url.startswith(MEMORY_URL_SCHEME):
+        return InMemoryRedis()
+    return redis.Redis.from_url(url)
+
+
+redis_client = create_redis_client(settings.redis_url)
 
 
 def get_cache(key: str):
-    return redis_client.get(key)
+    with timed(CACHE_GET):
+        return redis_client.get(key)
 
 
 def set_cache(key: str, value: str, expiration: int = 3600):
-    redis_client.setex(key, expiration, value)
+    with timed(CACHE_SET):
+        redis_client.setex(key, expiration, value)
+
+
+def set_cache_if_newer(
+    key: str, value: str, order: str, expiration: int = 3600, fill: bool = True
+) -> bool:
+    """Atomically set ``key`` unless it was set with a later ``order``.
+
+    Orders compare as strings. Without ``fill`` a missing key is not set, but
+    its order still advances, so older values cannot be filled in afterwards.
+    """
+    script = redis_client.register_script(SET_IF_NEWER_SCRIPT)
+    with timed(CACHE_SET):
+        return bool(
+            script(
+                keys=[key, f"{key}{ORDER_SUFFIX}"],
+                args=[order, value, expiration, int(fill)],
+            )
+        )
+
+
+# Entries with a soft TTL are stored as "<fresh until>|<value>"
+def get_cache_entry(key: str) -> tuple[bytes | None, bool]:
+    """The cached value, and whether it is past its soft TTL."""
+    cached = get_cache(key)
+    if cached is None:
+        return None, False
+    header, _, value = cached.partition(b"|")
+    try:
+        fresh_until = float(header)
+    except ValueError:
+        # Written without a soft TTL, e.g. before entries had one
+        return None, False
+    return value, time.time() >= fresh_until
+
+
+def set_cache_entry(
+    key: str,
+    value: str,
+    soft_ttl: int = settings.cache_soft_ttl,
+    hard_ttl: int = settings.cache_hard_ttl,
+):
+    """Cache ``value``: fresh for ``soft_ttl``, served stale until ``hard_ttl``."""
+    set_cache(key, f"{time.time() + soft_ttl!r}|{value}", hard_ttl)
+
+
+# Keeps background refreshes referenced until they finish
+_refresh_tasks: set[asyncio.Task] = set()
+
+
+async def _run_refresh(
+    cache: str, key: str, refresh: Callable[[], Awaitable[None]]
+) -> None:
+    try:
+        await refresh()
+        CACHE_REFRESHES.labels(cache=cache, outcome="succeeded").inc()
+    except Exception as e:
+        CACHE_REFRESHES.labels(cache=cache, outcome="failed").inc()
+        logger.error(f"Background refresh of {key} failed: {str(e)}")
+
+
+def schedule_refresh(
+    cache: str, key: str, refresh: Callable[[], Awaitable[None]]
+) -> bool:
+    """Refresh a stale entry in the background, unless a caller already is.
+
+    The lock is left to expire rather than released: a refreshed entry is
+    fresh again, and a failed refresh is retried once the lock expires.
+    """
+    acquired = redis_client.set(
+        f"{REFRESH_LOCK_PREFIX}{key}",
+        "1",
+        nx=True,
+        ex=settings.cache_refresh_lock_ttl,
+    )
+    if not acquired:
+        return False
+    logger.info(f"🔄 Refreshing stale cache entry {key}")
+    CACHE_REFRESHES.labels(cache=cache, outcome="started").inc()
+    task = asyncio.get_running_loop().create_task(_run_refresh(cache, key, refresh))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+    return True
+
+
+def get_version(scope: str) -> int:
+    """Nanosecond timestamp of the last change to ``scope``.
+
+    A scope without a version starts at the time of its first read, so a lost
+    version key never brings back a version that clients have already seen.
+    """
+    key = f"{VERSION_PREFIX}{scope}"
+    redis_client.set(key, time.time_ns(), nx=True)
+    return int(redis_client.get(key))
+
+
+def get_versions(scopes: list[str]) -> list[int]:
+    """Versions of ``scopes`` in one round trip, 0 for scopes never changed.
+
+    Unlike get_version this never writes, so it is cheap on hot read paths.
+    """
+    values = get_many_cache([f"{VERSION_PREFIX}{scope}" for scope in scopes])
+    return [int(value) if value is not None else 0 for value in values]
+
+
+def bump_version(scope: str) -> None:
+    redis_client.set(f"{VERSION_PREFIX}{scope}", time.time_ns())
+
+
+def get_many_cache(keys: list[str]) -> list:
+    if not keys:
+        return []
+    with timed(CACHE_GET):
+        return redis_client.mget(keys)
+
+
+def delete_cache(*keys: str):
+    if keys:
+        redis_client.delete(*keys)
+
+
+def delete_cache_prefix(prefix: str):
+    keys = list(redis_client.scan_iter(match=f"{prefix}*"))
+    if keys:
+        redis_client.delete(*keys)
+
+
+def push_queue(queue: str, value: str):
+    redis_client.rpush(queue, value)
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+# A reliable queue: items move to a processing list while they are worked on,
+# under a lease the worker renews, so items of a worker that dies are found
+# and put back rather than lost
+def move_queue(queue: str, processing: str, timeout: int = 5) -> str | None:
+    item = redis_client.blmove(queue, processing, timeout)
+    return None if item is None else _decode(item)
+
+
+def queue_items(queue: str) -> list[str]:
+    return [_decode(item) for item in redis_client.lrange(queue, 0, -1)]
+
+
+def lease_queue_item(processing: str, lease_key: str, item: str, ttl: int) -> bool:
+    """Take or renew the lease on ``item``; False once it left ``processing``."""
+    script = redis_client.register_script(LEASE_SCRIPT)
+    return bool(script(keys=[processing, lease_key], args=[item, ttl]))
+
+
+def reclaim_queue_item(
+    queue: str, processing: str, lease_key: str, item: str, requeue: bool = True
+) -> bool:
+    """Take ``item`` off ``processing`` if its lease expired, and put it back
+    on ``queue`` when ``requeue``. False if the item is still leased."""
+    script = redis_client.register_script(RECLAIM_SCRIPT)
+    return bool(script(keys=[processing, lease_key, queue], args=[item, int(requeue)]))
+
+
+def release_queue_item(processing: str, lease_key: str, item: str) -> None:
+    redis_client.lrem(processing, 0, item)
+    redis_client.delete(lease_key)
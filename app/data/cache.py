@@ -0,0 +1,26 @@
+from app.cache import get_many_cache, set_cache
+from app.config import settings
+
+UNAVAILABLE_PREFIX = "unavailable:"
+
+
+def _unavailable_key(symbol: str, interval: str) -> str:
+    return f"{UNAVAILABLE_PREFIX}{interval}:{symbol}"
+
+
+def mark_unavailable(symbol: str, interval: str, reason: str) -> None:
+    set_cache(
+        _unavailable_key(symbol, interval), reason, settings.unavailable_symbol_ttl
+    )
+
+
+def get_unavailable(symbols: list[str], interval: str) -> dict[str, str]:
+    """Reasons for the symbols recently found to have no data, in one round trip."""
+    reasons = get_many_cache([_unavailable_key(s, interval) for s in symbols])
+    unavailable = {}
+    for symbol, reason in zip(symbols, reasons, strict=True):
+        if reason is not None:
+            unavailable[symbol] = (
+                reason.decode() if isinstance(reason, bytes) else reason
+            )
+    return unavailable
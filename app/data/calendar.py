@@ -0,0 +1,110 @@
+import functools
+from datetime import date, timedelta
+
+import numpy as np
+
+# Holiday rules are generated for this range; bars outside it are not expected
+FIRST_YEAR, LAST_YEAR = 1980, 2100
+
+# Unscheduled full-day closures
+NYSE_SPECIAL_CLOSURES = (
+    date(1985, 9, 27),  # Hurricane Gloria
+    date(1994, 4, 27),  # Nixon funeral
+    date(2001, 9, 11),  # September 11
+    date(2001, 9, 12),
+    date(2001, 9, 13),
+    date(2001, 9, 14),
+    date(2004, 6, 11),  # Reagan funeral
+    date(2007, 1, 2),  # Ford funeral
+    date(2012, 10, 29),  # Hurricane Sandy
+    date(2012, 10, 30),
+    date(2018, 12, 5),  # G. H. W. Bush funeral
+    date(2025, 1, 9),  # Carter funeral
+)
+
+
+def _observed(day: date) -> date:
+    # Saturday holidays close the Friday before, Sunday ones the Monday after
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """The ``n``-th ``weekday`` of the month, or the last one for ``n=-1``."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    # Anonymous Gregorian algorithm
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    j = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * j) // 433
+    month = (h + j - 7 * m + 90) // 25
+    return date(year, month, (h + j - 7 * m + 33 * month + 19) % 32)
+
+
+def nyse_holidays(year: int) -> list[date]:
+    holidays = []
+    new_year = date(year, 1, 1)
+    # A Saturday New Year's Day is not moved into the previous year
+    if new_year.weekday() != 5:
+        holidays.append(_observed(new_year))
+    if year >= 1998:
+        holidays.append(_nth_weekday(year, 1, 0, 3))  # Martin Luther King Jr. Day
+    holidays.append(_nth_weekday(year, 2, 0, 3))  # Washington's Birthday
+    holidays.append(_easter(year) - timedelta(days=2))  # Good Friday
+    holidays.append(_nth_weekday(year, 5, 0, -1))  # Memorial Day
+    if year >= 2022:
+        holidays.append(_observed(date(year, 6, 19)))  # Juneteenth
+    holidays.append(_observed(date(year, 7, 4)))
+    holidays.append(_nth_weekday(year, 9, 0, 1))  # Labor Day
+    holidays.append(_nth_weekday(year, 11, 3, 4))  # Thanksgiving
+    holidays.append(_observed(date(year, 12, 25)))
+    return holidays
+
+
+class TradingCalendar:
+    """Exchange sessions as a numpy business-day calendar.
+
+    Ranges are half-open, ``[start, end)``, like the data sources, so the
+    bars returned for ``window_start(end, n)`` to ``end`` are exactly ``n``.
+    """
+
+    def __init__(self, holidays: list[date]):
+        self.holidays = sorted(holidays)
+        self._calendar = np.busdaycalendar(weekmask="1111100", holidays=self.holidays)
+
+    def is_session(self, day: date) -> bool:
+        return bool(np.is_busday(day, busdaycal=self._calendar))
+
+    def session_count(self, start: date, end: date) -> int:
+        return int(np.busday_count(start, end, busdaycal=self._calendar))
+
+    def offset(self, day: date, sessions: int | np.ndarray) -> np.ndarray:
+        """The session(s) ``sessions`` after ``day``, rolled forward to a session."""
+        return np.busday_offset(day, sessions, roll="forward", busdaycal=self._calendar)
+
+    def window_start(self, end: date, bars: int) -> date:
+        """First day of the ``bars`` sessions before ``end``."""
+        return self.offset(end, -bars).astype(date)
+
+
+@functools.cache
+def nyse_calendar() -> TradingCalendar:
+    holidays = [
+        holiday
+        for year in range(FIRST_YEAR, LAST_YEAR + 1)
+        for holiday in nyse_holidays(year)
+    ]
+    return TradingCalendar(holidays + list(NYSE_SPECIAL_CLOSURES))
@@ -0,0 +1,15 @@
+class CircuitOpenError(Exception):
+    def __init__(self, upstream: str, retry_in: float):
+        self.upstream = upstream
+        self.retry_in = retry_in
+        super().__init__(
+            f"{upstream} is unavailable after repeated failures, "
+            f"retrying in {retry_in:.0f}s"
+        )
+
+
+class SymbolUnavailableError(Exception):
+    def __init__(self, symbol: str, reason: str):
+        self.symbol = symbol
+        self.reason = reason
+        super().__init__(f"No data available for {symbol}: {reason}")
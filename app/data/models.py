@@ -1,30 +1,68 @@
+from collections.abc import Iterable
 from datetime import date
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from sqlalchemy import BigInteger, Column, Date, Float, String
 
 from app.database import Base
 
+# Columns a read can be narrowed to; the date is always returned
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def select_fields(fields: Iterable[str] | None) -> tuple[str, ...]:
+    """Requested price fields in column order, all of them when not given."""
+    if fields is None:
+        return PRICE_FIELDS
+    requested = set(fields)
+    unknown = requested - set(PRICE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in PRICE_FIELDS if name in requested)
+
 
 class StockDataPoint(BaseModel):
     date: date
-    open: float
-    high: float
-    low: float
-    close: float
-    volume: int
+    # None when the read selected other fields
+    open: float | None = None
+    high: float | None = None
+    low: float | None = None
+    close: float | None = None
+    volume: int | None = None
 
 
 class StockData(BaseModel):
     symbol: str
     data_points: list[StockDataPoint]
 
+    def project(self, fields: tuple[str, ...]) -> "StockData":
+        if fields == PRICE_FIELDS:
+            return self
+        include = {"date", *fields}
+        return StockData.model_validate(
+            {
+                "symbol": self.symbol,
+                "data_points": [
+                    point.model_dump(include=include) for point in self.data_points
+                ],
+            }
+        )
+
 
 class BatchStockRequest(BaseModel):
     symbols: list[str]
     start_date: date
     end_date: date
     interval: str
+    # Price fields to return, all of them by default
+    fields: list[str] | None = None
+
+    @field_validator("fields")
+    @classmethod
+    def check_fields(cls, fields: list[str] | None) -> list[str] | None:
+        if fields is not None:
+            select_fields(fields)
+        return fields
 
 
 class BatchStockResponse(BaseModel):
@@ -36,12 +74,27 @@ class BatchStockResponse(BaseModel):
 class StockDataDB(Base):
     __tablename__ = "stock_data"
     __description__ = "Stock data for a symbol"
+    # Range reads walk the (symbol, interval, date) key in date order. Without
+    # a rowid SQLite stores rows in that key
+    __table_args__ = {"sqlite_with_rowid": False}
 
-    id = Column(BigInteger, primary_key=True, index=True)
-    symbol = Column(String, index=True)
-    date = Column(Date, index=True)
+    symbol = Column(String, primary_key=True)
+    interval = Column(String, primary_key=True, default="1d", server_default="1d")
+    date = Column(Date, primary_key=True)
     open = Column(Float)
     high = Column(Float)
     low = Column(Float)
     close = Column(Float)
     volume = Column(BigInteger)
+
+
+class StockDataRangeDB(Base):
+    __tablename__ = "stock_data_ranges"
+    __description__ = "Date ranges already fetched from the source, per symbol"
+
+    symbol = Column(String, primary_key=True)
+    interval = Column(String, primary_key=True)
+    # Half-open [start_date, end_date); overlapping and adjacent fetches are
+    # merged, so a stored range is never split across rows
+    start_date = Column(Date, primary_key=True)
+    end_date = Column(Date, nullable=False)
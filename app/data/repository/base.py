@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 from datetime import date
 
 from app.data.models import BatchStockResponse, StockData
@@ -7,16 +8,28 @@ from app.data.models import BatchStockResponse, StockData
 class BaseDataRepository(ABC):
     @abstractmethod
     async def get_stock_data(
-        self, symbol: str, start_date: date, end_date: date, interval: str
+        self,
+        symbol: str,
+        start_date: date,
+        end_date: date,
+        interval: str,
+        fields: Sequence[str] | None = None,
     ) -> StockData:
         pass
 
     @abstractmethod
     async def get_batch_stock_data(
-        self, symbols: list[str], start_date: date, end_date: date, interval: str
+        self,
+        symbols: list[str],
+        start_date: date,
+        end_date: date,
+        interval: str,
+        fields: Sequence[str] | None = None,
     ) -> BatchStockResponse:
         pass
 
     @abstractmethod
-    async def save_stock_data(self, stock_data: StockData) -> None:
+    async def save_stock_data(
+        self, stock_data: StockData, interval: str = "1d"
+    ) -> None:
         pass
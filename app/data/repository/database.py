@@ -1,69 +1,195 @@
+from collections import defaultdict
+from collections.abc import Sequence
 from datetime import date
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Row
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Query
 
-from app.data.models import BatchStockResponse, StockData, StockDataDB, StockDataPoint
+from app.data.models import (
+    PRICE_FIELDS,
+    BatchStockResponse,
+    StockData,
+    StockDataDB,
+    StockDataPoint,
+    StockDataRangeDB,
+    select_fields,
+)
+from app.database import SessionBound
+from app.metrics import record_rows
 
 from .base import BaseDataRepository
 
 
-class DatabaseRepository(BaseDataRepository):
-    def __init__(self, db: Session):
-        self.db = db
-
-    async def get_stock_data(
-        self, symbol: str, start_date: date, end_date: date, interval: str
-    ) -> StockData:
-        db_data = (
-            self.db.query(StockDataDB)
+class DatabaseRepository(SessionBound, BaseDataRepository):
+    def _range_query(
+        self,
+        symbols: list[str],
+        start_date: date,
+        end_date: date,
+        interval: str,
+        fields: tuple[str, ...],
+    ) -> Query:
+        # Matches the (symbol, interval, date) key, so rows come back in key
+        # order without a sort. Only the selected price columns are read, and
+        # end_date is exclusive as with the data sources.
+        symbol_filter = (
+            StockDataDB.symbol == symbols[0]
+            if len(symbols) == 1
+            else StockDataDB.symbol.in_(symbols)
+        )
+        columns = [getattr(StockDataDB, name) for name in fields]
+        return (
+            self.db.query(StockDataDB.symbol, StockDataDB.date, *columns)
             .filter(
-                StockDataDB.symbol == symbol,
+                symbol_filter,
+                StockDataDB.interval == interval,
                 StockDataDB.date >= start_date,
-                StockDataDB.date <= end_date,
+                StockDataDB.date < end_date,
             )
-            .all()
+            .order_by(StockDataDB.symbol, StockDataDB.date)
         )
-        data_points = [
-            StockDataPoint(
-                date=row.date,  # type: ignore
-                open=row.open,  # type: ignore
-                high=row.high,  # type: ignore
-                low=row.low,  # type: ignore
-                close=row.close,  # type: ignore
-                volume=row.volume,  # type: ignore
-            )
-            for row in db_data
+
+    def _to_data_points(
+        self, rows: list[Row], fields: tuple[str, ...]
+    ) -> list[StockDataPoint]:
+        # Rows are (symbol, date, *fields)
+        names = ("date", *fields)
+        return [
+            StockDataPoint(**dict(zip(names, row[1:], strict=True))) for row in rows
         ]
 
-        return StockData(symbol=symbol, data_points=data_points)
+    async def get_stock_data(
+        self,
+        symbol: str,
+        start_date: date,
+        end_date: date,
+        interval: str,
+        fields: Sequence[str] | None = None,
+    ) -> StockData:
+        selected = select_fields(fields)
+        db_data = self._range_query(
+            [symbol], start_date, end_date, interval, selected
+        ).all()
+        record_rows(StockDataDB.__tablename__, "read", len(db_data))
+        return StockData(
+            symbol=symbol, data_points=self._to_data_points(db_data, selected)
+        )
 
     async def get_batch_stock_data(
-        self, symbols: list[str], start_date: date, end_date: date, interval: str
+        self,
+        symbols: list[str],
+        start_date: date,
+        end_date: date,
+        interval: str,
+        fields: Sequence[str] | None = None,
     ) -> BatchStockResponse:
-        stock_data = {}
-        errors = {}
-
-        for symbol in symbols:
-            try:
-                stock_data[symbol] = await self.get_stock_data(
-                    symbol, start_date, end_date, interval
-                )
-            except Exception as e:
-                errors[symbol] = str(e)
-
-        return BatchStockResponse(stock_data=stock_data, errors=errors)
-
-    async def save_stock_data(self, stock_data: StockData) -> None:
-        for point in stock_data.data_points:
-            db_item = StockDataDB(
-                symbol=stock_data.symbol,
-                date=point.date,
-                open=point.open,
-                high=point.high,
-                low=point.low,
-                close=point.close,
-                volume=point.volume,
+        if not symbols:
+            return BatchStockResponse(stock_data={}, errors={})
+
+        selected = select_fields(fields)
+        rows_by_symbol: dict[str, list[Row]] = defaultdict(list)
+        db_data = self._range_query(
+            symbols, start_date, end_date, interval, selected
+        ).all()
+        record_rows(StockDataDB.__tablename__, "read", len(db_data))
+        for row in db_data:
+            rows_by_symbol[row.symbol].append(row)
+
+        stock_data = {
+            symbol: StockData(
+                symbol=symbol,
+                data_points=self._to_data_points(rows_by_symbol[symbol], selected),
+            )
+            for symbol in symbols
+        }
+        return BatchStockResponse(stock_data=stock_data, errors={})
+
+    async def save_stock_data(
+        self, stock_data: StockData, interval: str = "1d"
+    ) -> None:
+        rows = [
+            {"symbol": stock_data.symbol, "interval": interval, **point.model_dump()}
+            for point in stock_data.data_points
+        ]
+        if not rows:
+            return
+
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            # Re-fetched bars replace the stored ones instead of duplicating them
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            statement = insert(StockDataDB)
+            statement = statement.on_conflict_do_update(
+                index_elements=["symbol", "interval", "date"],
+                set_={column: statement.excluded[column] for column in PRICE_FIELDS},
             )
-            self.db.add(db_item)
+            self.db.execute(statement, rows)
+        else:
+            for row in rows:
+                self.db.merge(StockDataDB(**row))
+        self.db.commit()
+
+    async def covers_range(
+        self, symbol: str, interval: str, start_date: date, end_date: date
+    ) -> bool:
+        """Whether ``[start_date, end_date)`` was already fetched from the source.
+
+        Coverage is recorded per fetch rather than inferred from the stored
+        bars, so ranges with gaps (late listings, halts, missing bars) count as
+        stored once fetched.
+        """
+        covered = await self.covered_symbols([symbol], interval, start_date, end_date)
+        return symbol in covered
+
+    async def covered_symbols(
+        self, symbols: list[str], interval: str, start_date: date, end_date: date
+    ) -> set[str]:
+        """The ``symbols`` whose ``[start_date, end_date)`` was already fetched."""
+        if end_date <= start_date:
+            return set(symbols)
+        if not symbols:
+            return set()
+        rows = (
+            self.db.query(StockDataRangeDB.symbol)
+            .filter(
+                StockDataRangeDB.symbol.in_(symbols),
+                StockDataRangeDB.interval == interval,
+                StockDataRangeDB.start_date <= start_date,
+                StockDataRangeDB.end_date >= end_date,
+            )
+            .distinct()
+            .all()
+        )
+        return {row.symbol for row in rows}
+
+    async def record_fetched_range(
+        self, symbol: str, interval: str, start_date: date, end_date: date
+    ) -> None:
+        if end_date <= start_date:
+            return
+        # Ranges that overlap or touch the new one are merged into it
+        touching = (
+            self.db.query(StockDataRangeDB)
+            .filter(
+                StockDataRangeDB.symbol == symbol,
+                StockDataRangeDB.interval == interval,
+                StockDataRangeDB.start_date <= end_date,
+                StockDataRangeDB.end_date >= start_date,
+            )
+            .all()
+        )
+        merged_start = min([start_date, *(r.start_date for r in touching)])
+        merged_end = max([end_date, *(r.end_date for r in touching)])
+        for row in touching:
+            self.db.delete(row)
+        self.db.flush()
+        self.db.add(
+            StockDataRangeDB(
+                symbol=symbol,
+                interval=interval,
+                start_date=merged_start,
+                end_date=merged_end,
+            )
+        )
         self.db.commit()
-        self.db.refresh(db_item)
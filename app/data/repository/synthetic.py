@@ -0,0 +1,138 @@
+import zlib
+from collections.abc import Sequence
+from datetime import date
+
+import numpy as np
+
+from app.data.calendar import TradingCalendar, nyse_calendar
+from app.data.models import BatchStockResponse, StockData, select_fields
+
+from .base import BaseDataRepository
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+class SyntheticDataRepository(BaseDataRepository):
+    """Deterministic daily OHLCV bars from geometric Brownian motion.
+
+    Every symbol has its own path, seeded by the repository seed and the
+    symbol name and anchored at ``epoch``, so a symbol returns identical bars
+    for a date whatever range it is requested with. Bars fall on the sessions
+    of ``calendar`` (NYSE by default) and ``end_date`` is exclusive, as with
+    Yahoo Finance. Occasional overnight
+    gaps are injected so gap filters have something to reject.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        epoch: date = date(2010, 1, 4),
+        gap_probability: float = 0.002,
+        max_gap: float = 0.25,
+        calendar: TradingCalendar | None = None,
+    ):
+        self.seed = seed
+        self.epoch = np.datetime64(epoch, "D")
+        self.calendar = calendar or nyse_calendar()
+        self.gap_probability = gap_probability
+        self.max_gap = max_gap
+
+    def _rng(self, symbol: str, stream: int) -> np.random.Generator:
+        # One generator per stream, so the first n draws of every stream are
+        # the same however many bars are requested
+        return np.random.default_rng([self.seed, zlib.crc32(symbol.encode()), stream])
+
+    def generate_bars(
+        self, symbol: str, start_date: date, end_date: date
+    ) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        """Sessions in ``[start_date, end_date)`` and their OHLCV arrays."""
+        n_bars = max(self.calendar.session_count(self.epoch, end_date), 0)
+        first = min(max(self.calendar.session_count(self.epoch, start_date), 0), n_bars)
+
+        params = self._rng(symbol, 0)
+        annual_drift = params.normal(0.07, 0.05)
+        annual_volatility = params.uniform(0.15, 0.40)
+        start_price = params.uniform(10, 500)
+
+        sigma = annual_volatility / np.sqrt(TRADING_DAYS_PER_YEAR)
+        mu = annual_drift / TRADING_DAYS_PER_YEAR - sigma**2 / 2
+        # Overnight and intraday moves split the daily variance; gaps are
+        # jumps in the overnight move
+        moves = self._rng(symbol, 1).standard_normal((n_bars, 2))
+        overnight = mu / 2 + sigma * np.sqrt(0.3) * moves[:, 0]
+        intraday = mu / 2 + sigma * np.sqrt(0.7) * moves[:, 1]
+        gap_draws = self._rng(symbol, 2).random((n_bars, 3))
+        has_gap = gap_draws[:, 0] < self.gap_probability
+        gap_sizes = (0.05 + (self.max_gap - 0.05) * gap_draws[:, 1]) * np.where(
+            gap_draws[:, 2] < 0.5, -1, 1
+        )
+        overnight += np.where(has_gap, np.log1p(gap_sizes), 0.0)
+        wicks = np.abs(self._rng(symbol, 3).normal(0, sigma / 2, (n_bars, 2)))
+        volume = self._rng(symbol, 4).lognormal(np.log(1e6), 0.5, n_bars)
+
+        log_close = np.log(start_price) + np.cumsum(overnight + intraday)
+        close = np.exp(log_close)
+        open_ = np.exp(log_close - intraday)
+
+        # The whole path is needed for the level, only the window is returned
+        window = slice(first, n_bars)
+        dates = self.calendar.offset(self.epoch, np.arange(first, n_bars))
+        return dates, {
+            "open": open_[window],
+            "high": np.maximum(open_, close)[window] * np.exp(wicks[window, 0]),
+            "low": np.minimum(open_, close)[window] * np.exp(-wicks[window, 1]),
+            "close": close[window],
+            "volume": np.round(volume[window]),
+        }
+
+    async def get_stock_data(
+        self,
+        symbol: str,
+        start_date: date,
+        end_date: date,
+        interval: str,
+        fields: Sequence[str] | None = None,
+    ) -> StockData:
+        if interval != "1d":
+            raise ValueError(f"Synthetic data only supports daily bars, got {interval}")
+
+        selected = select_fields(fields)
+        dates, bars = self.generate_bars(symbol, start_date, end_date)
+        bars["volume"] = bars["volume"].astype(np.int64)
+        # Validating plain dicts in one call is cheaper than a model per bar
+        columns = {"date": dates.tolist()} | {
+            name: bars[name].tolist() for name in selected
+        }
+        data_points = [
+            dict(zip(columns, row, strict=True))
+            for row in zip(*columns.values(), strict=True)
+        ]
+        return StockData.model_validate({"symbol": symbol, "data_points": data_points})
+
+    async def get_batch_stock_data(
+        self,
+        symbols: list[str],
+        start_date: date,
+        end_date: date,
+        interval: str,
+        fields: Sequence[str] | None = None,
+    ) -> BatchStockResponse:
+        stock_data = {}
+        errors = {}
+
+        for symbol in symbols:
+            try:
+                stock_data[symbol] = await self.get_stock_data(
+                    symbol, start_date, end_date, interval, fields
+                )
+            except Exception as e:
+                errors[symbol] = str(e)
+
+        return BatchStockResponse(stock_data=stock_data, errors=errors)
+
+    async def save_stock_data(
+        self, stock_data: StockData, interval: str = "1d"
+    ) -> None:
+        raise NotImplementedError(
+            "SyntheticDataRepository does not support saving data"
+        )
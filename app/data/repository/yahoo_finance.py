@@ -1,28 +1,73 @@
+import asyncio
+from collections.abc import Sequence
 from datetime import date
 
-import pandas as pd
-import yfinance as yf
-
-from app.data.models import BatchStockResponse, StockData, StockDataPoint
+from app.config import settings
+from app.data.models import (
+    BatchStockResponse,
+    StockData,
+    StockDataPoint,
+    select_fields,
+)
+from app.data.resilience import ResilientFetcher
 
 from .base import BaseDataRepository
 
 
+def _is_retryable(error: Exception) -> bool:
+    from yfinance.exceptions import YFInvalidPeriodError
+
+    # An invalid range fails the same way on every attempt
+    return not isinstance(error, (YFInvalidPeriodError, ValueError))
+
+
 class YahooFinanceRepository(BaseDataRepository):
+    def __init__(self, fetcher: ResilientFetcher | None = None):
+        self.fetcher = fetcher or ResilientFetcher(
+            "yahoo_finance",
+            rate=settings.yahoo_rate_limit,
+            burst=settings.yahoo_burst,
+            max_attempts=settings.yahoo_max_attempts,
+            backoff_base=settings.yahoo_backoff_base,
+            backoff_max=settings.yahoo_backoff_max,
+            failure_threshold=settings.yahoo_failure_threshold,
+            reset_timeout=settings.yahoo_reset_timeout,
+            is_retryable=_is_retryable,
+        )
+
     async def get_stock_data(
-        self, symbol: str, start_date: date, end_date: date, interval: str
+        self,
+        symbol: str,
+        start_date: date,
+        end_date: date,
+        interval: str,
+        fields: Sequence[str] | None = None,
     ) -> StockData:
-        stock = yf.Ticker(symbol)
-        df = stock.history(start=start_date, end=end_date, interval=interval)
+        # Imported on first fetch: yfinance and pandas are slow to import and
+        # not needed at all with other data sources
+        import pandas as pd
+        import yfinance as yf
+        from yfinance.exceptions import YFTickerMissingError
+
+        def history():
+            # raise_errors surfaces rate limits and network failures, which
+            # yfinance otherwise logs and returns as an empty frame
+            try:
+                return yf.Ticker(symbol).history(
+                    start=start_date, end=end_date, interval=interval, raise_errors=True
+                )
+            except YFTickerMissingError:
+                # No bars for the symbol in the range is an answer, not a failure
+                return pd.DataFrame()
+
+        selected = select_fields(fields)
+        # yfinance blocks, so it runs in a thread to keep the event loop free
+        df = await self.fetcher.call(lambda: asyncio.to_thread(history))
 
         data_points = [
             StockDataPoint(
                 date=pd.to_datetime(index).date(),  # type: ignore
-                open=row["Open"],
-                high=row["High"],
-                low=row["Low"],
-                close=row["Close"],
-                volume=row["Volume"],
+                **{name: row[name.capitalize()] for name in selected},
             )
             for index, row in df.iterrows()
         ]
@@ -30,7 +75,12 @@ class YahooFinanceRepository(BaseDataRepository):
         return StockData(symbol=symbol, data_points=data_points)
 
     async def get_batch_stock_data(
-        self, symbols: list[str], start_date: date, end_date: date, interval: str
+        self,
+        symbols: list[str],
+        start_date: date,
+        end_date: date,
+        interval: str,
+        fields: Sequence[str] | None = None,
     ) -> BatchStockResponse:
         stock_data = {}
         errors = {}
@@ -38,12 +88,14 @@ class YahooFinanceRepository(BaseDataRepository):
         for symbol in symbols:
             try:
                 stock_data[symbol] = await self.get_stock_data(
-                    symbol, start_date, end_date, interval
+                    symbol, start_date, end_date, interval, fields
                 )
             except Exception as e:
                 errors[symbol] = str(e)
 
         return BatchStockResponse(stock_data=stock_data, errors=errors)
 
-    async def save_stock_data(self, stock_data: StockData) -> None:
+    async def save_stock_data(
+        self, stock_data: StockData, interval: str = "1d"
+    ) -> None:
         raise NotImplementedError("YahooFinanceRepository does not support saving data")
@@ -0,0 +1,199 @@
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from loguru import logger
+
+from app.metrics import UPSTREAM_CIRCUIT_STATE, UPSTREAM_REQUESTS, UPSTREAM_THROTTLE
+
+from .exceptions import CircuitOpenError
+
+T = TypeVar("T")
+Clock = Callable[[], float]
+
+
+class TokenBucket:
+    """Admits ``rate`` calls per second on average, in bursts of ``capacity``.
+
+    Callers reserve tokens ahead of time; the balance goes negative while
+    reservations are queued, so waiters are admitted in arrival order.
+    """
+
+    def __init__(self, rate: float, capacity: int, clock: Clock = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds until it may be used."""
+        now = self.clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        self._tokens -= 1
+        return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self) -> float:
+        """Wait for a token and return the seconds spent waiting."""
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class CircuitBreaker:
+    """Fails fast after ``failure_threshold`` consecutive failures.
+
+    After ``reset_timeout`` seconds one trial call is let through (half open);
+    its success closes the circuit and its failure opens it again. A trial
+    that ends without a verdict, such as a cancelled one, reopens the circuit
+    without restarting the timeout, so the next call becomes the trial.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+    # Gauge values per state
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Clock = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_running = False
+        self._set_state(self.CLOSED)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        UPSTREAM_CIRCUIT_STATE.labels(upstream=self.name).set(self.STATE_VALUES[state])
+
+    def before_call(self) -> None:
+        if self.state == self.OPEN:
+            assert self.opened_at is not None
+            retry_in = self.opened_at + self.reset_timeout - self.clock()
+            if retry_in > 0:
+                raise CircuitOpenError(self.name, retry_in)
+            self._set_state(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._trial_running:
+                raise CircuitOpenError(self.name, 0)
+            self._trial_running = True
+
+    def release_trial(self) -> None:
+        """Frees the trial slot of a call that neither succeeded nor failed."""
+        if not self._trial_running:
+            return
+        self._trial_running = False
+        if self.state == self.HALF_OPEN:
+            self._set_state(self.OPEN)
+
+    def record_success(self) -> None:
+        self._trial_running = False
+        self.failures = 0
+        if self.state != self.CLOSED:
+            logger.info(f"🟢 Circuit for {self.name} closed")
+            self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        self._trial_running = False
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(
+                    f"🔴 Circuit for {self.name} opened after {self.failures} failures"
+                )
+            self.opened_at = self.clock()
+            self._set_state(self.OPEN)
+
+
+class ResilientFetcher:
+    """Rate limits, retries and circuit-breaks calls to one upstream.
+
+    Each attempt takes a token, so retries count against the rate limit too.
+    Retryable failures are retried up to ``max_attempts`` with full-jitter
+    exponential backoff; a call that fails all its attempts counts as one
+    failure towards the circuit breaker.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int,
+        max_attempts: int,
+        backoff_base: float,
+        backoff_max: float,
+        failure_threshold: int,
+        reset_timeout: float,
+        is_retryable: Callable[[Exception], bool] = lambda error: True,
+        rng: random.Random | None = None,
+    ):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.max_attempts = max_attempts
+        self.is_retryable = is_retryable
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rng = rng or random.Random()
+
+    def backoff(self, attempt: int) -> float:
+        return self.rng.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2**attempt)
+        )
+
+    async def call(self, fetch: Callable[[], Awaitable[T]]) -> T:
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            UPSTREAM_REQUESTS.labels(upstream=self.name, outcome="rejected").inc()
+            raise
+
+        try:
+            return await self._attempt(fetch)
+        finally:
+            # A no-op once a verdict was recorded; otherwise (cancellation)
+            # the half-open trial slot would stay taken for good
+            self.breaker.release_trial()
+
+    async def _attempt(self, fetch: Callable[[], Awaitable[T]]) -> T:
+        attempt = 0
+        while True:
+            UPSTREAM_THROTTLE.labels(upstream=self.name).observe(
+                await self.bucket.acquire()
+            )
+            try:
+                result = await fetch()
+            except Exception as e:
+                if not self.is_retryable(e):
+                    # The upstream answered; the request itself was bad
+                    UPSTREAM_REQUESTS.labels(upstream=self.name, outcome="error").inc()
+                    self.breaker.record_success()
+                    raise
+                attempt += 1
+                if attempt == self.max_attempts:
+                    UPSTREAM_REQUESTS.labels(upstream=self.name, outcome="error").inc()
+                    self.breaker.record_failure()
+                    raise
+                delay = self.backoff(attempt - 1)
+                UPSTREAM_REQUESTS.labels(upstream=self.name, outcome="retry").inc()
+                logger.warning(
+                    f"🔁 {self.name} attempt {attempt} failed ({e}), retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+            UPSTREAM_REQUESTS.labels(upstream=self.name, outcome="success").inc()
+            self.breaker.record_success()
+            return result
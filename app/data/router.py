@@ -1,35 +1,67 @@
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
+from app.http_cache import MARKET_DATA_CACHE_CONTROL, Validators
 
-from .models import BatchStockRequest, BatchStockResponse, StockData
-from .service import DataService
+from .exceptions import SymbolUnavailableError
+from .models import BatchStockRequest, BatchStockResponse, StockData, select_fields
+from .service import DataService, version_scope
 
 router = APIRouter()
 
+# Services are shared across requests; get_db binds a pooled session per request
+data_service = DataService()
+
 
 def get_data_service(db: Session = Depends(get_db)):
-    return DataService(db)
+    return data_service
 
 
-@router.get("/stock/{symbol}", response_model=StockData)
+# Fields left out by a projection are dropped from the response, not nulled
+@router.get(
+    "/stock/{symbol}", response_model=StockData, response_model_exclude_none=True
+)
 async def get_stock_data(
+    request: Request,
+    response: Response,
     symbol: str,
     start_date: date,
     end_date: date,
     interval: str,
+    fields: list[str] | None = Query(None),
     data_service: DataService = Depends(get_data_service),
 ):
     try:
-        return await data_service.get_stock_data(symbol, start_date, end_date, interval)
+        selected = select_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    # Read before the service runs, so a concurrent save makes the tag stale
+    # rather than tagging old bars with the new version
+    validators = Validators.for_scopes(
+        [version_scope(symbol)], start_date, end_date, interval, selected
+    )
+    if validators.matches(request):
+        return validators.not_modified(MARKET_DATA_CACHE_CONTROL)
+
+    try:
+        stock_data = await data_service.get_stock_data(
+            symbol, start_date, end_date, interval, fields
+        )
+    except SymbolUnavailableError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    response.headers.update(validators.headers(MARKET_DATA_CACHE_CONTROL))
+    return stock_data
 
 
-@router.post("/batch", response_model=BatchStockResponse)
+@router.post(
+    "/batch", response_model=BatchStockResponse, response_model_exclude_none=True
+)
 async def get_batch_stock_data(
     request: BatchStockRequest, data_service: DataService = Depends(get_data_service)
 ):
@@ -1,64 +1,259 @@
 import json
+from collections.abc import Awaitable, Callable, Sequence
 from datetime import date
 
 from loguru import logger
 from sqlalchemy.orm import Session
 
-from app.cache import get_cache, set_cache
+from app.cache import (
+    bump_version,
+    get_cache_entry,
+    schedule_refresh,
+    set_cache_entry,
+)
+from app.config import settings
+from app.database import background_session_scope
+from app.metrics import SOURCE_FETCH, record_cache_lookup, timed
+from app.progress import SYMBOL_FETCHED, ProgressCallback, report
 
-from .models import BatchStockRequest, BatchStockResponse, StockData
+from . import cache
+from .calendar import nyse_calendar
+from .exceptions import SymbolUnavailableError
+from .models import (
+    PRICE_FIELDS,
+    BatchStockRequest,
+    BatchStockResponse,
+    StockData,
+    select_fields,
+)
 from .repository.base import BaseDataRepository
 from .repository.database import DatabaseRepository
+from .repository.synthetic import SyntheticDataRepository
 from .repository.yahoo_finance import YahooFinanceRepository
 
+# Called with the bars of a symbol and their interval right after they are
+# saved to the database
+IngestHook = Callable[[StockData, str], Awaitable[None]]
+
+
+def version_scope(symbol: str) -> str:
+    return f"stock_data:{symbol}"
+
+
+def get_source_repository(data_source: str) -> BaseDataRepository:
+    if data_source == "yahoo_finance":
+        return YahooFinanceRepository()
+    if data_source == "synthetic":
+        return SyntheticDataRepository(seed=settings.synthetic_seed)
+    raise ValueError(f"Unknown data source: {data_source}")
+
 
 class DataService:
-    def __init__(self, db: Session):
-        self.yahoo_repo: BaseDataRepository = YahooFinanceRepository()
-        self.db_repo: BaseDataRepository = DatabaseRepository(db)
+    def __init__(self, db: Session | None = None, data_source: str | None = None):
+        self.data_source = data_source or settings.data_source
+        self.source_repo = get_source_repository(self.data_source)
+        self.db_repo = DatabaseRepository(db)
+        self.ingest_hooks: list[IngestHook] = []
+
+    def register_ingest_hook(self, hook: IngestHook) -> None:
+        if hook not in self.ingest_hooks:
+            self.ingest_hooks.append(hook)
+
+    async def _run_ingest_hooks(self, stock_data: StockData, interval: str) -> None:
+        for hook in self.ingest_hooks:
+            try:
+                # A failed hook must not leave the caller's session unusable
+                with self.db_repo.db.begin_nested():
+                    await hook(stock_data, interval)
+            except Exception as e:
+                logger.error(f"Ingest hook failed for {stock_data.symbol}: {str(e)}")
+
+    def _expects_bars(self, start_date: date, end_date: date, interval: str) -> bool:
+        if interval != "1d":
+            return True
+        return (
+            nyse_calendar().session_count(start_date, min(end_date, date.today())) > 0
+        )
+
+    def _reaches_latest_session(
+        self, start_date: date, end_date: date, interval: str
+    ) -> bool:
+        """Whether the range includes the most recent bar the source should have.
+
+        An empty answer for such a range says the symbol has no current data; for
+        an older range it only says the symbol has no bars in that window (it
+        may have listed later), which is no reason to skip other ranges.
+        """
+        today = date.today()
+        if interval != "1d":
+            return end_date >= today
+        latest = nyse_calendar().window_start(today, 1)
+        return start_date <= latest < end_date
+
+    def _settled_end(self, end_date: date) -> date:
+        # Bars from today on may still change, so they never count as stored
+        return min(end_date, date.today())
 
     async def get_stock_data(
-        self, symbol: str, start_date: date, end_date: date, interval: str
+        self,
+        symbol: str,
+        start_date: date,
+        end_date: date,
+        interval: str,
+        fields: Sequence[str] | None = None,
     ) -> StockData:
+        selected = select_fields(fields)
         cache_key = f"{symbol}_{start_date}_{end_date}_{interval}"
-        cached_data = get_cache(cache_key)
+        if selected != PRICE_FIELDS:
+            cache_key += f"_{','.join(selected)}"
+        cached_data, stale = get_cache_entry(cache_key)
 
         logger.info(f"🔎 Checking cache for {cache_key}")
-        if cached_data:
+        record_cache_lookup("stock_data", cached_data is not None)
+        if cached_data is not None:
             logger.info(f"✅ Cache hit for {cache_key}")
+            if stale:
+                schedule_refresh(
+                    "stock_data",
+                    cache_key,
+                    lambda: self._refresh_stock_data(
+                        cache_key, symbol, start_date, end_date, interval, selected
+                    ),
+                )
             return StockData.model_validate(json.loads(cached_data))  # type: ignore
         logger.info(f"❌ Cache miss for {cache_key}")
 
-        logger.info(f"🔎 Querying data for {symbol} from {start_date} to {end_date}")
-        db_data = await self.db_repo.get_stock_data(
-            symbol, start_date, end_date, interval
+        db_data = await self._load_stock_data(
+            symbol, start_date, end_date, interval, selected
         )
+        set_cache_entry(cache_key, db_data.model_dump_json(exclude_none=True))
+        return db_data
 
-        if not db_data.data_points:
-            logger.info(f"❌ Data not found in database for {symbol}")
-            logger.info(f"🔎 Fetching data from Yahoo Finance for {symbol}")
-            yahoo_data = await self.yahoo_repo.get_stock_data(
-                symbol, start_date, end_date, interval
+    async def _refresh_stock_data(
+        self,
+        cache_key: str,
+        symbol: str,
+        start_date: date,
+        end_date: date,
+        interval: str,
+        selected: tuple[str, ...],
+    ) -> None:
+        # Runs after the request that scheduled it, so it needs its own session
+        with background_session_scope():
+            stock_data = await self._load_stock_data(
+                symbol, start_date, end_date, interval, selected
             )
-            logger.info(f"📥 Saving data for {symbol} to database")
-            await self.db_repo.save_stock_data(yahoo_data)
-            db_data = yahoo_data
+        set_cache_entry(cache_key, stock_data.model_dump_json(exclude_none=True))
 
-        set_cache(cache_key, db_data.model_dump_json())
-        return db_data
+    async def _load_stock_data(
+        self,
+        symbol: str,
+        start_date: date,
+        end_date: date,
+        interval: str,
+        selected: tuple[str, ...],
+    ) -> StockData:
+        logger.info(f"🔎 Querying data for {symbol} from {start_date} to {end_date}")
+        # Coverage comes from the ranges fetched before, not from counting the
+        # stored bars, so gaps the source itself has never trigger a refetch
+        if await self.db_repo.covers_range(
+            symbol, interval, start_date, self._settled_end(end_date)
+        ):
+            return await self.db_repo.get_stock_data(
+                symbol, start_date, end_date, interval, selected
+            )
+
+        logger.info(f"❌ Data not found in database for {symbol}")
+        unavailable = cache.get_unavailable([symbol], interval)
+        if symbol in unavailable:
+            raise SymbolUnavailableError(symbol, unavailable[symbol])
+
+        logger.info(f"🔎 Fetching data from {self.data_source} for {symbol}")
+        # Fetch errors are not remembered: upstream failures are handled by the
+        # fetcher's retries and circuit breaker, and bad requests say nothing
+        # about the symbol
+        with timed(SOURCE_FETCH):
+            source_data = await self.source_repo.get_stock_data(
+                symbol, start_date, end_date, interval
+            )
+        if not source_data.data_points and self._expects_bars(
+            start_date, end_date, interval
+        ):
+            reason = f"{self.data_source} returned no bars"
+            if self._reaches_latest_session(start_date, end_date, interval):
+                logger.info(f"🚫 {symbol}: {reason}, skipping it for a while")
+                cache.mark_unavailable(symbol, interval, reason)
+            raise SymbolUnavailableError(symbol, reason)
+        logger.info(f"📥 Saving data for {symbol} to database")
+        await self.db_repo.save_stock_data(source_data, interval)
+        await self.db_repo.record_fetched_range(
+            symbol, interval, start_date, self._settled_end(end_date)
+        )
+        bump_version(version_scope(symbol))
+        await self._run_ingest_hooks(source_data, interval)
+        # Full bars are saved; the caller only gets the fields it asked for
+        return source_data.project(selected)
 
     async def get_batch_stock_data(
-        self, request: BatchStockRequest
+        self, request: BatchStockRequest, on_progress: ProgressCallback | None = None
     ) -> BatchStockResponse:
         stock_data = {}
-        errors = {}
+        # Symbols the source recently had nothing for are skipped up front
+        errors = {
+            symbol: str(SymbolUnavailableError(symbol, reason))
+            for symbol, reason in cache.get_unavailable(
+                request.symbols, request.interval
+            ).items()
+        }
+        if errors:
+            logger.info(f"🚫 Skipping {len(errors)} unavailable symbols")
+
+        def report_fetched(symbol: str) -> None:
+            report(
+                on_progress,
+                SYMBOL_FETCHED,
+                symbol=symbol,
+                loaded=symbol in stock_data,
+                done=len(stock_data) + len(errors),
+                total=len(request.symbols),
+            )
+
+        # Symbols whose range is stored are read together in one query
+        pending = [symbol for symbol in request.symbols if symbol not in errors]
+        stored = await self.db_repo.covered_symbols(
+            pending,
+            request.interval,
+            request.start_date,
+            self._settled_end(request.end_date),
+        )
+        if stored:
+            logger.info(f"🔎 Reading {len(stored)} stored symbols from the database")
+            batch = await self.db_repo.get_batch_stock_data(
+                [symbol for symbol in pending if symbol in stored],
+                request.start_date,
+                request.end_date,
+                request.interval,
+                request.fields,
+            )
+            for symbol, symbol_data in batch.stock_data.items():
+                stock_data[symbol] = symbol_data
+                report_fetched(symbol)
 
-        for symbol in request.symbols:
+        for symbol in pending:
+            if symbol in stored:
+                continue
             try:
                 stock_data[symbol] = await self.get_stock_data(
-                    symbol, request.start_date, request.end_date, request.interval
+                    symbol,
+                    request.start_date,
+                    request.end_date,
+                    request.interval,
+                    request.fields,
                 )
             except Exception as e:
                 errors[symbol] = str(e)
+            report_fetched(symbol)
 
+        # In request order, whichever path loaded each symbol
+        stock_data = {s: stock_data[s] for s in request.symbols if s in stock_data}
         return BatchStockResponse(stock_data=stock_data, errors=errors)
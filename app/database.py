@@ -1,17 +1,170 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import BigInteger, Integer, create_engine, event
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from .config import settings
+from .metrics import (
+    DB_POOL_EVENTS,
+    DB_QUERY,
+    REGISTRY,
+    counter_value,
+    observe_stage,
+    record_rows,
+)
+
+
+def _engine_options(url: str) -> dict[str, Any]:
+    # SQLite (local runs and tests) takes no pool sizing options, and
+    # connections may be handed between the event loop and worker threads
+    if url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": True,
+    }
 
-engine = create_engine(settings.postgres_url, echo=False)
+
+engine = create_engine(
+    settings.postgres_url, echo=False, **_engine_options(settings.postgres_url)
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# SQLite only autoincrements INTEGER PRIMARY KEY columns
+BigIntegerPrimaryKey = BigInteger().with_variant(Integer(), "sqlite")
+
+# Pool event counts live in a prometheus counter, which is thread safe
+POOL_EVENTS = ("connect", "checkout", "checkin")
+POOL_STATE = ("size", "checkedin", "checkedout", "overflow")
+
+
+@event.listens_for(engine, "connect")
+def _on_connect(*_):
+    DB_POOL_EVENTS.labels(event="connect").inc()
+
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(*_):
+    DB_POOL_EVENTS.labels(event="checkout").inc()
+
+
+@event.listens_for(engine, "checkin")
+def _on_checkin(*_):
+    DB_POOL_EVENTS.labels(event="checkin").inc()
+
+
+def _pool_state() -> dict[str, int]:
+    pool = engine.pool
+    state = {}
+    for name in POOL_STATE:
+        method = getattr(pool, name, None)
+        if method is not None:
+            state[name] = method()
+    return state
+
+
+def get_pool_metrics() -> dict[str, int]:
+    metrics = {
+        f"{name}s": int(counter_value(DB_POOL_EVENTS, event=name))
+        for name in POOL_EVENTS
+    }
+    metrics.update(_pool_state())
+    return metrics
+
+
+class _PoolStateCollector:
+    # Pool state is sampled at scrape time
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        state = GaugeMetricFamily(
+            "py_momentum_db_pool",
+            "Database connection pool state.",
+            labels=["metric"],
+        )
+        for name, value in _pool_state().items():
+            state.add_metric([name], value)
+        yield state
+
+
+REGISTRY.register(_PoolStateCollector())
 
-def get_db():
-    db = SessionLocal()
+
+@event.listens_for(engine, "before_cursor_execute")
+def _on_before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _on_after_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["query_start"].pop()
+    observe_stage(DB_QUERY, time.perf_counter() - start)
+    # Reads are counted by the repositories, where the fetched rows are known
+    if context.isinsert or context.isupdate or context.isdelete:
+        table = getattr(getattr(context.compiled, "statement", None), "table", None)
+        rows = cursor.rowcount
+        if rows < 0:
+            rows = len(parameters) if executemany else 0
+        record_rows(getattr(table, "name", "unknown"), "write", rows)
+
+
+# The session of the current request or unit of work. Services are long-lived
+# and resolve their session through this, so concurrent requests never share one.
+_current_session: ContextVar[Session | None] = ContextVar("db_session", default=None)
+
+
+@contextmanager
+def session_scope(session_factory: sessionmaker = SessionLocal) -> Iterator[Session]:
+    db = session_factory()
+    token = _current_session.set(db)
     try:
         yield db
     finally:
+        _current_session.reset(token)
         db.close()
+
+
+def background_session_scope() -> AbstractContextManager[Session]:
+    """A new session on the current session's engine.
+
+    For work that outlives the scope that started it, such as background
+    refreshes: the session of the originating request may be closed by then.
+    """
+    current = _current_session.get()
+    if current is None:
+        return session_scope()
+    return session_scope(
+        sessionmaker(autocommit=False, autoflush=False, bind=current.get_bind())
+    )
+
+
+def get_session() -> Session:
+    db = _current_session.get()
+    if db is None:
+        raise RuntimeError(
+            "No database session is bound; use get_db or session_scope() first"
+        )
+    return db
+
+
+class SessionBound:
+    def __init__(self, db: Session | None = None):
+        self._db = db
+
+    @property
+    def db(self) -> Session:
+        return self._db if self._db is not None else get_session()
+
+
+async def get_db() -> AsyncIterator[Session]:
+    # Async so the session is bound in the request's own context
+    with session_scope() as db:
+        yield db
@@ -0,0 +1,67 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+from .cache import get_version
+from .config import settings
+
+# Historical bars rarely change, so they can be reused for a while unchecked
+MARKET_DATA_CACHE_CONTROL = f"public, max-age={settings.http_cache_max_age}"
+# Portfolio state changes on every rebalance; caches must revalidate each time
+PORTFOLIO_CACHE_CONTROL = "no-cache"
+
+
+def _opaque_tag(etag: str) -> str:
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    return etag.strip().removeprefix("W/")
+
+
+@dataclass(frozen=True)
+class Validators:
+    """ETag and Last-Modified of a response, derived from data versions.
+
+    The ETag covers the versions of every scope the response reads from and
+    the request parameters that select the representation, so it changes
+    whenever the underlying data does without hashing the body.
+    """
+
+    etag: str
+    last_modified: datetime
+
+    @classmethod
+    def for_scopes(cls, scopes: list[str], *variant: object) -> "Validators":
+        versions = [get_version(scope) for scope in scopes]
+        digest = hashlib.sha256(repr((scopes, versions, variant)).encode())
+        # HTTP dates have second precision
+        last_modified = datetime.fromtimestamp(max(versions) // 10**9, tz=timezone.utc)
+        return cls(etag=f'W/"{digest.hexdigest()[:32]}"', last_modified=last_modified)
+
+    def matches(self, request: Request) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {_opaque_tag(tag) for tag in if_none_match.split(",")}
+            return "*" in tags or _opaque_tag(self.etag) in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return self.last_modified <= since
+
+    def headers(self, cache_control: str) -> dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            "Cache-Control": cache_control,
+        }
+
+    def not_modified(self, cache_control: str) -> Response:
+        return Response(status_code=304, headers=self.headers(cache_control))
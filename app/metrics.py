@@ -0,0 +1,177 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from .profiling import record_stage_timing
+
+# Latency buckets in seconds, from sub-millisecond cache reads to slow fetches
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+REGISTRY = CollectorRegistry()
+
+STAGE_LATENCY = Histogram(
+    "py_momentum_stage_duration_seconds",
+    "Latency of each pipeline stage.",
+    ["stage"],
+    buckets=DEFAULT_BUCKETS,
+    registry=REGISTRY,
+)
+STAGE_ERRORS = Counter(
+    "py_momentum_stage_errors_total",
+    "Pipeline stages that raised.",
+    ["stage"],
+    registry=REGISTRY,
+)
+CACHE_REQUESTS = Counter(
+    "py_momentum_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss).",
+    ["cache", "result"],
+    registry=REGISTRY,
+)
+CACHE_REFRESHES = Counter(
+    "py_momentum_cache_refreshes_total",
+    "Background refreshes of stale cache entries by outcome.",
+    ["cache", "outcome"],
+    registry=REGISTRY,
+)
+DB_ROWS = Counter(
+    "py_momentum_db_rows_total",
+    "Database rows read or written.",
+    ["table", "operation"],
+    registry=REGISTRY,
+)
+DB_POOL_EVENTS = Counter(
+    "py_momentum_db_pool_events_total",
+    "Database connection pool events (connect, checkout, checkin).",
+    ["event"],
+    registry=REGISTRY,
+)
+UPSTREAM_REQUESTS = Counter(
+    "py_momentum_upstream_requests_total",
+    "Calls to upstream data sources by outcome (success, retry, error, rejected).",
+    ["upstream", "outcome"],
+    registry=REGISTRY,
+)
+UPSTREAM_THROTTLE = Histogram(
+    "py_momentum_upstream_throttle_seconds",
+    "Time upstream calls waited for the rate limiter.",
+    ["upstream"],
+    buckets=DEFAULT_BUCKETS,
+    registry=REGISTRY,
+)
+UPSTREAM_CIRCUIT_STATE = Gauge(
+    "py_momentum_upstream_circuit_state",
+    "Upstream circuit breaker state (0 closed, 1 half open, 2 open).",
+    ["upstream"],
+    registry=REGISTRY,
+)
+
+# Stage names
+CACHE_GET = "cache_get"
+CACHE_SET = "cache_set"
+DB_QUERY = "db_query"
+SOURCE_FETCH = "source_fetch"
+FEATURE_COMPUTATION = "feature_computation"
+SIGNAL_RANKING = "signal_ranking"
+ORDER_GENERATION = "order_generation"
+STATE_WRITE = "state_write"
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    STAGE_LATENCY.labels(stage=stage).observe(seconds)
+    record_stage_timing(stage, seconds)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(stage=stage).inc()
+        raise
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def record_rows(table: str, operation: str, count: int) -> None:
+    if count > 0:
+        DB_ROWS.labels(table=table, operation=operation).inc(count)
+
+
+def counter_value(counter: Counter, **labels: str) -> float:
+    """Current value of one labelled series, 0 if it was never incremented."""
+    for metric in counter.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_total") and sample.labels == labels:
+                return sample.value
+    return 0.0
+
+
+def _cache_lookups() -> dict[str, dict[str, float]]:
+    lookups: dict[str, dict[str, float]] = {}
+    for metric in CACHE_REQUESTS.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_total"):
+                cache = lookups.setdefault(sample.labels["cache"], {})
+                cache[sample.labels["result"]] = sample.value
+    return lookups
+
+
+def _hit_ratio(results: dict[str, float]) -> float | None:
+    total = sum(results.values())
+    return results.get("hit", 0.0) / total if total else None
+
+
+def cache_hit_ratio(cache: str) -> float | None:
+    return _hit_ratio(_cache_lookups().get(cache, {}))
+
+
+class _CacheHitRatioCollector:
+    # Derived from the lookup counters at scrape time
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        ratios = GaugeMetricFamily(
+            "py_momentum_cache_hit_ratio",
+            "Share of cache lookups that hit, by cache.",
+            labels=["cache"],
+        )
+        for cache, results in sorted(_cache_lookups().items()):
+            ratio = _hit_ratio(results)
+            if ratio is not None:
+                ratios.add_metric([cache], ratio)
+        yield ratios
+
+
+REGISTRY.register(_CacheHitRatioCollector())
+
+
+def render_metrics() -> bytes:
+    return generate_latest(REGISTRY)
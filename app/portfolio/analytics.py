@@ -0,0 +1,51 @@
+import numpy as np
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def periods_per_year(days: np.ndarray) -> float:
+    # NAV points only exist on dates with a stored state, so infer the
+    # sampling frequency instead of assuming one point per trading day
+    elapsed = days[-1] - days[0] if len(days) > 1 else 0
+    if elapsed <= 0:
+        return float(TRADING_DAYS_PER_YEAR)
+    return 365.25 * (len(days) - 1) / float(elapsed)
+
+
+def period_returns(nav: np.ndarray) -> np.ndarray:
+    return nav[1:] / nav[:-1] - 1
+
+
+def drawdowns(nav: np.ndarray) -> np.ndarray:
+    return nav / np.maximum.accumulate(nav) - 1
+
+
+def rolling_returns(nav: np.ndarray, window: int) -> np.ndarray:
+    result = np.full(len(nav), np.nan)
+    if 0 < window < len(nav):
+        result[window:] = nav[window:] / nav[:-window] - 1
+    return result
+
+
+def annualized_volatility(returns: np.ndarray, periods: float) -> float | None:
+    if len(returns) < 2:
+        return None
+    return float(np.std(returns, ddof=1) * np.sqrt(periods))
+
+
+def sharpe_ratio(
+    returns: np.ndarray, periods: float, risk_free_rate: float = 0.0
+) -> float | None:
+    if len(returns) < 2:
+        return None
+    excess = returns - risk_free_rate / periods
+    std = np.std(excess, ddof=1)
+    if std == 0:
+        return None
+    return float(np.mean(excess) / std * np.sqrt(periods))
+
+
+def annualized_return(total_return: float, days: int) -> float:
+    if days <= 0:
+        return 0.0
+    return (1 + total_return) ** (365 / days) - 1
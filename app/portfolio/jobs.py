@@ -0,0 +1,165 @@
+import uuid
+from datetime import datetime
+
+from loguru import logger
+
+from app.cache import (
+    get_cache,
+    lease_queue_item,
+    move_queue,
+    push_queue,
+    queue_items,
+    reclaim_queue_item,
+    release_queue_item,
+    set_cache,
+)
+from app.config import settings
+
+from .models import (
+    RebalanceJob,
+    RebalanceJobStatus,
+    RebalanceRequest,
+    RebalanceResponse,
+)
+
+QUEUE_NAME = "rebalance_jobs:queue"
+# Jobs taken by a worker and not finished yet
+PROCESSING_NAME = "rebalance_jobs:processing"
+JOB_EXPIRATION = 24 * 3600
+
+
+def _job_key(job_id: str) -> str:
+    return f"rebalance_job:{job_id}"
+
+
+def _lease_key(job_id: str) -> str:
+    return f"rebalance_job:{job_id}:lease"
+
+
+def save_rebalance_job(job: RebalanceJob) -> None:
+    job.updated_at = datetime.now()
+    set_cache(_job_key(job.job_id), job.model_dump_json(), JOB_EXPIRATION)
+
+
+def get_rebalance_job(job_id: str) -> RebalanceJob | None:
+    cached = get_cache(_job_key(job_id))
+    return RebalanceJob.model_validate_json(cached) if cached else None
+
+
+def enqueue_rebalance_job(request: RebalanceRequest) -> RebalanceJob:
+    now = datetime.now()
+    job = RebalanceJob(
+        job_id=uuid.uuid4().hex,
+        status=RebalanceJobStatus.QUEUED,
+        request=request,
+        created_at=now,
+        updated_at=now,
+    )
+    save_rebalance_job(job)
+    push_queue(QUEUE_NAME, job.job_id)
+    logger.info(f"📬 Queued rebalance job {job.job_id}")
+    return job
+
+
+def next_rebalance_job(timeout: int = 5) -> RebalanceJob | None:
+    job_id = move_queue(QUEUE_NAME, PROCESSING_NAME, timeout)
+    if job_id is None:
+        return None
+    if not lease_queue_item(
+        PROCESSING_NAME, _lease_key(job_id), job_id, settings.rebalance_job_lease_ttl
+    ):
+        # Requeued before the lease was taken; it is picked up again
+        return None
+    # Read after the lease is taken, so it has any update of a requeue
+    job = get_rebalance_job(job_id)
+    if job is None:
+        logger.warning(f"Rebalance job {job_id} expired before it was picked up")
+    elif _is_finished(job):
+        # Requeued while its previous worker was finishing it
+        logger.info(f"⏭️ Rebalance job {job_id} already finished")
+        job = None
+    else:
+        return job
+    release_queue_item(PROCESSING_NAME, _lease_key(job_id), job_id)
+    return None
+
+
+def renew_lease(job: RebalanceJob) -> bool:
+    """False once the job was requeued, e.g. after the lease ran out."""
+    return lease_queue_item(
+        PROCESSING_NAME,
+        _lease_key(job.job_id),
+        job.job_id,
+        settings.rebalance_job_lease_ttl,
+    )
+
+
+def _is_finished(job: RebalanceJob) -> bool:
+    return job.status in (RebalanceJobStatus.SUCCEEDED, RebalanceJobStatus.FAILED)
+
+
+def requeue_stalled_jobs() -> int:
+    """Put back jobs whose worker stopped renewing the lease, as when it died.
+
+    Jobs that used up their attempts fail instead. Returns how many jobs
+    were requeued.
+    """
+    requeued = 0
+    for job_id in queue_items(PROCESSING_NAME):
+        if get_cache(_lease_key(job_id)) is not None:
+            continue
+        job = get_rebalance_job(job_id)
+        retry = (
+            job is not None
+            and not _is_finished(job)
+            and job.attempts < settings.rebalance_job_max_attempts
+        )
+        if not reclaim_queue_item(
+            QUEUE_NAME, PROCESSING_NAME, _lease_key(job_id), job_id, requeue=retry
+        ):
+            continue
+        if job is None or _is_finished(job):
+            continue
+        # Only the record of a reclaimed job is updated, and only if no worker
+        # finished or took it since it was read; workers drop finished jobs
+        current = get_rebalance_job(job_id)
+        if current is None or (current.status, current.attempts) != (
+            job.status,
+            job.attempts,
+        ):
+            continue
+        if retry:
+            current.status = RebalanceJobStatus.QUEUED
+            save_rebalance_job(current)
+            logger.warning(f"♻️ Requeued stalled rebalance job {job_id}")
+            requeued += 1
+        else:
+            current.status = RebalanceJobStatus.FAILED
+            current.result = RebalanceResponse(
+                success=False,
+                message=f"Rebalance failed: worker stopped in {job.attempts} attempts",
+            )
+            save_rebalance_job(current)
+            logger.error(f"Rebalance job {job_id} failed after {job.attempts} attempts")
+    return requeued
+
+
+def mark_progress(job: RebalanceJob, stage: str) -> None:
+    if stage not in job.progress:
+        job.progress.append(stage)
+    save_rebalance_job(job)
+
+
+def mark_running(job: RebalanceJob) -> None:
+    job.status = RebalanceJobStatus.RUNNING
+    job.attempts += 1
+    save_rebalance_job(job)
+
+
+def mark_finished(job: RebalanceJob, result: RebalanceResponse) -> None:
+    job.result = result
+    job.status = (
+        RebalanceJobStatus.SUCCEEDED if result.success else RebalanceJobStatus.FAILED
+    )
+    save_rebalance_job(job)
+    release_queue_item(PROCESSING_NAME, _lease_key(job.job_id), job.job_id)
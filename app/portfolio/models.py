@@ -1,7 +1,9 @@
-from datetime import date
+from datetime import date, datetime
 from enum import Enum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.portfolio_state.models import DEFAULT_PORTFOLIO_ID
 
 
 class OrderType(str, Enum):
@@ -17,6 +19,7 @@ class Order(BaseModel):
 
 
 class RebalanceRequest(BaseModel):
+    portfolio_id: str = DEFAULT_PORTFOLIO_ID
     date: date
     symbols: list[str]
     interval: str
@@ -28,6 +31,37 @@ class RebalanceResponse(BaseModel):
     message: str
 
 
+class RebalanceJobStatus(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+class RebalanceJob(BaseModel):
+    job_id: str
+    status: RebalanceJobStatus
+    request: RebalanceRequest
+    progress: list[str] = Field(default_factory=list)
+    result: RebalanceResponse | None = None
+    # Runs started, including those of workers that died
+    attempts: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+
+class BatchRebalanceRequest(BaseModel):
+    portfolio_ids: list[str]
+    date: date
+    symbols: list[str]
+    interval: str
+    market_index: str
+
+
+class BatchRebalanceResponse(BaseModel):
+    results: dict[str, RebalanceResponse]
+
+
 class Position(BaseModel):
     symbol: str
     quantity: int
@@ -49,9 +83,24 @@ class PortfolioPerformance(BaseModel):
     total_return: float
     annualized_return: float
     sharpe_ratio: float | None = None
+    volatility: float | None = None
     max_drawdown: float
 
 
+class NavHistoryPoint(BaseModel):
+    date: date
+    nav: float
+    cash_balance: float
+    period_return: float | None = None
+    drawdown: float
+    rolling_return: float | None = None
+
+
+class NavHistoryResponse(BaseModel):
+    points: list[NavHistoryPoint]
+    performance: PortfolioPerformance
+
+
 class SignalType(str, Enum):
     BUY = "BUY"
     SELL = "SELL"
@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.portfolio.models import Order, OrderType
+from app.portfolio_state.models import Position
+from app.strategy.models import SignalType, StockSignal
+
+# Decimal arithmetic in the object path gives exact integer quantities for
+# ratios like 0.3 * 1000 / 0.1; nudge the float ratio so truncation agrees
+_QUANTITY_TOLERANCE = 1e-12
+
+
+@dataclass
+class PositionArrays:
+    symbols: list[str]
+    quantities: np.ndarray
+    prices: np.ndarray
+    values: np.ndarray
+
+    @classmethod
+    def from_positions(cls, positions: list[Position]) -> "PositionArrays":
+        return cls(
+            symbols=[p.symbol for p in positions],
+            quantities=np.array([p.quantity for p in positions], dtype=np.float64),
+            prices=np.array([p.price for p in positions], dtype=np.float64),
+            values=np.array([p.value for p in positions], dtype=np.float64),
+        )
+
+    @classmethod
+    def from_signals(
+        cls, signals: list[StockSignal], total_value: float
+    ) -> "PositionArrays":
+        # Later signals for the same symbol win, as with a dict keyed by symbol
+        buys = {s.symbol: s for s in signals if s.signal == SignalType.BUY}
+        risk_units = np.array([s.risk_unit for s in buys.values()], dtype=np.float64)
+        prices = np.array([s.current_price for s in buys.values()], dtype=np.float64)
+
+        quantities = np.trunc(
+            risk_units * total_value / prices * (1 + _QUANTITY_TOLERANCE)
+        )
+        return cls(
+            symbols=list(buys),
+            quantities=quantities,
+            prices=prices,
+            values=quantities * prices,
+        )
+
+    def to_positions(self) -> list[Position]:
+        return [
+            Position(symbol=symbol, quantity=float(q), price=float(p), value=float(v))
+            for symbol, q, p, v in zip(
+                self.symbols,
+                self.quantities.tolist(),
+                self.prices.tolist(),
+                self.values.tolist(),
+                strict=True,
+            )
+        ]
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+
+@dataclass
+class RebalancePlan:
+    order_symbols: list[str]
+    order_quantities: np.ndarray
+    order_prices: np.ndarray
+    positions: PositionArrays
+    cash_balance: float
+    total_value: float
+
+    def orders(self) -> list[Order]:
+        return [
+            Order(
+                symbol=symbol,
+                order_type=OrderType.MARKET,
+                quantity=q,
+                price=p,
+            )
+            for symbol, q, p in zip(
+                self.order_symbols,
+                self.order_quantities.tolist(),
+                self.order_prices.tolist(),
+                strict=True,
+            )
+        ]
+
+
+def plan_rebalance(
+    current: PositionArrays, target: PositionArrays, cash_balance: float
+) -> RebalancePlan:
+    """Orders and resulting positions that move ``current`` to ``target``.
+
+    Positions outside the target are sold at their last price, new targets
+    are bought, and held targets trade the difference at the target price.
+    The tests check it against the object-based rebalance it replaced.
+    """
+    # Universe: current holdings first, then new targets in signal order
+    current_index = {symbol: i for i, symbol in enumerate(current.symbols)}
+    new_symbols = [s for s in target.symbols if s not in current_index]
+    symbols = current.symbols + new_symbols
+    n_current = len(current)
+
+    target_slot = np.array(
+        [current_index.get(s, -1) for s in target.symbols], dtype=np.int64
+    )
+    target_slot[target_slot < 0] = np.arange(n_current, len(symbols))
+
+    current_qty = np.zeros(len(symbols))
+    current_qty[:n_current] = current.quantities
+    current_price = np.zeros(len(symbols))
+    current_price[:n_current] = current.prices
+    current_value = np.zeros(len(symbols))
+    current_value[:n_current] = current.values
+
+    in_target = np.zeros(len(symbols), dtype=bool)
+    in_target[target_slot] = True
+    target_qty = np.zeros(len(symbols))
+    target_qty[target_slot] = target.quantities
+    target_price = current_price.copy()
+    target_price[target_slot] = target.prices
+
+    delta = target_qty - current_qty
+    is_new = np.arange(len(symbols)) >= n_current
+    has_order = ~in_target | is_new | (delta != 0)
+
+    # Sells of dropped holdings come first, then target trades in signal order
+    sells = np.flatnonzero(~in_target)
+    target_trades = target_slot[has_order[target_slot]]
+    order_slots = np.concatenate([sells, target_trades])
+    order_quantities = delta[order_slots]
+    order_prices = target_price[order_slots]
+
+    new_qty = current_qty + np.where(has_order, delta, 0.0)
+    new_price = np.where(has_order, target_price, current_price)
+    new_value = np.where(has_order, new_qty * new_price, current_value)
+    keep = ~(has_order & (new_qty == 0))
+
+    new_cash = cash_balance - float(np.sum(order_quantities * order_prices))
+    kept = np.flatnonzero(keep)
+    positions = PositionArrays(
+        symbols=[symbols[i] for i in kept],
+        quantities=new_qty[kept],
+        prices=new_price[kept],
+        values=new_value[kept],
+    )
+    return RebalancePlan(
+        order_symbols=[symbols[i] for i in order_slots],
+        order_quantities=order_quantities,
+        order_prices=order_prices,
+        positions=positions,
+        cash_balance=new_cash,
+        total_value=new_cash + float(np.sum(positions.values)),
+    )
@@ -1,16 +1,25 @@
 from datetime import date
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from loguru import logger
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.portfolio_state.service import PortfolioStateService
-from app.strategy.router import StrategyServiceProvider
+from app.http_cache import PORTFOLIO_CACHE_CONTROL, Validators
+from app.portfolio_state.cache import version_scope
+from app.portfolio_state.exceptions import PortfolioStateNotFoundError
+from app.portfolio_state.models import DEFAULT_PORTFOLIO_ID
+from app.portfolio_state.router import portfolio_state_service
+from app.strategy.router import strategy_service_provider
 
+from . import jobs
 from .models import (
+    BatchRebalanceRequest,
+    BatchRebalanceResponse,
+    NavHistoryResponse,
     PortfolioPerformance,
     PortfolioSummary,
+    RebalanceJob,
     RebalanceRequest,
     RebalanceResponse,
 )
@@ -19,10 +28,13 @@ from .service import PortfolioService
 router = APIRouter()
 
 
+portfolio_service = PortfolioService(
+    strategy_service_provider.strategy_service, portfolio_state_service
+)
+
+
 def get_portfolio_service(db: Session = Depends(get_db)):
-    strategy_service = StrategyServiceProvider().get_strategy_service(db)
-    portfolio_state_service = PortfolioStateService(db)
-    return PortfolioService(strategy_service, portfolio_state_service)
+    return portfolio_service
 
 
 @router.post("/rebalance", response_model=RebalanceResponse)
@@ -34,17 +46,77 @@ async def rebalance_portfolio(
     return await portfolio_service.rebalance(request)
 
 
+@router.post(
+    "/rebalance_jobs",
+    response_model=RebalanceJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_rebalance_job(request: RebalanceRequest):
+    logger.info(f"Queueing portfolio rebalance: {request}")
+    return jobs.enqueue_rebalance_job(request)
+
+
+@router.get("/rebalance_jobs/{job_id}", response_model=RebalanceJob)
+async def get_rebalance_job(job_id: str):
+    job = jobs.get_rebalance_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404, detail=f"Rebalance job not found: {job_id}"
+        )
+    return job
+
+
+@router.post("/batch_rebalance", response_model=BatchRebalanceResponse)
+async def batch_rebalance_portfolios(
+    request: BatchRebalanceRequest,
+    portfolio_service: PortfolioService = Depends(get_portfolio_service),
+):
+    logger.info(f"Batch rebalancing portfolios: {request}")
+    return await portfolio_service.rebalance_batch(request)
+
+
 @router.get("/summary/{date}", response_model=PortfolioSummary)
 async def get_portfolio_summary(
-    date: date, portfolio_service: PortfolioService = Depends(get_portfolio_service)
+    request: Request,
+    response: Response,
+    date: date,
+    portfolio_id: str = DEFAULT_PORTFOLIO_ID,
+    portfolio_service: PortfolioService = Depends(get_portfolio_service),
 ):
-    return await portfolio_service.get_portfolio_summary(date)
+    validators = Validators.for_scopes([version_scope(portfolio_id)], "summary", date)
+    if validators.matches(request):
+        return validators.not_modified(PORTFOLIO_CACHE_CONTROL)
+
+    summary = await portfolio_service.get_portfolio_summary(date, portfolio_id)
+    response.headers.update(validators.headers(PORTFOLIO_CACHE_CONTROL))
+    return summary
 
 
 @router.get("/performance", response_model=PortfolioPerformance)
 async def get_portfolio_performance(
     start_date: date,
     end_date: date,
+    portfolio_id: str = DEFAULT_PORTFOLIO_ID,
+    portfolio_service: PortfolioService = Depends(get_portfolio_service),
+):
+    return await portfolio_service.get_portfolio_performance(
+        start_date, end_date, portfolio_id
+    )
+
+
+@router.get("/nav_history", response_model=NavHistoryResponse)
+async def get_nav_history(
+    start_date: date,
+    end_date: date,
+    rolling_window: int = 21,
+    portfolio_id: str = DEFAULT_PORTFOLIO_ID,
     portfolio_service: PortfolioService = Depends(get_portfolio_service),
 ):
-    return await portfolio_service.get_portfolio_performance(start_date, end_date)
+    try:
+        return await portfolio_service.get_nav_history(
+            start_date, end_date, rolling_window, portfolio_id
+        )
+    except PortfolioStateNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,26 +1,32 @@
 from datetime import date
-from decimal import Decimal
 
+import numpy as np
 from fastapi import HTTPException
 from loguru import logger
 
+from app.metrics import ORDER_GENERATION, STATE_WRITE, timed
+from app.portfolio import analytics
 from app.portfolio.models import (
-    Order,
-    OrderType,
+    BatchRebalanceRequest,
+    BatchRebalanceResponse,
+    NavHistoryPoint,
+    NavHistoryResponse,
     PortfolioPerformance,
     PortfolioSummary,
     RebalanceRequest,
     RebalanceResponse,
 )
+from app.portfolio.rebalance import PositionArrays, plan_rebalance
 from app.portfolio_state.exceptions import PortfolioStateNotFoundError
 from app.portfolio_state.models import (
+    DEFAULT_PORTFOLIO_ID,
     GetPortfolioStateRequest,
     PortfolioState,
-    Position,
     UpdatePortfolioStateRequest,
 )
 from app.portfolio_state.service import PortfolioStateService
-from app.strategy.models import SignalRequest, SignalType, StockSignal
+from app.progress import ORDERS_BUILT, STATE_WRITTEN, ProgressCallback, report
+from app.strategy.models import SignalRequest, StockSignal
 from app.strategy.service import StrategyService
 
 
@@ -34,43 +40,31 @@ class PortfolioService:
         self.strategy_service = strategy_service
         self.portfolio_state_service = portfolio_state_service
 
-    async def rebalance(self, request: RebalanceRequest) -> RebalanceResponse:
-        logger.info(f"Starting portfolio rebalance for date: {request.date}")
+    async def rebalance(
+        self, request: RebalanceRequest, on_progress: ProgressCallback | None = None
+    ) -> RebalanceResponse:
+        logger.info(
+            f"Starting portfolio rebalance of {request.portfolio_id} for date: {request.date}"
+        )
         try:
-            signal_request = SignalRequest(
-                symbols=request.symbols,
-                date=request.date,
-                interval=request.interval,
-                market_index=request.market_index,
+            signals = await self.strategy_service.generate_signals(
+                self._signal_request(request), on_progress
             )
-            signals = await self.strategy_service.generate_signals(signal_request)
 
             current_portfolio_state = (
-                await self.portfolio_state_service.get_latest_portfolio_state()
-            )
-            target_positions = await self.calculate_target_positions(
-                signals.signals, current_portfolio_state
-            )
-            orders = await self.generate_orders(
-                {i.symbol: i for i in current_portfolio_state.positions},
-                target_positions,
-            )
-
-            logger.info(f"☄️ Sending Orders: {orders}")
-            new_portfolio_state = await self.execute_orders(
-                current_portfolio_state, orders
-            )
-
-            logger.info(f"🚀 New Portfolio State: {new_portfolio_state}")
-            updated_portfolio_state_req = UpdatePortfolioStateRequest(
-                date=request.date,
-                positions=new_portfolio_state.positions,
-                cash_balance=new_portfolio_state.cash_balance,
-                total_value=new_portfolio_state.total_value,
+                await self.portfolio_state_service.get_latest_portfolio_state(
+                    request.portfolio_id
+                )
             )
-            await self.portfolio_state_service.update_portfolio_state(
-                updated_portfolio_state_req
+            updated_portfolio_state_req = await self._plan_rebalance(
+                signals.signals, current_portfolio_state, request.date
             )
+            report(on_progress, ORDERS_BUILT)
+            with timed(STATE_WRITE):
+                await self.portfolio_state_service.update_portfolio_state(
+                    updated_portfolio_state_req
+                )
+            report(on_progress, STATE_WRITTEN)
 
             logger.info("Rebalance completed successfully")
             return RebalanceResponse(success=True, message="Rebalanced successfully")
@@ -85,110 +79,101 @@ class PortfolioService:
                 success=False, message=f"Rebalance failed: {str(e)}"
             )
 
-    async def calculate_target_positions(
-        self, signals: list[StockSignal], current_portfolio_state: PortfolioState
-    ) -> dict[str, Position]:
-        total_value = Decimal(str(current_portfolio_state.total_value))
-        target_positions: dict[str, Position] = {}
-
-        for signal in signals:
-            if signal.signal == SignalType.BUY:
-                allocation = Decimal(str(signal.risk_unit)) * total_value
-                quantity = int(allocation / Decimal(str(signal.current_price)))
-                target_positions[signal.symbol] = Position(
-                    symbol=signal.symbol,
-                    quantity=quantity,
-                    price=float(signal.current_price),
-                    value=float(quantity * Decimal(str(signal.current_price))),
+    async def rebalance_batch(
+        self, request: BatchRebalanceRequest
+    ) -> BatchRebalanceResponse:
+        portfolio_ids = list(dict.fromkeys(request.portfolio_ids))
+        logger.info(
+            f"Starting batch rebalance of {len(portfolio_ids)} portfolios for date: {request.date}"
+        )
+        results: dict[str, RebalanceResponse] = {}
+        try:
+            # One signal run is shared by every portfolio in the batch
+            signals = await self.strategy_service.generate_signals(
+                self._signal_request(request)
+            )
+            current_states = (
+                await self.portfolio_state_service.get_latest_portfolio_states(
+                    portfolio_ids
                 )
+            )
 
-        return target_positions
-
-    async def generate_orders(
-        self,
-        current_positions: dict[str, Position],
-        target_positions: dict[str, Position],
-    ) -> list[Order]:
-        orders: list[Order] = []
-
-        # Sell positions that are not in target_positions
-        for symbol, position in current_positions.items():
-            if symbol not in target_positions:
-                orders.append(
-                    Order(
-                        symbol=symbol,
-                        order_type=OrderType.MARKET,
-                        quantity=-position.quantity,
-                        price=position.price,
+            updates: list[UpdatePortfolioStateRequest] = []
+            for portfolio_id in portfolio_ids:
+                if portfolio_id not in current_states:
+                    error = PortfolioStateNotFoundError("latest", portfolio_id)
+                    logger.error(f"Portfolio state not found: {str(error)}")
+                    results[portfolio_id] = RebalanceResponse(
+                        success=False, message=f"Rebalance failed: {str(error)}"
                     )
-                )
-
-        for symbol, position in target_positions.items():
-            if symbol not in current_positions:
-                # Buy new positions
-                orders.append(
-                    Order(
-                        symbol=symbol,
-                        order_type=OrderType.MARKET,
-                        quantity=position.quantity,
-                        price=position.price,
+                    continue
+                updates.append(
+                    await self._plan_rebalance(
+                        signals.signals, current_states[portfolio_id], request.date
                     )
                 )
-            else:
-                # Rebalance existing positions
-                current_position = current_positions[symbol]
-                order_quantity = position.quantity - current_position.quantity
-                if order_quantity != 0:
-                    orders.append(
-                        Order(
-                            symbol=symbol,
-                            order_type=OrderType.MARKET,
-                            quantity=order_quantity,
-                            price=position.price,
-                        )
-                    )
 
-        return orders
-
-    async def execute_orders(
-        self, current_state: PortfolioState, orders: list[Order]
-    ) -> PortfolioState:
-        new_positions = {i.symbol: i for i in current_state.positions.copy()}
-        cash_balance = current_state.cash_balance
-
-        for order in orders:
-            if order.symbol not in new_positions:
-                new_positions[order.symbol] = Position(
-                    symbol=order.symbol,
-                    quantity=0,
-                    price=order.price,
-                    value=0.0,
+            with timed(STATE_WRITE):
+                await self.portfolio_state_service.update_portfolio_states(updates)
+            for update in updates:
+                results[update.portfolio_id] = RebalanceResponse(
+                    success=True, message="Rebalanced successfully"
+                )
+            logger.info(f"Batch rebalance completed for {len(updates)} portfolios")
+        except Exception as e:
+            logger.error(f"Error during batch rebalance: {str(e)}")
+            for portfolio_id in portfolio_ids:
+                results[portfolio_id] = RebalanceResponse(
+                    success=False, message=f"Rebalance failed: {str(e)}"
                 )
 
-            position = new_positions[order.symbol]
-            order_value = order.quantity * order.price
-
-            position.quantity += order.quantity
-            position.price = order.price  # Assuming we update to the latest price
-            position.value = position.quantity * position.price
-
-            cash_balance -= order_value
+        return BatchRebalanceResponse(results=results)
 
-            if position.quantity == 0:
-                del new_positions[order.symbol]
+    def _signal_request(
+        self, request: RebalanceRequest | BatchRebalanceRequest
+    ) -> SignalRequest:
+        return SignalRequest(
+            symbols=request.symbols,
+            date=request.date,
+            interval=request.interval,
+            market_index=request.market_index,
+        )
 
-        total_value = cash_balance + sum(p.value for p in new_positions.values())
-        return PortfolioState(
-            date=current_state.date,
-            timestamp=current_state.timestamp,
-            positions=list(new_positions.values()),
-            cash_balance=float(cash_balance),
-            total_value=float(total_value),
+    async def _plan_rebalance(
+        self,
+        signals: list[StockSignal],
+        current_portfolio_state: PortfolioState,
+        rebalance_date: date,
+    ) -> UpdatePortfolioStateRequest:
+        # Plan on aligned arrays; pydantic objects are only built for the write
+        with timed(ORDER_GENERATION):
+            plan = plan_rebalance(
+                PositionArrays.from_positions(current_portfolio_state.positions),
+                PositionArrays.from_signals(
+                    signals, current_portfolio_state.total_value
+                ),
+                current_portfolio_state.cash_balance,
+            )
+        logger.info(f"☄️ Sending {len(plan.order_symbols)} orders: {plan.order_symbols}")
+        logger.info(
+            f"🚀 New Portfolio State: {len(plan.positions)} positions, "
+            f"cash {plan.cash_balance:.2f}, total {plan.total_value:.2f}"
+        )
+        return UpdatePortfolioStateRequest(
+            portfolio_id=current_portfolio_state.portfolio_id,
+            date=rebalance_date,
+            positions=plan.positions.to_positions(),
+            cash_balance=plan.cash_balance,
+            total_value=plan.total_value,
         )
 
-    async def get_portfolio_summary(self, date: date) -> PortfolioSummary:
-        logger.info(f"Getting portfolio summary for date: {date}")
-        get_portfolio_req = GetPortfolioStateRequest(date=date)
+    async def get_portfolio_summary(
+        self, date: date, portfolio_id: str = DEFAULT_PORTFOLIO_ID
+    ) -> PortfolioSummary:
+        logger.info(f"Getting portfolio summary of {portfolio_id} for date: {date}")
+        get_portfolio_req = GetPortfolioStateRequest(
+            date=date, portfolio_id=portfolio_id
+        )
         portfolio_state = await self.portfolio_state_service.get_portfolio_state(
             get_portfolio_req
         )
@@ -204,37 +189,66 @@ class PortfolioService:
             },
         )
 
-    async def get_portfolio_performance(
-        self, start_date: date, end_date: date
-    ) -> PortfolioPerformance:
-        try:
-            get_portfolio_req_start = GetPortfolioStateRequest(date=start_date)
-            get_portfolio_req_end = GetPortfolioStateRequest(date=end_date)
-            start_state = await self.portfolio_state_service.get_portfolio_state(
-                get_portfolio_req_start
+    async def get_nav_history(
+        self,
+        start_date: date,
+        end_date: date,
+        rolling_window: int = 21,
+        portfolio_id: str = DEFAULT_PORTFOLIO_ID,
+    ) -> NavHistoryResponse:
+        nav_points = await self.portfolio_state_service.get_nav_history(
+            start_date, end_date, portfolio_id
+        )
+        days = np.array([p.date.toordinal() for p in nav_points])
+        nav = np.array([p.total_value for p in nav_points], dtype=np.float64)
+
+        returns = analytics.period_returns(nav)
+        periods = analytics.periods_per_year(days)
+        drawdowns = analytics.drawdowns(nav)
+        rolling = analytics.rolling_returns(nav, rolling_window)
+        total_return = float(nav[-1] / nav[0] - 1)
+
+        performance = PortfolioPerformance(
+            start_date=start_date,
+            end_date=end_date,
+            total_return=total_return,
+            annualized_return=analytics.annualized_return(
+                total_return, int(days[-1] - days[0])
+            ),
+            sharpe_ratio=analytics.sharpe_ratio(returns, periods),
+            volatility=analytics.annualized_volatility(returns, periods),
+            max_drawdown=float(drawdowns.min()),
+        )
+        period_returns = np.concatenate([[np.nan], returns])
+        points = [
+            NavHistoryPoint(
+                date=point.date,
+                nav=point.total_value,
+                cash_balance=point.cash_balance,
+                period_return=None if np.isnan(r) else float(r),
+                drawdown=float(dd),
+                rolling_return=None if np.isnan(rr) else float(rr),
             )
-            end_state = await self.portfolio_state_service.get_portfolio_state(
-                get_portfolio_req_end
+            for point, r, dd, rr in zip(
+                nav_points, period_returns, drawdowns, rolling, strict=True
             )
+        ]
+        return NavHistoryResponse(points=points, performance=performance)
 
-            total_return = (
-                end_state.total_value - start_state.total_value
-            ) / start_state.total_value
-            days = (end_date - start_date).days
-            annualized_return = (1 + total_return) ** (365 / days) - 1
-
-            # Note: Sharpe ratio and max drawdown calculations would require daily data
-            sharpe_ratio = None
-            max_drawdown = 0
-
-            return PortfolioPerformance(
-                start_date=start_date,
-                end_date=end_date,
-                total_return=total_return,
-                annualized_return=annualized_return,
-                sharpe_ratio=sharpe_ratio,
-                max_drawdown=max_drawdown,
+    async def get_portfolio_performance(
+        self,
+        start_date: date,
+        end_date: date,
+        portfolio_id: str = DEFAULT_PORTFOLIO_ID,
+    ) -> PortfolioPerformance:
+        try:
+            nav_history = await self.get_nav_history(
+                start_date, end_date, portfolio_id=portfolio_id
             )
+            return nav_history.performance
+        except PortfolioStateNotFoundError as e:
+            logger.error(f"Portfolio state not found: {str(e)}")
+            raise HTTPException(status_code=404, detail=str(e))
         except Exception as e:
             logger.error(f"Error calculating portfolio performance: {str(e)}")
             raise HTTPException(
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+from loguru import logger
+
+from app.config import settings
+from app.data.service import DataService
+from app.database import session_scope
+from app.portfolio_state.service import PortfolioStateService
+from app.strategy.service import StrategyService
+
+from . import jobs
+from .models import RebalanceJob, RebalanceResponse
+from .service import PortfolioService
+
+
+def _keep_lease(job: RebalanceJob, stopped: threading.Event) -> None:
+    # Runs in a thread: synchronous steps of the rebalance block the event
+    # loop for long enough to let a lease renewed from it run out
+    while not stopped.wait(settings.rebalance_job_lease_ttl / 3):
+        if not jobs.renew_lease(job):
+            logger.warning(f"Rebalance job {job.job_id} lost its lease")
+            return
+
+
+async def run_rebalance_job(
+    job: RebalanceJob, portfolio_service: PortfolioService
+) -> None:
+    logger.info(f"🏗️ Running rebalance job {job.job_id}")
+    jobs.mark_running(job)
+    stopped = threading.Event()
+    heartbeat = threading.Thread(target=_keep_lease, args=(job, stopped), daemon=True)
+    heartbeat.start()
+    try:
+        # Each job is a unit of work with its own pooled session
+        with session_scope():
+            result = await portfolio_service.rebalance(
+                job.request,
+                on_progress=lambda stage, _: jobs.mark_progress(job, stage),
+            )
+    except Exception as e:
+        logger.error(f"Rebalance job {job.job_id} crashed: {str(e)}")
+        result = RebalanceResponse(success=False, message=f"Rebalance failed: {e}")
+    finally:
+        stopped.set()
+        heartbeat.join()
+    jobs.mark_finished(job, result)
+    logger.info(f"🏁 Rebalance job {job.job_id} finished: {job.status.value}")
+
+
+async def run_worker() -> None:
+    portfolio_service = PortfolioService(
+        StrategyService(DataService(), settings.strategy), PortfolioStateService()
+    )
+    logger.info("👷 Rebalance worker started")
+    while True:
+        jobs.requeue_stalled_jobs()
+        job = await asyncio.to_thread(jobs.next_rebalance_job)
+        if job is not None:
+            await run_rebalance_job(job, portfolio_service)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
@@ -0,0 +1,94 @@
+from datetime import date
+from urllib.parse import quote
+
+from app.cache import (
+    bump_version,
+    delete_cache_prefix,
+    get_cache,
+    set_cache_if_newer,
+)
+from app.metrics import record_cache_lookup
+
+from .models import PortfolioState
+
+CACHE_PREFIX = "portfolio_state:"
+# Entries are kept current by write-through, the TTL only bounds memory use
+CACHE_EXPIRATION = 7 * 24 * 3600
+
+
+def version_scope(portfolio_id: str) -> str:
+    return f"portfolio_state:{portfolio_id}"
+
+
+def _portfolio_prefix(portfolio_id: str) -> str:
+    # Percent-encoded, so no id is a prefix of another id's keys (``a`` next
+    # to ``a:b``) and glob characters in an id do not widen reset_cache's SCAN
+    return f"{CACHE_PREFIX}{quote(portfolio_id, safe='')}:"
+
+
+def _latest_key(portfolio_id: str) -> str:
+    return f"{_portfolio_prefix(portfolio_id)}latest"
+
+
+def _date_key(portfolio_id: str, state_date: date) -> str:
+    return f"{_portfolio_prefix(portfolio_id)}date:{state_date}"
+
+
+def _load(key: str) -> PortfolioState | None:
+    cached = get_cache(key)
+    return PortfolioState.model_validate_json(cached) if cached else None
+
+
+def get_cached_latest_state(portfolio_id: str) -> PortfolioState | None:
+    state = _load(_latest_key(portfolio_id))
+    record_cache_lookup("portfolio_state", state is not None)
+    return state
+
+
+def get_cached_state(portfolio_id: str, state_date: date) -> PortfolioState | None:
+    state = _load(_date_key(portfolio_id, state_date))
+    record_cache_lookup("portfolio_state", state is not None)
+    return state
+
+
+def _order(state: PortfolioState) -> str:
+    # Fixed width, so comparing these strings compares (date, timestamp)
+    return f"{state.date:%Y%m%d}{state.timestamp:%Y%m%d%H%M%S%f}"
+
+
+def cache_state(state: PortfolioState, is_latest: bool = False) -> None:
+    """Caches a state read from the database.
+
+    Each key is only set if no later state was cached since, so a reader that
+    loaded a state before a concurrent write cannot overwrite the written one.
+    """
+    payload = state.model_dump_json()
+    order = _order(state)
+    set_cache_if_newer(
+        _date_key(state.portfolio_id, state.date), payload, order, CACHE_EXPIRATION
+    )
+    if is_latest:
+        set_cache_if_newer(
+            _latest_key(state.portfolio_id), payload, order, CACHE_EXPIRATION
+        )
+
+
+def write_through(state: PortfolioState) -> None:
+    bump_version(version_scope(state.portfolio_id))
+    cache_state(state)
+    # A written state may be a backfill, so a missing latest key is left for
+    # the next read to fill; its order still advances, so a read that loaded
+    # an older state before this write cannot fill it
+    set_cache_if_newer(
+        _latest_key(state.portfolio_id),
+        state.model_dump_json(),
+        _order(state),
+        CACHE_EXPIRATION,
+        fill=False,
+    )
+
+
+def reset_cache(state: PortfolioState) -> None:
+    bump_version(version_scope(state.portfolio_id))
+    delete_cache_prefix(_portfolio_prefix(state.portfolio_id))
+    cache_state(state, is_latest=True)
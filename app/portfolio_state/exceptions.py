@@ -1,4 +1,8 @@
 class PortfolioStateNotFoundError(Exception):
-    def __init__(self, date):
+    def __init__(self, date, portfolio_id: str | None = None):
         self.date = date
-        super().__init__(f"Portfolio state not found for date: {date}")
+        self.portfolio_id = portfolio_id
+        message = f"Portfolio state not found for date: {date}"
+        if portfolio_id is not None:
+            message += f" (portfolio: {portfolio_id})"
+        super().__init__(message)
@@ -1,9 +1,22 @@
 from datetime import date, datetime
 
 from pydantic import BaseModel, Field
-from sqlalchemy import JSON, BigInteger, Column, Date, DateTime, Float, func
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    String,
+    func,
+)
+from sqlalchemy.orm import relationship
 
-from app.database import Base
+from app.database import Base, BigIntegerPrimaryKey
+
+DEFAULT_PORTFOLIO_ID = "default"
 
 
 class Position(BaseModel):
@@ -15,9 +28,11 @@ class Position(BaseModel):
 
 class GetPortfolioStateRequest(BaseModel):
     date: date
+    portfolio_id: str = DEFAULT_PORTFOLIO_ID
 
 
 class PortfolioState(BaseModel):
+    portfolio_id: str = DEFAULT_PORTFOLIO_ID
     date: date
     timestamp: datetime
     positions: list[Position]
@@ -26,6 +41,7 @@ class PortfolioState(BaseModel):
 
 
 class UpdatePortfolioStateRequest(BaseModel):
+    portfolio_id: str = DEFAULT_PORTFOLIO_ID
     date: date
     positions: list[Position]
     cash_balance: float = Field(..., ge=0)
@@ -33,9 +49,30 @@ class UpdatePortfolioStateRequest(BaseModel):
 
 
 class InitiatePortfolioStateRequest(BaseModel):
+    portfolio_id: str = DEFAULT_PORTFOLIO_ID
     initial_cash_balance: float = Field(..., gt=0)
 
 
+class NavPoint(BaseModel):
+    date: date
+    total_value: float
+    cash_balance: float
+
+
+class PositionHistoryEntry(BaseModel):
+    portfolio_id: str
+    date: date
+    timestamp: datetime
+    quantity: float
+    price: float
+    value: float
+
+
+class PositionHistoryResponse(BaseModel):
+    symbol: str
+    history: list[PositionHistoryEntry]
+
+
 class GetPortfolioStateResponse(BaseModel):
     success: bool
     message: str
@@ -50,10 +87,45 @@ class UpdatePortfolioStateResponse(BaseModel):
 class PortfolioStateDB(Base):
     __tablename__ = "portfolio_state_data"
     __description__ = "Portfolio state data"
-
-    id = Column(BigInteger, primary_key=True, index=True)
-    date = Column(Date, default=func.now(), index=True)
-    timestamp = Column(DateTime, default=func.now(), index=True)
-    positions = Column(JSON)
+    __table_args__ = (
+        Index(
+            "ix_portfolio_state_data_portfolio_date_timestamp",
+            "portfolio_id",
+            "date",
+            "timestamp",
+        ),
+    )
+
+    id = Column(BigIntegerPrimaryKey, primary_key=True)
+    portfolio_id = Column(
+        String, nullable=False, default=DEFAULT_PORTFOLIO_ID, server_default="default"
+    )
+    date = Column(Date, default=func.current_date())
+    timestamp = Column(DateTime, default=func.now())
     cash_balance = Column(Float)
     total_value = Column(Float)
+
+    # Written in bulk by the repository, so the relationship is read-only
+    positions = relationship(
+        "PortfolioPositionDB",
+        viewonly=True,
+        order_by="PortfolioPositionDB.symbol",
+    )
+
+
+class PortfolioPositionDB(Base):
+    __tablename__ = "portfolio_position_data"
+    __description__ = "Positions held in a portfolio state"
+    __table_args__ = (
+        Index("ix_portfolio_position_data_symbol_state_id", "symbol", "state_id"),
+    )
+
+    state_id = Column(
+        BigInteger,
+        ForeignKey("portfolio_state_data.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    symbol = Column(String, primary_key=True)
+    quantity = Column(Float, nullable=False)
+    price = Column(Float, nullable=False)
+    value = Column(Float, nullable=False)
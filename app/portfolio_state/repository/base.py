@@ -1,16 +1,52 @@
 from abc import ABC, abstractmethod
 from datetime import date
 
-from app.portfolio_state.models import PortfolioState, Position
+from app.portfolio_state.models import (
+    DEFAULT_PORTFOLIO_ID,
+    NavPoint,
+    PortfolioState,
+    Position,
+    PositionHistoryEntry,
+    UpdatePortfolioStateRequest,
+)
 
 
 class BaseDataRepository(ABC):
     @abstractmethod
-    async def get_latest_portfolio_state(self) -> PortfolioState:
+    async def get_latest_portfolio_state(
+        self, portfolio_id: str = DEFAULT_PORTFOLIO_ID
+    ) -> PortfolioState:
         pass
 
     @abstractmethod
-    async def get_portfolio_state(self, date: date) -> PortfolioState:
+    async def get_latest_portfolio_states(
+        self, portfolio_ids: list[str]
+    ) -> dict[str, PortfolioState]:
+        pass
+
+    @abstractmethod
+    async def get_portfolio_state(
+        self, date: date, portfolio_id: str = DEFAULT_PORTFOLIO_ID
+    ) -> PortfolioState:
+        pass
+
+    @abstractmethod
+    async def get_nav_history(
+        self,
+        start_date: date,
+        end_date: date,
+        portfolio_id: str = DEFAULT_PORTFOLIO_ID,
+    ) -> list[NavPoint]:
+        pass
+
+    @abstractmethod
+    async def get_position_history(
+        self,
+        symbol: str,
+        start_date: date,
+        end_date: date,
+        portfolio_id: str | None = None,
+    ) -> list[PositionHistoryEntry]:
         pass
 
     @abstractmethod
@@ -20,11 +56,18 @@ class BaseDataRepository(ABC):
         positions: list[Position],
         cash_balance: float,
         total_value: float,
-    ) -> None:
+        portfolio_id: str = DEFAULT_PORTFOLIO_ID,
+    ) -> PortfolioState:
+        pass
+
+    @abstractmethod
+    async def update_portfolio_states(
+        self, updates: list[UpdatePortfolioStateRequest]
+    ) -> list[PortfolioState]:
         pass
 
     @abstractmethod
     async def initiate_portfolio_state(
-        self, initial_cash_balance: float
+        self, initial_cash_balance: float, portfolio_id: str = DEFAULT_PORTFOLIO_ID
     ) -> PortfolioState:
         pass
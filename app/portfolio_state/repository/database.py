@@ -1,55 +1,189 @@
 from datetime import date, datetime
 
 from loguru import logger
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, insert
+from sqlalchemy.orm import joinedload
 
+from app.database import SessionBound
+from app.metrics import record_rows
 from app.portfolio_state.exceptions import PortfolioStateNotFoundError
-from app.portfolio_state.models import PortfolioState, PortfolioStateDB, Position
+from app.portfolio_state.models import (
+    DEFAULT_PORTFOLIO_ID,
+    NavPoint,
+    PortfolioPositionDB,
+    PortfolioState,
+    PortfolioStateDB,
+    Position,
+    PositionHistoryEntry,
+    UpdatePortfolioStateRequest,
+)
 
 from .base import BaseDataRepository
 
 
-class DatabaseRepository(BaseDataRepository):
-    def __init__(self, db: Session):
-        self.db = db
+class DatabaseRepository(SessionBound, BaseDataRepository):
+    def _to_portfolio_state(self, db_state: PortfolioStateDB) -> PortfolioState:
+        record_rows(PortfolioStateDB.__tablename__, "read", 1)
+        record_rows(PortfolioPositionDB.__tablename__, "read", len(db_state.positions))
+        return PortfolioState(
+            portfolio_id=db_state.portfolio_id,  # type: ignore
+            date=db_state.date,  # type: ignore
+            timestamp=db_state.timestamp,  # type: ignore
+            positions=[
+                Position(
+                    symbol=pos.symbol,
+                    quantity=pos.quantity,
+                    price=pos.price,
+                    value=pos.value,
+                )
+                for pos in db_state.positions
+            ],
+            cash_balance=db_state.cash_balance,  # type: ignore
+            total_value=db_state.total_value,  # type: ignore
+        )
 
-    async def get_latest_portfolio_state(self) -> PortfolioState:
+    async def get_latest_portfolio_state(
+        self, portfolio_id: str = DEFAULT_PORTFOLIO_ID
+    ) -> PortfolioState:
         latest_state = (
             self.db.query(PortfolioStateDB)
+            .options(joinedload(PortfolioStateDB.positions))
+            .filter(PortfolioStateDB.portfolio_id == portfolio_id)
             .order_by(PortfolioStateDB.date.desc(), PortfolioStateDB.timestamp.desc())
             .first()
         )
 
         if not latest_state:
-            raise PortfolioStateNotFoundError("latest")
+            raise PortfolioStateNotFoundError("latest", portfolio_id)
 
-        return PortfolioState(
-            date=latest_state.date,  # type: ignore
-            timestamp=latest_state.timestamp,  # type: ignore
-            positions=[Position(**pos) for pos in latest_state.positions],  # type: ignore
-            cash_balance=latest_state.cash_balance,  # type: ignore
-            total_value=latest_state.total_value,  # type: ignore
+        return self._to_portfolio_state(latest_state)
+
+    async def get_latest_portfolio_states(
+        self, portfolio_ids: list[str]
+    ) -> dict[str, PortfolioState]:
+        if not portfolio_ids:
+            return {}
+
+        latest_dates = (
+            self.db.query(
+                PortfolioStateDB.portfolio_id,
+                func.max(PortfolioStateDB.date).label("date"),
+            )
+            .filter(PortfolioStateDB.portfolio_id.in_(portfolio_ids))
+            .group_by(PortfolioStateDB.portfolio_id)
+            .subquery()
+        )
+        rows = (
+            self.db.query(PortfolioStateDB)
+            .options(joinedload(PortfolioStateDB.positions))
+            .join(
+                latest_dates,
+                and_(
+                    PortfolioStateDB.portfolio_id == latest_dates.c.portfolio_id,
+                    PortfolioStateDB.date == latest_dates.c.date,
+                ),
+            )
+            .order_by(PortfolioStateDB.timestamp)
+            .all()
         )
+        # Rows are ordered by timestamp, so the newest state of a date wins
+        return {row.portfolio_id: self._to_portfolio_state(row) for row in rows}
 
-    async def get_portfolio_state(self, date: date) -> PortfolioState:
+    async def get_portfolio_state(
+        self, date: date, portfolio_id: str = DEFAULT_PORTFOLIO_ID
+    ) -> PortfolioState:
         portfolio_state = (
             self.db.query(PortfolioStateDB)
-            .filter(PortfolioStateDB.date == date)
+            .options(joinedload(PortfolioStateDB.positions))
+            .filter(
+                PortfolioStateDB.portfolio_id == portfolio_id,
+                PortfolioStateDB.date == date,
+            )
             .order_by(PortfolioStateDB.timestamp.desc())
             .first()
         )
 
         if not portfolio_state:
-            logger.error(f"❌ Portfolio state not found for {date}")
-            raise PortfolioStateNotFoundError(date)
+            logger.error(f"❌ Portfolio state not found for {portfolio_id} on {date}")
+            raise PortfolioStateNotFoundError(date, portfolio_id)
 
-        return PortfolioState(
-            date=portfolio_state.date,  # type: ignore
-            timestamp=portfolio_state.timestamp,  # type: ignore
-            positions=[Position(**pos) for pos in portfolio_state.positions],  # type: ignore
-            cash_balance=portfolio_state.cash_balance,  # type: ignore
-            total_value=portfolio_state.total_value,  # type: ignore
+        return self._to_portfolio_state(portfolio_state)
+
+    async def get_nav_history(
+        self,
+        start_date: date,
+        end_date: date,
+        portfolio_id: str = DEFAULT_PORTFOLIO_ID,
+    ) -> list[NavPoint]:
+        rows = (
+            self.db.query(
+                PortfolioStateDB.date,
+                PortfolioStateDB.total_value,
+                PortfolioStateDB.cash_balance,
+            )
+            .filter(
+                PortfolioStateDB.portfolio_id == portfolio_id,
+                PortfolioStateDB.date >= start_date,
+                PortfolioStateDB.date <= end_date,
+            )
+            .order_by(PortfolioStateDB.date, PortfolioStateDB.timestamp)
+            .all()
         )
+        record_rows(PortfolioStateDB.__tablename__, "read", len(rows))
+        # Rows are ordered by timestamp within a date, so the last one wins
+        latest_by_date = {row.date: row for row in rows}
+        return [
+            NavPoint(
+                date=row.date,
+                total_value=row.total_value,
+                cash_balance=row.cash_balance,
+            )
+            for row in latest_by_date.values()
+        ]
+
+    async def get_position_history(
+        self,
+        symbol: str,
+        start_date: date,
+        end_date: date,
+        portfolio_id: str | None = None,
+    ) -> list[PositionHistoryEntry]:
+        query = (
+            self.db.query(
+                PortfolioStateDB.portfolio_id,
+                PortfolioStateDB.date,
+                PortfolioStateDB.timestamp,
+                PortfolioPositionDB.quantity,
+                PortfolioPositionDB.price,
+                PortfolioPositionDB.value,
+            )
+            .join(PortfolioStateDB, PortfolioStateDB.id == PortfolioPositionDB.state_id)
+            .filter(
+                PortfolioPositionDB.symbol == symbol,
+                PortfolioStateDB.date >= start_date,
+                PortfolioStateDB.date <= end_date,
+            )
+        )
+        if portfolio_id is not None:
+            query = query.filter(PortfolioStateDB.portfolio_id == portfolio_id)
+
+        rows = query.order_by(
+            PortfolioStateDB.portfolio_id,
+            PortfolioStateDB.date,
+            PortfolioStateDB.timestamp,
+        ).all()
+        record_rows(PortfolioPositionDB.__tablename__, "read", len(rows))
+        return [
+            PositionHistoryEntry(
+                portfolio_id=row.portfolio_id,
+                date=row.date,
+                timestamp=row.timestamp,
+                quantity=row.quantity,
+                price=row.price,
+                value=row.value,
+            )
+            for row in rows
+        ]
 
     async def update_portfolio_state(
         self,
@@ -57,37 +191,94 @@ class DatabaseRepository(BaseDataRepository):
         positions: list[Position],
         cash_balance: float,
         total_value: float,
-    ) -> None:
+        portfolio_id: str = DEFAULT_PORTFOLIO_ID,
+    ) -> PortfolioState:
+        [portfolio_state] = await self.update_portfolio_states(
+            [
+                UpdatePortfolioStateRequest(
+                    portfolio_id=portfolio_id,
+                    date=date,
+                    positions=positions,
+                    cash_balance=cash_balance,
+                    total_value=total_value,
+                )
+            ]
+        )
+        return portfolio_state
+
+    async def update_portfolio_states(
+        self, updates: list[UpdatePortfolioStateRequest]
+    ) -> list[PortfolioState]:
+        db_items = [self._upsert_state(update) for update in updates]
+
+        position_rows = [
+            {"state_id": db_item.id, **pos.model_dump()}
+            for db_item, update in zip(db_items, updates, strict=True)
+            for pos in update.positions
+        ]
+        if position_rows:
+            self.db.execute(insert(PortfolioPositionDB), position_rows)
+        self.db.commit()
+        logger.info(f"✅ Portfolio state updated for {len(updates)} portfolio(s)")
+
+        portfolio_states = []
+        for db_item, update in zip(db_items, updates, strict=True):
+            self.db.refresh(db_item)
+            portfolio_states.append(
+                PortfolioState(
+                    portfolio_id=update.portfolio_id,
+                    date=db_item.date,  # type: ignore
+                    timestamp=db_item.timestamp,  # type: ignore
+                    positions=sorted(update.positions, key=lambda pos: pos.symbol),
+                    cash_balance=db_item.cash_balance,  # type: ignore
+                    total_value=db_item.total_value,  # type: ignore
+                )
+            )
+        return portfolio_states
+
+    def _upsert_state(self, update: UpdatePortfolioStateRequest) -> PortfolioStateDB:
         db_item = (
             self.db.query(PortfolioStateDB)
-            .filter(PortfolioStateDB.date == date)
+            .filter(
+                PortfolioStateDB.portfolio_id == update.portfolio_id,
+                PortfolioStateDB.date == update.date,
+            )
             .first()
         )
         if db_item:
-            db_item.positions = [pos.model_dump() for pos in positions]  # type: ignore
-            db_item.cash_balance = cash_balance  # type: ignore
-            db_item.total_value = total_value  # type: ignore
+            db_item.cash_balance = update.cash_balance  # type: ignore
+            db_item.total_value = update.total_value  # type: ignore
             db_item.timestamp = datetime.now()  # type: ignore
+            self.db.query(PortfolioPositionDB).filter(
+                PortfolioPositionDB.state_id == db_item.id
+            ).delete(synchronize_session=False)
         else:
             db_item = PortfolioStateDB(
-                date=date,
-                positions=[pos.model_dump() for pos in positions],
-                cash_balance=cash_balance,
-                total_value=total_value,
+                portfolio_id=update.portfolio_id,
+                date=update.date,
+                cash_balance=update.cash_balance,
+                total_value=update.total_value,
             )
             self.db.add(db_item)
-        self.db.commit()
-        logger.info(f"✅ Portfolio state updated for {date}")
+            self.db.flush()
+        return db_item
 
     async def initiate_portfolio_state(
-        self, initial_cash_balance: float
+        self, initial_cash_balance: float, portfolio_id: str = DEFAULT_PORTFOLIO_ID
     ) -> PortfolioState:
-        logger.info("🔄 Dropping and recreating portfolio state table")
-        PortfolioStateDB.__table__.drop(self.db.bind)
-        PortfolioStateDB.__table__.create(self.db.bind)
+        logger.info(f"🔄 Clearing portfolio state history for {portfolio_id}")
+        state_ids = self.db.query(PortfolioStateDB.id).filter(
+            PortfolioStateDB.portfolio_id == portfolio_id
+        )
+        self.db.query(PortfolioPositionDB).filter(
+            PortfolioPositionDB.state_id.in_(state_ids.scalar_subquery())
+        ).delete(synchronize_session=False)
+        self.db.query(PortfolioStateDB).filter(
+            PortfolioStateDB.portfolio_id == portfolio_id
+        ).delete(synchronize_session=False)
 
         db_item = PortfolioStateDB(
-            positions=[],
+            portfolio_id=portfolio_id,
             cash_balance=initial_cash_balance,
             total_value=initial_cash_balance,
         )
@@ -97,10 +288,11 @@ class DatabaseRepository(BaseDataRepository):
 
         now = datetime.now()
         logger.info(
-            f"✨ Portfolio state initiated at {now} with cash balance {initial_cash_balance}"
+            f"✨ Portfolio state {portfolio_id} initiated at {now} with cash balance {initial_cash_balance}"
         )
 
         return PortfolioState(
+            portfolio_id=portfolio_id,
             date=db_item.date,  # type: ignore
             timestamp=db_item.timestamp,  # type: ignore
             positions=[],
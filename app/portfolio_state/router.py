@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
+from app.http_cache import PORTFOLIO_CACHE_CONTROL, Validators
+from app.portfolio_state.cache import version_scope
 from app.portfolio_state.exceptions import PortfolioStateNotFoundError
 from app.portfolio_state.models import (
+    DEFAULT_PORTFOLIO_ID,
     GetPortfolioStateRequest,
     GetPortfolioStateResponse,
     InitiatePortfolioStateRequest,
+    PositionHistoryResponse,
     UpdatePortfolioStateRequest,
     UpdatePortfolioStateResponse,
 )
@@ -14,29 +20,40 @@ from app.portfolio_state.service import PortfolioStateService
 
 router = APIRouter()
 
+portfolio_state_service = PortfolioStateService()
+
 
 async def get_portfolio_state_service(db: Session = Depends(get_db)):
-    service = PortfolioStateService(db)
-    return service
+    return portfolio_state_service
 
 
 @router.get("/get_latest_portfolio_state", response_model=GetPortfolioStateResponse)
 async def get_latest_portfolio_state(
+    request: Request,
+    response: Response,
+    portfolio_id: str = DEFAULT_PORTFOLIO_ID,
     portfolio_state_service: PortfolioStateService = Depends(
         get_portfolio_state_service
     ),
 ):
+    validators = Validators.for_scopes([version_scope(portfolio_id)], "latest")
+    if validators.matches(request):
+        return validators.not_modified(PORTFOLIO_CACHE_CONTROL)
+
     try:
-        portfolio_state = await portfolio_state_service.get_latest_portfolio_state()
-        return GetPortfolioStateResponse(
-            success=True,
-            message="Latest portfolio state retrieved successfully",
-            data=portfolio_state,
+        portfolio_state = await portfolio_state_service.get_latest_portfolio_state(
+            portfolio_id
         )
     except PortfolioStateNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    response.headers.update(validators.headers(PORTFOLIO_CACHE_CONTROL))
+    return GetPortfolioStateResponse(
+        success=True,
+        message="Latest portfolio state retrieved successfully",
+        data=portfolio_state,
+    )
 
 
 @router.get("/get_portfolio_state", response_model=GetPortfolioStateResponse)
@@ -59,6 +76,24 @@ async def get_portfolio_state(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/position_history/{symbol}", response_model=PositionHistoryResponse)
+async def get_position_history(
+    symbol: str,
+    start_date: date,
+    end_date: date,
+    portfolio_id: str | None = None,
+    portfolio_state_service: PortfolioStateService = Depends(
+        get_portfolio_state_service
+    ),
+):
+    try:
+        return await portfolio_state_service.get_position_history(
+            symbol, start_date, end_date, portfolio_id
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.put("/update_portfolio_state", response_model=UpdatePortfolioStateResponse)
 async def update_portfolio_state(
     request: UpdatePortfolioStateRequest,
@@ -1,11 +1,17 @@
+from datetime import date
+
 from loguru import logger
 from sqlalchemy.orm import Session
 
+from . import cache
 from .exceptions import PortfolioStateNotFoundError
 from .models import (
+    DEFAULT_PORTFOLIO_ID,
     GetPortfolioStateRequest,
     InitiatePortfolioStateRequest,
+    NavPoint,
     PortfolioState,
+    PositionHistoryResponse,
     UpdatePortfolioStateRequest,
 )
 from .repository.base import BaseDataRepository
@@ -13,13 +19,24 @@ from .repository.database import DatabaseRepository
 
 
 class PortfolioStateService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session | None = None):
         self.db_repo: BaseDataRepository = DatabaseRepository(db)
 
-    async def get_latest_portfolio_state(self) -> PortfolioState:
-        logger.info("🔎 Querying latest portfolio state")
+    async def get_latest_portfolio_state(
+        self, portfolio_id: str = DEFAULT_PORTFOLIO_ID
+    ) -> PortfolioState:
+        cached_state = cache.get_cached_latest_state(portfolio_id)
+        if cached_state:
+            logger.info(f"✅ Cache hit for latest portfolio state of {portfolio_id}")
+            return cached_state
+
+        logger.info(f"🔎 Querying latest portfolio state of {portfolio_id}")
         try:
-            return await self.db_repo.get_latest_portfolio_state()
+            portfolio_state = await self.db_repo.get_latest_portfolio_state(
+                portfolio_id
+            )
+            cache.cache_state(portfolio_state, is_latest=True)
+            return portfolio_state
         except PortfolioStateNotFoundError as e:
             logger.error(f"Portfolio state not found: {str(e)}")
             logger.warning("Check if the portfolio state has been initiated")
@@ -28,12 +45,44 @@ class PortfolioStateService:
             logger.error(f"Error retrieving latest portfolio state: {str(e)}")
             raise
 
+    async def get_latest_portfolio_states(
+        self, portfolio_ids: list[str]
+    ) -> dict[str, PortfolioState]:
+        portfolio_states: dict[str, PortfolioState] = {}
+        for portfolio_id in portfolio_ids:
+            cached_state = cache.get_cached_latest_state(portfolio_id)
+            if cached_state:
+                portfolio_states[portfolio_id] = cached_state
+
+        missing = [i for i in portfolio_ids if i not in portfolio_states]
+        logger.info(
+            f"🔎 {len(portfolio_states)} cached, querying {len(missing)} latest portfolio states"
+        )
+        try:
+            loaded = await self.db_repo.get_latest_portfolio_states(missing)
+        except Exception as e:
+            logger.error(f"Error retrieving latest portfolio states: {str(e)}")
+            raise
+        for portfolio_state in loaded.values():
+            cache.cache_state(portfolio_state, is_latest=True)
+        portfolio_states.update(loaded)
+        return portfolio_states
+
     async def get_portfolio_state(
         self, req: GetPortfolioStateRequest
     ) -> PortfolioState:
-        logger.info(f"🔎 Querying portfolio state for {req.date}")
+        cached_state = cache.get_cached_state(req.portfolio_id, req.date)
+        if cached_state:
+            logger.info(f"✅ Cache hit for portfolio state on {req.date}")
+            return cached_state
+
+        logger.info(f"🔎 Querying portfolio state of {req.portfolio_id} for {req.date}")
         try:
-            return await self.db_repo.get_portfolio_state(req.date)
+            portfolio_state = await self.db_repo.get_portfolio_state(
+                req.date, req.portfolio_id
+            )
+            cache.cache_state(portfolio_state)
+            return portfolio_state
         except PortfolioStateNotFoundError as e:
             logger.error(f"Portfolio state not found: {str(e)}")
             raise
@@ -41,12 +90,56 @@ class PortfolioStateService:
             logger.error(f"Error retrieving portfolio state: {str(e)}")
             raise
 
-    async def update_portfolio_state(self, req: UpdatePortfolioStateRequest) -> None:
-        logger.info("🔎 Updating portfolio state")
+    async def get_nav_history(
+        self,
+        start_date: date,
+        end_date: date,
+        portfolio_id: str = DEFAULT_PORTFOLIO_ID,
+    ) -> list[NavPoint]:
+        logger.info(
+            f"🔎 Querying NAV history of {portfolio_id} from {start_date} to {end_date}"
+        )
+        try:
+            nav_history = await self.db_repo.get_nav_history(
+                start_date, end_date, portfolio_id
+            )
+        except Exception as e:
+            logger.error(f"Error retrieving NAV history: {str(e)}")
+            raise
+        if not nav_history:
+            raise PortfolioStateNotFoundError(
+                f"{start_date} to {end_date}", portfolio_id
+            )
+        return nav_history
+
+    async def get_position_history(
+        self,
+        symbol: str,
+        start_date: date,
+        end_date: date,
+        portfolio_id: str | None = None,
+    ) -> PositionHistoryResponse:
+        logger.info(f"🔎 Querying {symbol} positions from {start_date} to {end_date}")
         try:
-            await self.db_repo.update_portfolio_state(
-                req.date, req.positions, req.cash_balance, req.total_value
+            history = await self.db_repo.get_position_history(
+                symbol, start_date, end_date, portfolio_id
             )
+            return PositionHistoryResponse(symbol=symbol, history=history)
+        except Exception as e:
+            logger.error(f"Error retrieving position history: {str(e)}")
+            raise
+
+    async def update_portfolio_state(self, req: UpdatePortfolioStateRequest) -> None:
+        await self.update_portfolio_states([req])
+
+    async def update_portfolio_states(
+        self, reqs: list[UpdatePortfolioStateRequest]
+    ) -> None:
+        logger.info(f"🔎 Updating {len(reqs)} portfolio state(s)")
+        try:
+            portfolio_states = await self.db_repo.update_portfolio_states(reqs)
+            for portfolio_state in portfolio_states:
+                cache.write_through(portfolio_state)
         except Exception as e:
             logger.error(f"Error updating portfolio state: {str(e)}")
             raise
@@ -55,10 +148,14 @@ class PortfolioStateService:
         self, req: InitiatePortfolioStateRequest
     ) -> PortfolioState:
         logger.info(
-            f"🔎 Initiating portfolio state with cash balance: {req.initial_cash_balance}"
+            f"🔎 Initiating portfolio state {req.portfolio_id} with cash balance: {req.initial_cash_balance}"
         )
         try:
-            return await self.db_repo.initiate_portfolio_state(req.initial_cash_balance)
+            portfolio_state = await self.db_repo.initiate_portfolio_state(
+                req.initial_cash_balance, req.portfolio_id
+            )
+            cache.reset_cache(portfolio_state)
+            return portfolio_state
         except Exception as e:
             logger.error(f"Error initiating portfolio state: {str(e)}")
             raise
@@ -0,0 +1,120 @@
+import cProfile
+import hmac
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from pathlib import Path
+
+from fastapi import Request, Response
+from loguru import logger
+
+from .config import settings
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+PROFILE_QUERY_PARAM = "profile"
+# Opting in with this value also saves a cProfile artifact of the request
+FULL_PROFILE = "full"
+
+# Stage name -> [total seconds, calls] for the request being profiled, if any
+_stage_timings: ContextVar[dict[str, list[float]] | None] = ContextVar(
+    "stage_timings", default=None
+)
+# cProfile hooks the whole interpreter thread, so only one capture at a time;
+# a capture also records the requests that run concurrently with it
+_capture_lock = threading.Lock()
+
+
+def record_stage_timing(stage: str, seconds: float) -> None:
+    timings = _stage_timings.get()
+    if timings is None:
+        return
+    entry = timings.setdefault(stage, [0.0, 0])
+    entry[0] += seconds
+    entry[1] += 1
+
+
+def _requested_mode(request: Request) -> str | None:
+    mode = request.headers.get(PROFILE_HEADER) or request.query_params.get(
+        PROFILE_QUERY_PARAM
+    )
+    if not mode or mode.lower() in ("0", "false", "no"):
+        return None
+    return mode.lower()
+
+
+def _may_capture(request: Request) -> bool:
+    # Captures write files on the server, so they are not open to every client
+    token = request.headers.get(PROFILE_TOKEN_HEADER)
+    return bool(
+        settings.profiling_token
+        and token
+        and hmac.compare_digest(token, settings.profiling_token)
+    )
+
+
+def format_server_timing(timings: dict[str, list[float]], total: float) -> str:
+    entries = [
+        f'{stage};dur={seconds * 1000:.2f};desc="{int(calls)} calls"'
+        for stage, (seconds, calls) in sorted(
+            timings.items(), key=lambda item: item[1][0], reverse=True
+        )
+    ]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+def _save_profile(profiler: cProfile.Profile, request: Request) -> Path:
+    directory = Path(settings.profiling_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    route = request.url.path.strip("/").replace("/", "_") or "root"
+    path = directory / f"{route}-{int(time.time())}-{uuid.uuid4().hex[:8]}.prof"
+    profiler.dump_stats(path)
+    _remove_old_profiles(directory)
+    return path
+
+
+def _remove_old_profiles(directory: Path) -> None:
+    artifacts = sorted(directory.glob("*.prof"), key=lambda p: p.stat().st_mtime)
+    for path in artifacts[: max(len(artifacts) - settings.profiling_max_artifacts, 0)]:
+        path.unlink(missing_ok=True)
+
+
+async def profile_request(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    mode = _requested_mode(request)
+    if mode is None:
+        return await call_next(request)
+
+    profiler = None
+    if mode == FULL_PROFILE and not _may_capture(request):
+        logger.warning("⏱️ Full profile requested without a valid token, skipping it")
+    elif mode == FULL_PROFILE and _capture_lock.acquire(blocking=False):
+        profiler = cProfile.Profile()
+    elif mode == FULL_PROFILE:
+        logger.warning("⏱️ Another request is being profiled, skipping the artifact")
+
+    timings: dict[str, list[float]] = {}
+    token = _stage_timings.set(timings)
+    start = time.perf_counter()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        response = await call_next(request)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            _capture_lock.release()
+        _stage_timings.reset(token)
+    total = time.perf_counter() - start
+
+    response.headers["Server-Timing"] = format_server_timing(timings, total)
+    if profiler is not None:
+        path = _save_profile(profiler, request)
+        # Only the name: the server's directory layout is not the client's business
+        response.headers["X-Profile-Artifact"] = path.name
+        logger.info(f"⏱️ Saved profile of {request.url.path} to {path}")
+    return response
@@ -0,0 +1,18 @@
+from collections.abc import Callable
+from typing import Any
+
+# Receives the name of each pipeline stage as it completes, with JSON-ready
+# details such as counts or per-symbol results
+ProgressCallback = Callable[[str, dict[str, Any]], None]
+
+SYMBOLS_SCREENED = "symbols_screened"
+SYMBOL_FETCHED = "symbol_fetched"
+DATA_FETCHED = "data_fetched"
+SIGNALS_COMPUTED = "signals_computed"
+ORDERS_BUILT = "orders_built"
+STATE_WRITTEN = "state_written"
+
+
+def report(on_progress: ProgressCallback | None, stage: str, **details: Any) -> None:
+    if on_progress is not None:
+        on_progress(stage, details)
@@ -0,0 +1,25 @@
+from loguru import logger
+from sqlalchemy.engine import Engine
+
+from app.database import Base, engine
+
+
+def import_models() -> None:
+    # Model modules register their tables on Base.metadata when imported
+    import app.data.models  # noqa: F401
+    import app.portfolio_state.models  # noqa: F401
+    import app.strategy.models  # noqa: F401
+
+
+def create_schema(bind: Engine = engine) -> None:
+    """Create missing tables straight from the models, for local runs and tests.
+
+    Deployed databases are managed by the alembic migrations instead.
+    """
+    import_models()
+    Base.metadata.create_all(bind=bind)
+    logger.info("🗄️ Database schema created")
+
+
+if __name__ == "__main__":
+    create_schema()
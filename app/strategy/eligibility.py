@@ -0,0 +1,83 @@
+from datetime import date
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.data.calendar import nyse_calendar
+from app.data.models import StockData
+from app.database import SessionBound
+
+from .models import UniverseEligibilityDB
+from .panel import PricePanel
+from .strategy_interface import Strategy
+
+
+class EligibilityIndex(SessionBound):
+    def __init__(self, strategy: Strategy, db: Session | None = None):
+        if not strategy.supports_eligibility_index:
+            raise ValueError(f"{strategy!r} does not support an eligibility index")
+        super().__init__(db)
+        self.strategy = strategy
+
+    async def update(self, stock_data: StockData, interval: str = "1d") -> None:
+        """Ingest hook: indexes the filters of every daily bar in ``stock_data``."""
+        # The index holds one row per session; other bars would replace them
+        if interval != "1d":
+            return
+        window = self.strategy.filter_window
+        panel = PricePanel.from_history(stock_data, window)
+        if not len(panel):
+            logger.info(
+                f"⏭️ Not enough bars to index eligibility for {stock_data.symbol}"
+            )
+            return
+
+        filters = self.strategy.evaluate_filters(panel)
+        eligible = filters.eligible
+        dates = [point.date for point in stock_data.data_points[window - 1 :]]
+        rows = [
+            {
+                "symbol": stock_data.symbol,
+                "date": bar_date,
+                "passes_gap": bool(filters.passes_gap[i]),
+                "passes_moving_average": bool(filters.passes_moving_average[i]),
+                "passes_momentum": bool(filters.passes_momentum[i]),
+                "eligible": bool(eligible[i]),
+                "momentum_score": float(filters.momentum_score[i]),
+            }
+            for i, bar_date in enumerate(dates)
+        ]
+
+        self.db.query(UniverseEligibilityDB).filter(
+            UniverseEligibilityDB.symbol == stock_data.symbol,
+            UniverseEligibilityDB.date >= dates[0],
+            UniverseEligibilityDB.date <= dates[-1],
+        ).delete(synchronize_session=False)
+        self.db.bulk_insert_mappings(UniverseEligibilityDB, rows)  # type: ignore
+        self.db.commit()
+        logger.info(
+            f"🗂️ Indexed eligibility for {stock_data.symbol} on {len(rows)} dates"
+        )
+
+    async def get_disqualified(self, symbols: list[str], as_of: date) -> set[str]:
+        """Symbols whose bar on the last session before ``as_of`` fails a filter.
+
+        Signal windows end before ``as_of``, so that session's row holds exactly
+        the filters a full computation would evaluate. Symbols without a row for
+        it (not indexed yet, or no bar that session) are not returned, so
+        callers still load and score them in full.
+        """
+        if not symbols:
+            return set()
+
+        session = nyse_calendar().window_start(as_of, 1)
+        rows = (
+            self.db.query(UniverseEligibilityDB.symbol)
+            .filter(
+                UniverseEligibilityDB.symbol.in_(symbols),
+                UniverseEligibilityDB.date == session,
+                UniverseEligibilityDB.eligible.is_(False),
+            )
+            .all()
+        )
+        return {row.symbol for row in rows}
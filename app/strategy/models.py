@@ -1,7 +1,20 @@
 from datetime import date
 from enum import Enum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+    func,
+)
+
+from app.database import Base
 
 
 class MarketRegime(Enum):
@@ -39,3 +52,103 @@ class SignalRequest(BaseModel):
 
 class SignalResponse(BaseModel):
     signals: list[StockSignal]
+
+
+class RankedSymbol(BaseModel):
+    symbol: str
+    momentum_score: float
+
+
+class TopSignalsRequest(BaseModel):
+    symbols: list[str]
+    k: int = Field(20, ge=1)
+
+
+class TopSignalsResponse(BaseModel):
+    # Also keys the stored per-date rankings of the universe
+    ranking_id: str
+    ranked: list[RankedSymbol]
+
+
+class UniverseEligibilityDB(Base):
+    __tablename__ = "universe_eligibility"
+    __description__ = "Per-symbol, per-date strategy filter results"
+    __table_args__ = (
+        Index("ix_universe_eligibility_date_eligible", "date", "eligible"),
+    )
+
+    symbol = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    passes_gap = Column(Boolean, nullable=False)
+    passes_moving_average = Column(Boolean, nullable=False)
+    passes_momentum = Column(Boolean, nullable=False)
+    eligible = Column(Boolean, nullable=False)
+    momentum_score = Column(Float)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class SignalRankingDB(Base):
+    __tablename__ = "signal_rankings"
+    __description__ = "Per-date ranking of a universe from each signal run"
+    # Pages by date walk (date, run, rank); pages by symbol walk (symbol,
+    # date), so neither recomputes or sorts past rankings
+    __table_args__ = (
+        Index(
+            "ix_signal_rankings_date_run_rank",
+            "date",
+            "ranking_id",
+            "interval",
+            "market_index",
+            "rank",
+        ),
+        Index("ix_signal_rankings_symbol_date", "symbol", "date"),
+    )
+
+    # Strategy, parameters and universe, as used by the maintained rankings;
+    # runs on other bars or against another index are ranked separately
+    ranking_id = Column(String, primary_key=True)
+    interval = Column(String, primary_key=True)
+    market_index = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    symbol = Column(String, primary_key=True)
+    # 1-based; eligible symbols come first, then the other scored symbols,
+    # each by descending score, then the symbols that were never scored
+    rank = Column(Integer, nullable=False)
+    selected = Column(Boolean, nullable=False)
+    eligible = Column(Boolean, nullable=False)
+    passes_gap = Column(Boolean)
+    passes_moving_average = Column(Boolean)
+    passes_momentum = Column(Boolean)
+    momentum_score = Column(Float)
+    risk_unit = Column(Float)
+    current_price = Column(Float)
+    # Why an ineligible symbol was held back: the failed checks, or why it
+    # was never scored (screened by the eligibility index, no data)
+    reason = Column(String)
+    created_at = Column(DateTime, default=func.now())
+
+
+class RankingEntry(BaseModel):
+    ranking_id: str
+    interval: str
+    market_index: str
+    date: date
+    symbol: str
+    rank: int
+    selected: bool
+    eligible: bool
+    passes_gap: bool | None = None
+    passes_moving_average: bool | None = None
+    passes_momentum: bool | None = None
+    momentum_score: float | None = None
+    risk_unit: float | None = None
+    current_price: float | None = None
+    reason: str | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class RankingPage(BaseModel):
+    entries: list[RankingEntry]
+    # Offset of the next page, None on the last one
+    next_offset: int | None = None
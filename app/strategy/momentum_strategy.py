@@ -10,22 +10,42 @@ from app.strategy.models import (
     StockSignal,
     StrategyParameters,
 )
+from app.strategy.panel import PanelFilters, PanelSignals, PricePanel
+from app.strategy.registry import register_strategy
 from app.strategy.strategy_interface import Strategy
 from app.strategy.utils import (
     calculate_atr,
+    calculate_atrs,
     calculate_momentum_score,
+    calculate_momentum_scores,
     calculate_moving_average,
+    calculate_moving_averages,
     has_recent_large_gap,
+    have_recent_large_gaps,
 )
 
 
+@register_strategy("momentum")
 class MomentumStrategy(Strategy):
+    supports_panel = True
+    supports_eligibility_index = True
+    # Bars needed by the filters: 100-day MA, 90-bar momentum and gap windows
+    filter_window = 100
+    # ATR and gap filters need the full range bar, the regime filter only closes
+    price_fields = ("open", "high", "low", "close")
+    index_fields = ("close",)
+
     def __init__(self, params: StrategyParameters):
         self.params = params
 
     def __repr__(self):
         return f"MomentumStrategy({self.params})"
 
+    @property
+    def price_window(self) -> int:
+        # Momentum and gap checks compare against the bar before the lookback
+        return max(self.filter_window, self.params.lookback_period + 1)
+
     def generate_signals(
         self,
         stock_data: dict[str, StockData],
@@ -45,6 +65,52 @@ class MomentumStrategy(Strategy):
 
         return self._sort_and_filter_signals(signals)
 
+    def generate_panel_signals(
+        self, panel: PricePanel, index_data: StockData
+    ) -> PanelSignals:
+        regime = self.detect_market_regime(index_data)
+        logger.info(f"⛳️ Market regime is {regime.name}")
+
+        filters = self.evaluate_filters(panel)
+        atr = calculate_atrs(panel.high, panel.low, panel.close, 20)
+
+        eligible = filters.eligible
+        if regime == MarketRegime.BEAR:
+            logger.info("🐻 Market regime is bearish, no signals generated")
+            eligible[:] = False
+        logger.info(f"✅ {int(eligible.sum())}/{len(panel)} symbols qualified")
+
+        return PanelSignals(
+            symbols=panel.symbols,
+            eligible=eligible,
+            momentum_score=filters.momentum_score,
+            risk_unit=np.nan_to_num(atr, nan=0.0) * self.params.risk_factor,
+            current_price=panel.last_close,
+            filters=filters,
+        )
+
+    def evaluate_filters(self, panel: PricePanel) -> PanelFilters:
+        current_price = panel.last_close
+        momentum_score = calculate_momentum_scores(panel.close, lookback=90)
+        moving_average = calculate_moving_averages(panel.close, 100)
+        large_gap = have_recent_large_gaps(
+            panel.open, panel.close, lookback_period=90, threshold=0.15
+        )
+
+        # NaN comparisons are False, so short histories never pass
+        return PanelFilters(
+            passes_gap=~large_gap,
+            passes_moving_average=current_price >= moving_average,
+            passes_momentum=momentum_score >= 0,
+            momentum_score=momentum_score,
+        )
+
+    def select_signals(self, panel_signals: PanelSignals) -> list[StockSignal]:
+        logger.info("🔍 Sorting and filtering signals")
+        top_count = self._top_count(int(panel_signals.eligible.sum()))
+        logger.info(f"👑 Top {top_count} signals selected")
+        return panel_signals.to_signals(top_count)
+
     def _generate_signal(
         self,
         symbol: str,
@@ -105,11 +171,14 @@ class MomentumStrategy(Strategy):
         logger.info("🔍 Sorting and filtering signals")
         sorted_signals = sorted(signals, key=lambda x: x.momentum_score, reverse=True)
         logger.info(f"🧹 Sorted signals: {[i.symbol for i in sorted_signals]}")
-        self.params.top_percentage = 1.0
-        top_count = int(len(sorted_signals) * self.params.top_percentage)
+        top_count = self._top_count(len(sorted_signals))
         logger.info(f"👑 Top {top_count} signals selected")
         return sorted_signals[:top_count]
 
+    def _top_count(self, n_signals: int) -> int:
+        self.params.top_percentage = 1.0
+        return int(n_signals * self.params.top_percentage)
+
     def calculate_risk(self, stock_data: StockData) -> float:
         atr = calculate_atr(stock_data, 20)
         if atr is None:
@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.data.models import StockData
+
+from .models import SignalType, StockSignal
+
+
+@dataclass
+class PricePanel:
+    """OHLCV bars for a whole universe as aligned ``(n_symbols, n_bars)`` arrays.
+
+    Rows are right-aligned on each symbol's latest bar, so column ``-1`` is the
+    most recent bar of every symbol. Shorter histories are left-padded with NaN
+    and ``lengths`` holds the number of real bars per row.
+    """
+
+    symbols: list[str]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    lengths: np.ndarray
+
+    @classmethod
+    def from_stock_data(cls, stock_data: dict[str, StockData]) -> "PricePanel":
+        symbols = list(stock_data)
+        lengths = np.array(
+            [len(stock_data[s].data_points) for s in symbols], dtype=np.int64
+        )
+        n_bars = int(lengths.max()) if len(lengths) else 0
+        fields = {
+            name: np.full((len(symbols), n_bars), np.nan)
+            for name in ("open", "high", "low", "close", "volume")
+        }
+
+        for row, symbol in enumerate(symbols):
+            points = stock_data[symbol].data_points
+            if not points:
+                continue
+            values = np.array(
+                [(p.open, p.high, p.low, p.close, p.volume) for p in points],
+                dtype=np.float64,
+            )
+            for col, name in enumerate(fields):
+                fields[name][row, n_bars - len(points) :] = values[:, col]
+
+        return cls(symbols=symbols, lengths=lengths, **fields)
+
+    @classmethod
+    def from_history(cls, stock_data: StockData, window: int) -> "PricePanel":
+        """One row per bar of a single symbol, holding the ``window`` bars up to it.
+
+        Lets panel functions evaluate every date of a history in one pass. Bars
+        with fewer than ``window`` bars of history are skipped.
+        """
+        points = stock_data.data_points
+        n_rows = max(len(points) - window + 1, 0)
+        if n_rows == 0:
+            return cls.from_stock_data({})
+
+        values = np.array(
+            [(p.open, p.high, p.low, p.close, p.volume) for p in points],
+            dtype=np.float64,
+        )
+        windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+
+        return cls(
+            symbols=[stock_data.symbol] * n_rows,
+            open=windows[:, 0],
+            high=windows[:, 1],
+            low=windows[:, 2],
+            close=windows[:, 3],
+            volume=windows[:, 4],
+            lengths=np.full(n_rows, window, dtype=np.int64),
+        )
+
+    @property
+    def last_close(self) -> np.ndarray:
+        if not self.close.size:
+            return np.full(len(self), np.nan)
+        return self.close[:, -1]
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+
+@dataclass
+class PanelFilters:
+    passes_gap: np.ndarray
+    passes_moving_average: np.ndarray
+    passes_momentum: np.ndarray
+    momentum_score: np.ndarray
+
+    @property
+    def eligible(self) -> np.ndarray:
+        return self.passes_gap & self.passes_moving_average & self.passes_momentum
+
+
+@dataclass
+class PanelSignals:
+    symbols: list[str]
+    eligible: np.ndarray
+    momentum_score: np.ndarray
+    risk_unit: np.ndarray
+    current_price: np.ndarray
+    # Per-filter results behind ``eligible``, when the strategy reports them
+    filters: PanelFilters | None = None
+
+    def disqualification_reasons(self) -> dict[str, list[str]]:
+        """Names of the checks each ineligible symbol failed."""
+        reasons = {}
+        for i in np.flatnonzero(~self.eligible):
+            if self.filters is None:
+                failed = ["filters"]
+            else:
+                failed = [
+                    name
+                    for name in ("gap", "moving_average", "momentum")
+                    if not getattr(self.filters, f"passes_{name}")[i]
+                ]
+            # Symbols that pass every filter are only held back by the regime
+            reasons[self.symbols[i]] = failed or ["market_regime"]
+        return reasons
+
+    def to_signals(self, top_count: int | None = None) -> list[StockSignal]:
+        # Stable sort keeps input order for ties, like sorted(..., reverse=True)
+        candidates = np.flatnonzero(self.eligible)
+        order = candidates[np.argsort(-self.momentum_score[candidates], kind="stable")]
+        if top_count is not None:
+            order = order[:top_count]
+
+        return [
+            StockSignal(
+                symbol=self.symbols[i],
+                signal=SignalType.BUY,
+                risk_unit=float(self.risk_unit[i]),
+                momentum_score=float(self.momentum_score[i]),
+                current_price=float(self.current_price[i]),
+            )
+            for i in order
+        ]
@@ -0,0 +1,162 @@
+import hashlib
+import json
+from collections.abc import Iterable
+
+import numpy as np
+from loguru import logger
+from pydantic import BaseModel
+
+from app import cache
+from app.data.models import StockData
+
+from .models import RankedSymbol
+from .panel import PanelFilters, PricePanel
+from .strategy_interface import Strategy
+
+RANKING_PREFIX = "ranking:"
+UNIVERSES_PREFIX = "ranking_universes:"
+
+
+def _decode(member: bytes | str) -> str:
+    return member.decode() if isinstance(member, bytes) else member
+
+
+def universe_digest(symbols: Iterable[str]) -> str:
+    payload = json.dumps(sorted(set(symbols)))
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def params_digest(params: BaseModel) -> str:
+    payload = json.dumps(params.model_dump(), sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def ranking_id(strategy_name: str, params: BaseModel, symbols: Iterable[str]) -> str:
+    """Identifies the ranking of a universe under one strategy configuration."""
+    return f"{strategy_name}:{params_digest(params)}:{universe_digest(symbols)}"
+
+
+class SignalRanking:
+    """Eligible symbols of a universe ranked by momentum score, kept current as
+    bars are ingested.
+
+    One Redis sorted set per (strategy, parameters, universe) holds the score
+    of every symbol whose latest bar passes the filters. A second sorted set
+    holds the ordinal date of the bar each symbol was scored on, and a set per
+    symbol lists the rankings it belongs to, so an ingest touches only the
+    symbols it saved.
+    """
+
+    def __init__(self, strategy: Strategy, strategy_name: str):
+        if not strategy.supports_eligibility_index:
+            raise ValueError(f"{strategy!r} does not support a maintained ranking")
+        self.strategy = strategy
+        self.strategy_name = strategy_name
+
+    def ranking_id(self, symbols: Iterable[str]) -> str:
+        # Parameters are part of the id, so reconfiguring starts a new ranking
+        return ranking_id(self.strategy_name, self.strategy.params, symbols)
+
+    def _scores_key(self, ranking_id: str) -> str:
+        return f"{RANKING_PREFIX}{ranking_id}"
+
+    def _as_of_key(self, ranking_id: str) -> str:
+        return f"{RANKING_PREFIX}{ranking_id}:as_of"
+
+    def _apply(
+        self,
+        ranking_id: str,
+        symbols: list[str],
+        as_of: list[int],
+        filters: PanelFilters,
+    ) -> int:
+        """Writes the scores of bars newer than the stored ones; returns how many."""
+        client = cache.redis_client
+        stored = {
+            _decode(member): score
+            for member, score in client.zrange(
+                self._as_of_key(ranking_id), 0, -1, withscores=True
+            )
+        }
+        eligible = filters.eligible
+        pipe = client.pipeline(transaction=False)
+        updated = 0
+        for i, symbol in enumerate(symbols):
+            # Backfills of older history never replace a newer score
+            if stored.get(symbol, -1) > as_of[i]:
+                continue
+            pipe.zadd(self._as_of_key(ranking_id), {symbol: as_of[i]})
+            if eligible[i] and np.isfinite(filters.momentum_score[i]):
+                pipe.zadd(
+                    self._scores_key(ranking_id),
+                    {symbol: float(filters.momentum_score[i])},
+                )
+            else:
+                pipe.zrem(self._scores_key(ranking_id), symbol)
+            updated += 1
+        pipe.execute()
+        return updated
+
+    async def refresh(self, universe: list[str], stock_data: dict[str, StockData]):
+        """Registers ``universe`` and scores it from bars already loaded for it."""
+        ranking_id = self.ranking_id(universe)
+        client = cache.redis_client
+        if not client.exists(self._as_of_key(ranking_id)):
+            pipe = client.pipeline(transaction=False)
+            for symbol in set(universe):
+                pipe.sadd(f"{UNIVERSES_PREFIX}{symbol}", ranking_id)
+            pipe.execute()
+
+        scored = {s: d for s, d in stock_data.items() if d.data_points}
+        if not scored:
+            return
+        panel = PricePanel.from_stock_data(scored)
+        filters = self.strategy.evaluate_filters(panel)
+        as_of = [d.data_points[-1].date.toordinal() for d in scored.values()]
+        updated = self._apply(ranking_id, panel.symbols, as_of, filters)
+        logger.info(
+            f"🏆 Refreshed {updated}/{len(scored)} symbols of ranking {ranking_id}"
+        )
+
+    async def update(self, stock_data: StockData, interval: str = "1d") -> None:
+        """Ingest hook: rescores one symbol in every current ranking holding it."""
+        # Rankings score daily closes; other bars would pass for newer days
+        if interval != "1d":
+            return
+        prefix = f"{self.strategy_name}:{params_digest(self.strategy.params)}:"
+        members = cache.redis_client.smembers(f"{UNIVERSES_PREFIX}{stock_data.symbol}")
+        ranking_ids = [
+            _decode(member) for member in members if _decode(member).startswith(prefix)
+        ]
+        if not ranking_ids:
+            return
+
+        # Only the latest bar is ranked, so only its window is evaluated
+        window = self.strategy.filter_window
+        latest = StockData(
+            symbol=stock_data.symbol, data_points=stock_data.data_points[-window:]
+        )
+        panel = PricePanel.from_history(latest, window)
+        if not len(panel):
+            return
+        filters = self.strategy.evaluate_filters(panel)
+        as_of = [latest.data_points[-1].date.toordinal()]
+        for ranking_id in ranking_ids:
+            self._apply(ranking_id, panel.symbols, as_of, filters)
+        logger.info(f"🏆 Rescored {stock_data.symbol} in {len(ranking_ids)} rankings")
+
+    def top(self, universe: list[str], k: int) -> list[RankedSymbol] | None:
+        """The ``k`` highest scoring eligible symbols, None for an unknown universe."""
+        ranking_id = self.ranking_id(universe)
+        client = cache.redis_client
+        if not client.exists(self._as_of_key(ranking_id)):
+            return None
+        return [
+            RankedSymbol(
+                symbol=_decode(member),
+                momentum_score=score,
+            )
+            for member, score in client.zrevrange(
+                self._scores_key(ranking_id), 0, k - 1, withscores=True
+            )
+        ]
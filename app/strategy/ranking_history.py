@@ -0,0 +1,141 @@
+import math
+from datetime import date
+
+import numpy as np
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.database import SessionBound
+
+from .models import (
+    RankingEntry,
+    RankingPage,
+    SignalRankingDB,
+    SignalRequest,
+    StockSignal,
+)
+from .panel import PanelSignals
+
+
+def _optional_float(value: float) -> float | None:
+    return None if math.isnan(value) else float(value)
+
+
+class RankingHistory(SessionBound):
+    """Every signal run's full ranking, stored per date for later research."""
+
+    def __init__(self, db: Session | None = None):
+        super().__init__(db)
+
+    def save(
+        self,
+        ranking_id: str,
+        request: SignalRequest,
+        panel_signals: PanelSignals,
+        signals: list[StockSignal],
+        unscored: dict[str, str],
+    ) -> None:
+        """Stores one run: every scored symbol, then those in ``unscored``
+        (symbol to the reason it never reached scoring)."""
+        run = {
+            "ranking_id": ranking_id,
+            "interval": request.interval,
+            "market_index": request.market_index,
+            "date": request.date,
+        }
+        # Eligible first, then by descending score with NaN scores last; ties
+        # keep universe order like PanelSignals.to_signals
+        score = np.nan_to_num(-panel_signals.momentum_score, nan=np.inf)
+        order = np.lexsort((score, ~panel_signals.eligible))
+        selected = {signal.symbol for signal in signals}
+        reasons = panel_signals.disqualification_reasons()
+        filters = panel_signals.filters
+        rows = [
+            {
+                **run,
+                "symbol": panel_signals.symbols[i],
+                "rank": rank,
+                "selected": panel_signals.symbols[i] in selected,
+                "eligible": bool(panel_signals.eligible[i]),
+                "passes_gap": (bool(filters.passes_gap[i]) if filters else None),
+                "passes_moving_average": (
+                    bool(filters.passes_moving_average[i]) if filters else None
+                ),
+                "passes_momentum": (
+                    bool(filters.passes_momentum[i]) if filters else None
+                ),
+                "momentum_score": _optional_float(panel_signals.momentum_score[i]),
+                "risk_unit": _optional_float(panel_signals.risk_unit[i]),
+                "current_price": _optional_float(panel_signals.current_price[i]),
+                "reason": ",".join(reasons.get(panel_signals.symbols[i], [])) or None,
+            }
+            for rank, i in enumerate(order, start=1)
+        ]
+        rows.extend(
+            {
+                **run,
+                "symbol": symbol,
+                "rank": rank,
+                "selected": False,
+                "eligible": False,
+                "reason": reason,
+            }
+            for rank, (symbol, reason) in enumerate(
+                unscored.items(), start=len(rows) + 1
+            )
+        )
+        if not rows:
+            return
+
+        # A rerun of the same run and date replaces the earlier ranking
+        self.db.query(SignalRankingDB).filter_by(**run).delete(
+            synchronize_session=False
+        )
+        self.db.bulk_insert_mappings(SignalRankingDB, rows)  # type: ignore
+        self.db.commit()
+        logger.info(f"🗄️ Stored {len(rows)} rankings of {ranking_id} for {request.date}")
+
+    def get_page(
+        self,
+        ranking_date: date | None = None,
+        symbol: str | None = None,
+        ranking_id: str | None = None,
+        interval: str | None = None,
+        market_index: str | None = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> RankingPage:
+        """Rankings on a date in rank order, or of a symbol from the latest date."""
+        query = self.db.query(SignalRankingDB)
+        run = {
+            "ranking_id": ranking_id,
+            "interval": interval,
+            "market_index": market_index,
+        }
+        query = query.filter_by(**{k: v for k, v in run.items() if v is not None})
+        if symbol is not None:
+            query = query.filter(SignalRankingDB.symbol == symbol)
+            if ranking_date is not None:
+                query = query.filter(SignalRankingDB.date == ranking_date)
+            query = query.order_by(
+                SignalRankingDB.date.desc(),
+                SignalRankingDB.ranking_id,
+                SignalRankingDB.interval,
+                SignalRankingDB.market_index,
+            )
+        elif ranking_date is not None:
+            query = query.filter(SignalRankingDB.date == ranking_date).order_by(
+                SignalRankingDB.ranking_id,
+                SignalRankingDB.interval,
+                SignalRankingDB.market_index,
+                SignalRankingDB.rank,
+            )
+        else:
+            raise ValueError("Rankings are queried by date, by symbol or both")
+
+        # One extra row tells whether another page follows
+        rows = query.offset(offset).limit(limit + 1).all()
+        return RankingPage(
+            entries=[RankingEntry.model_validate(row) for row in rows[:limit]],
+            next_offset=offset + limit if len(rows) > limit else None,
+        )
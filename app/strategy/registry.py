@@ -0,0 +1,37 @@
+from collections.abc import Callable
+
+from .models import StrategyParameters
+from .strategy_interface import Strategy
+
+_STRATEGIES: dict[str, type[Strategy]] = {}
+
+
+def register_strategy(name: str) -> Callable[[type[Strategy]], type[Strategy]]:
+    def decorator(cls: type[Strategy]) -> type[Strategy]:
+        if name in _STRATEGIES and _STRATEGIES[name] is not cls:
+            raise ValueError(f"Strategy '{name}' is already registered")
+        _STRATEGIES[name] = cls
+        return cls
+
+    return decorator
+
+
+def _load_builtin_strategies() -> None:
+    # Importing here registers the built-in strategies without a circular import
+    from . import momentum_strategy  # noqa: F401
+
+
+def get_strategy(name: str, params: StrategyParameters | None = None) -> Strategy:
+    _load_builtin_strategies()
+    try:
+        strategy_cls = _STRATEGIES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown strategy '{name}'. Available: {available_strategies()}"
+        )
+    return strategy_cls(params or StrategyParameters())  # type: ignore
+
+
+def available_strategies() -> list[str]:
+    _load_builtin_strategies()
+    return sorted(_STRATEGIES)
@@ -1,25 +1,35 @@
+from datetime import date
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.data.router import get_data_service
+from app.config import settings
+from app.data.exceptions import SymbolUnavailableError
+from app.data.router import data_service
 from app.database import get_db
 
-from .models import SignalRequest, SignalResponse, StrategyParameters
+from .models import (
+    RankingPage,
+    SignalRequest,
+    SignalResponse,
+    StrategyParameters,
+    TopSignalsRequest,
+    TopSignalsResponse,
+)
+from .registry import available_strategies
 from .service import StrategyService
+from .stream import signal_events
 
 router = APIRouter()
 
 
 class StrategyServiceProvider:
     def __init__(self):
-        self.strategy_service = None
+        self.strategy_service = StrategyService(data_service, settings.strategy)
 
     def get_strategy_service(self, db: Session = Depends(get_db)):
-        if self.strategy_service is None:
-            data_service = get_data_service(db)
-            self.strategy_service = StrategyService(data_service)
         return self.strategy_service
 
 
@@ -33,7 +43,67 @@ async def generate_signals(
         strategy_service_provider.get_strategy_service
     ),
 ):
-    return await strategy_service.generate_signals(request)
+    try:
+        return await strategy_service.generate_signals(request)
+    except SymbolUnavailableError as e:
+        # Only the market index raises; universe symbols are skipped
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/generate_signals/stream")
+async def stream_signals(
+    request: SignalRequest,
+    http_request: Request,
+    strategy_service: StrategyService = Depends(
+        strategy_service_provider.get_strategy_service
+    ),
+):
+    # Progress events as the run goes, then the signals; errors after the
+    # stream has started arrive as an error event instead of a status code
+    return StreamingResponse(
+        signal_events(strategy_service, request, http_request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/top_signals", response_model=TopSignalsResponse)
+async def top_signals(
+    request: TopSignalsRequest,
+    strategy_service: StrategyService = Depends(
+        strategy_service_provider.get_strategy_service
+    ),
+):
+    ranked = strategy_service.top_signals(request.symbols, request.k)
+    if ranked is None:
+        raise HTTPException(
+            status_code=404,
+            detail="No ranking for this universe yet; generate signals for it first",
+        )
+    return TopSignalsResponse(
+        ranking_id=strategy_service.ranking_id(request.symbols), ranked=ranked
+    )
+
+
+@router.get("/rankings", response_model=RankingPage)
+async def get_rankings(
+    ranking_date: date | None = Query(None, alias="date"),
+    symbol: str | None = None,
+    ranking_id: str | None = None,
+    interval: str | None = None,
+    market_index: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    strategy_service: StrategyService = Depends(
+        strategy_service_provider.get_strategy_service
+    ),
+):
+    try:
+        return strategy_service.get_rankings(
+            ranking_date, symbol, ranking_id, interval, market_index, limit, offset
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/configure_strategy")
@@ -62,3 +132,8 @@ async def get_strategy_parameters(
         return strategy_service.get_strategy_parameters()
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/available_strategies", response_model=list[str])
+async def get_available_strategies():
+    return available_strategies()
@@ -1,48 +1,237 @@
-from datetime import timedelta
+import hashlib
+import json
+from datetime import date, timedelta
 from typing import Any
 
 from loguru import logger
 
+from app.cache import get_cache_entry, get_versions, schedule_refresh, set_cache_entry
+from app.data.calendar import nyse_calendar
 from app.data.models import BatchStockRequest
-from app.data.service import DataService
-from app.strategy.models import SignalRequest, SignalResponse, StrategyParameters
-from app.strategy.momentum_strategy import MomentumStrategy
+from app.data.service import DataService, version_scope
+from app.database import background_session_scope
+from app.metrics import (
+    FEATURE_COMPUTATION,
+    SIGNAL_RANKING,
+    record_cache_lookup,
+    timed,
+)
+from app.progress import (
+    DATA_FETCHED,
+    SIGNALS_COMPUTED,
+    SYMBOLS_SCREENED,
+    ProgressCallback,
+    report,
+)
+from app.strategy.eligibility import EligibilityIndex
+from app.strategy.models import (
+    RankedSymbol,
+    RankingPage,
+    SignalRequest,
+    SignalResponse,
+)
+from app.strategy.panel import PricePanel
+from app.strategy.ranking import SignalRanking, ranking_id
+from app.strategy.ranking_history import RankingHistory
+from app.strategy.registry import get_strategy
 
 
 class StrategyService:
-    def __init__(self, data_service: DataService):
+    def __init__(self, data_service: DataService, strategy_name: str = "momentum"):
         self.data_service = data_service
-        self.strategy = MomentumStrategy(StrategyParameters())
+        self.strategy_name = strategy_name
+        self.strategy = get_strategy(strategy_name)
+        self.ranking_history = RankingHistory()
+        self.eligibility_index: EligibilityIndex | None = None
+        self.ranking: SignalRanking | None = None
+        if self.strategy.supports_eligibility_index:
+            self.eligibility_index = EligibilityIndex(self.strategy)
+            self.ranking = SignalRanking(self.strategy, strategy_name)
+            data_service.register_ingest_hook(self.eligibility_index.update)
+            # Saved bars rescore only their own symbols in the rankings
+            data_service.register_ingest_hook(self.ranking.update)
 
-    async def generate_signals(self, request: SignalRequest) -> SignalResponse:
-        start_date = request.date - timedelta(
-            days=max(
-                self.strategy.params.lookback_period,
-                self.strategy.params.market_regime_period,
-            )
+    async def generate_signals(
+        self, request: SignalRequest, on_progress: ProgressCallback | None = None
+    ) -> SignalResponse:
+        cache_key = self._signal_cache_key(request)
+        cached_signals, stale = get_cache_entry(cache_key)
+        record_cache_lookup("signals", cached_signals is not None)
+        if cached_signals is not None:
+            logger.info(f"✅ Cache hit for signals {cache_key}")
+            if stale:
+                schedule_refresh(
+                    "signals",
+                    cache_key,
+                    lambda: self._refresh_signals(cache_key, request),
+                )
+            report(on_progress, DATA_FETCHED, cached=True)
+            report(on_progress, SIGNALS_COMPUTED, cached=True)
+            return SignalResponse.model_validate_json(cached_signals)
+
+        response = await self._generate_signals(request, on_progress)
+        set_cache_entry(cache_key, response.model_dump_json())
+        return response
+
+    async def _refresh_signals(self, cache_key: str, request: SignalRequest) -> None:
+        # Runs after the request that scheduled it, so it needs its own session
+        with background_session_scope():
+            response = await self._generate_signals(request)
+        set_cache_entry(cache_key, response.model_dump_json())
+
+    def _signal_cache_key(self, request: SignalRequest) -> str:
+        # Signals depend only on the universe, date and strategy parameters, so
+        # every portfolio rebalanced with the same inputs shares one computation.
+        # The data versions make newly saved bars of any input a new key.
+        symbols = sorted(set(request.symbols))
+        payload = json.dumps(
+            {
+                "symbols": symbols,
+                "versions": get_versions(
+                    [
+                        version_scope(symbol)
+                        for symbol in [*symbols, request.market_index]
+                    ]
+                ),
+                "date": str(request.date),
+                "interval": request.interval,
+                "market_index": request.market_index,
+                "params": self.strategy.params.model_dump(),
+            },
+            sort_keys=True,
         )
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        return f"signals:{self.strategy_name}:{digest}"
+
+    def _window_start(self, request: SignalRequest, bars: int) -> date:
+        if request.interval == "1d":
+            return nyse_calendar().window_start(request.date, bars)
+        # Intraday and weekly bars are not on the daily session calendar;
+        # calendar days over-fetch for those
+        return request.date - timedelta(days=bars)
+
+    async def _generate_signals(
+        self, request: SignalRequest, on_progress: ProgressCallback | None = None
+    ) -> SignalResponse:
+        # Exactly the bars each input needs: the regime filter reads a longer
+        # index history than the per-symbol filters
+        index_start = self._window_start(request, self.strategy.index_window)
+        start_date = self._window_start(request, self.strategy.price_window)
         logger.info(
             f"📶 Signal request for {request.symbols} from {start_date} to {request.date}"
         )
         index_data = await self.data_service.get_stock_data(
             symbol=request.market_index,
-            start_date=start_date,
+            start_date=index_start,
             end_date=request.date,
             interval=request.interval,
+            fields=self.strategy.index_fields,
         )
+        screened = await self._screen_symbols(request, on_progress)
         batch_request = BatchStockRequest(
-            symbols=request.symbols,
+            symbols=screened,
             start_date=start_date,
             end_date=request.date,
             interval=request.interval,
+            fields=self.strategy.price_fields,
+        )
+        batch_stock_data = await self.data_service.get_batch_stock_data(
+            batch_request, on_progress
         )
-        batch_stock_data = await self.data_service.get_batch_stock_data(batch_request)
-        signals = self.strategy.generate_signals(
-            batch_stock_data.stock_data, index_data
+        report(
+            on_progress,
+            DATA_FETCHED,
+            loaded=len(batch_stock_data.stock_data),
+            errors=batch_stock_data.errors or {},
         )
 
+        if self.strategy.supports_panel:
+            with timed(FEATURE_COMPUTATION):
+                panel = PricePanel.from_stock_data(batch_stock_data.stock_data)
+                panel_signals = self.strategy.generate_panel_signals(panel, index_data)
+            with timed(SIGNAL_RANKING):
+                signals = self.strategy.select_signals(panel_signals)
+            # Symbols that never reached scoring are stored with the reason
+            kept = set(screened)
+            unscored = {
+                symbol: "eligibility_index"
+                for symbol in request.symbols
+                if symbol not in kept
+            }
+            for symbol, error in (batch_stock_data.errors or {}).items():
+                unscored[symbol] = f"unavailable: {error}"
+            self.ranking_history.save(
+                self.ranking_id(request.symbols),
+                request,
+                panel_signals,
+                signals,
+                unscored,
+            )
+            report(
+                on_progress,
+                SIGNALS_COMPUTED,
+                scored=len(panel),
+                eligible=int(panel_signals.eligible.sum()),
+                selected=len(signals),
+                disqualified=panel_signals.disqualification_reasons(),
+            )
+        else:
+            # The scalar path scores and ranks in one call
+            with timed(FEATURE_COMPUTATION):
+                signals = self.strategy.generate_signals(
+                    batch_stock_data.stock_data, index_data
+                )
+            report(
+                on_progress,
+                SIGNALS_COMPUTED,
+                scored=len(batch_stock_data.stock_data),
+                selected=len(signals),
+            )
+
+        if self.ranking is not None and request.interval == "1d":
+            await self.ranking.refresh(request.symbols, batch_stock_data.stock_data)
+
         return SignalResponse(signals=signals)
 
+    async def _screen_symbols(
+        self, request: SignalRequest, on_progress: ProgressCallback | None = None
+    ) -> list[str]:
+        # The index holds daily bars only
+        if self.eligibility_index is None or request.interval != "1d":
+            return request.symbols
+
+        disqualified = await self.eligibility_index.get_disqualified(
+            request.symbols, request.date
+        )
+        logger.info(
+            f"🗂️ Eligibility index disqualified {len(disqualified)}/{len(request.symbols)} symbols"
+        )
+        report(on_progress, SYMBOLS_SCREENED, disqualified=sorted(disqualified))
+        return [symbol for symbol in request.symbols if symbol not in disqualified]
+
+    def ranking_id(self, symbols: list[str]) -> str:
+        return ranking_id(self.strategy_name, self.strategy.params, symbols)
+
+    def get_rankings(
+        self,
+        ranking_date: date | None = None,
+        symbol: str | None = None,
+        ranking_id: str | None = None,
+        interval: str | None = None,
+        market_index: str | None = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> RankingPage:
+        return self.ranking_history.get_page(
+            ranking_date, symbol, ranking_id, interval, market_index, limit, offset
+        )
+
+    def top_signals(self, symbols: list[str], k: int) -> list[RankedSymbol] | None:
+        """Top ``k`` of a universe's maintained ranking, without loading any bars."""
+        if self.ranking is None:
+            return None
+        return self.ranking.top(symbols, k)
+
     def configure_strategy(self, params: dict[str, Any]) -> None:
         self.strategy.set_parameters(params)
 
@@ -3,16 +3,55 @@ from typing import Any
 
 from app.data.models import StockData
 
-from .models import MarketRegime, StockSignal
+from .models import MarketRegime, StockSignal, StrategyParameters
+from .panel import PanelFilters, PanelSignals, PricePanel
 
 
 class Strategy(ABC):
+    params: StrategyParameters
+
+    # Strategies that implement generate_panel_signals set this to True so that
+    # StrategyService scores the whole universe in one vectorized pass.
+    supports_panel: bool = False
+    # Strategies that implement evaluate_filters can keep a precomputed
+    # per-symbol eligibility index up to date as bars are ingested.
+    supports_eligibility_index: bool = False
+    filter_window: int = 0
+    # Price fields read for the universe and the market index; None reads all
+    price_fields: tuple[str, ...] | None = None
+    index_fields: tuple[str, ...] | None = None
+
+    @property
+    def price_window(self) -> int:
+        """Bars of history each symbol needs for a signal."""
+        return self.params.lookback_period
+
+    @property
+    def index_window(self) -> int:
+        """Bars of market index history the regime filter needs."""
+        return self.params.market_regime_period
+
     @abstractmethod
     def generate_signals(
         self, stock_data: dict[str, StockData], index_data: StockData
     ) -> list[StockSignal]:
         pass
 
+    def generate_panel_signals(
+        self, panel: PricePanel, index_data: StockData
+    ) -> PanelSignals:
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support panel signal generation"
+        )
+
+    def evaluate_filters(self, panel: PricePanel) -> PanelFilters:
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support eligibility filters"
+        )
+
+    def select_signals(self, panel_signals: PanelSignals) -> list[StockSignal]:
+        return panel_signals.to_signals()
+
     @abstractmethod
     def calculate_risk(self, stock_data: StockData) -> float:
         pass
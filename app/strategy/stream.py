@@ -0,0 +1,74 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from loguru import logger
+
+from app.data.exceptions import SymbolUnavailableError
+from app.database import background_session_scope
+
+from .models import SignalRequest
+from .service import StrategyService
+
+SIGNALS_EVENT = "signals"
+ERROR_EVENT = "error"
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def signal_events(
+    strategy_service: StrategyService,
+    request: SignalRequest,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    poll_interval: float = 1.0,
+) -> AsyncIterator[str]:
+    """Server-sent events for one signal run: each progress stage as it
+    completes, then the signals or an error.
+
+    The run is cancelled as soon as the client goes away, so abandoned
+    streams stop fetching and scoring.
+    """
+    queue: asyncio.Queue[tuple[str, dict[str, Any]] | None] = asyncio.Queue()
+    # The request's session is closed once streaming starts
+    with background_session_scope():
+        task = asyncio.ensure_future(
+            strategy_service.generate_signals(
+                request,
+                on_progress=lambda stage, details: queue.put_nowait((stage, details)),
+            )
+        )
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), poll_interval)
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        logger.info("🔌 Client disconnected, cancelling signals")
+                        return
+                    # A comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    break
+                yield sse_event(*item)
+
+            try:
+                response = task.result()
+            except SymbolUnavailableError as e:
+                yield sse_event(ERROR_EVENT, {"status_code": 404, "detail": str(e)})
+                return
+            except Exception as e:
+                logger.error(f"Streamed signal generation failed: {str(e)}")
+                yield sse_event(
+                    ERROR_EVENT,
+                    {"status_code": 500, "detail": "Signal generation failed"},
+                )
+                return
+            yield sse_event(SIGNALS_EVENT, response.model_dump(mode="json"))
+        finally:
+            # Also covers the response itself being cancelled on disconnect
+            task.cancel()
@@ -1,7 +1,6 @@
 from functools import lru_cache
 
 import numpy as np
-from sklearn.linear_model import LinearRegression
 
 from app.data.models import StockData, StockDataPoint
 
@@ -12,15 +11,9 @@ def calculate_momentum_score(prices: np.ndarray, lookback: int = 90) -> float:
             f"Insufficient data points. Expected at least {lookback}, got {len(prices)}"
         )
 
-    prices = prices[-lookback:]
-    log_returns = np.diff(np.log(prices))
-    x = np.arange(len(log_returns)).reshape(-1, 1)
-
-    model = LinearRegression().fit(x, log_returns)
-    r_value = model.score(x, log_returns)
-    slope = model.coef_[0]
-
-    return float(slope * (r_value**2))
+    # Closed-form least squares; fitting a scikit-learn model per symbol was
+    # slower and made importing the strategy pull in all of scikit-learn
+    return float(calculate_momentum_scores(prices[-lookback:], lookback)[0])
 
 
 @lru_cache(maxsize=128)
@@ -62,3 +55,69 @@ def has_recent_large_gap(
 
     gaps = np.abs(opens - closes) / closes
     return np.any(gaps > threshold)
+
+
+# Vectorized counterparts operating on (n_symbols, n_bars) panels. Rows without
+# enough history yield NaN (or False for boolean filters) instead of raising.
+
+
+def calculate_momentum_scores(prices: np.ndarray, lookback: int = 90) -> np.ndarray:
+    prices = np.atleast_2d(prices)
+    if prices.shape[1] < lookback:
+        return np.full(prices.shape[0], np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_returns = np.diff(np.log(prices[:, -lookback:]), axis=1)
+        x = np.arange(log_returns.shape[1], dtype=np.float64)
+        x_centered = x - x.mean()
+        y_centered = log_returns - log_returns.mean(axis=1, keepdims=True)
+
+        sxx = np.sum(x_centered**2)
+        sxy = y_centered @ x_centered
+        syy = np.sum(y_centered**2, axis=1)
+
+        slope = sxy / sxx
+        r_value = np.where(syy > 0, sxy**2 / (sxx * syy), 1.0)
+
+    return slope * (r_value**2)
+
+
+def calculate_moving_averages(prices: np.ndarray, period: int) -> np.ndarray:
+    prices = np.atleast_2d(prices)
+    if prices.shape[1] < period:
+        return np.full(prices.shape[0], np.nan)
+    # Plain mean: NaN-padded rows are short histories and must stay NaN
+    return prices[:, -period:].mean(axis=1)
+
+
+def calculate_atrs(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14
+) -> np.ndarray:
+    high, low, close = np.atleast_2d(high, low, close)
+    if close.shape[1] < period + 1:
+        return np.full(close.shape[0], np.nan)
+
+    high = high[:, -period - 1 :]
+    low = low[:, -period - 1 :]
+    close = close[:, -period - 1 :]
+
+    tr1 = high[:, 1:] - low[:, 1:]
+    tr2 = np.abs(high[:, 1:] - close[:, :-1])
+    tr3 = np.abs(low[:, 1:] - close[:, :-1])
+
+    return np.max(np.stack([tr1, tr2, tr3]), axis=0).mean(axis=1)
+
+
+def have_recent_large_gaps(
+    opens: np.ndarray, closes: np.ndarray, lookback_period: int, threshold: float
+) -> np.ndarray:
+    opens, closes = np.atleast_2d(opens, closes)
+    n_bars = closes.shape[1]
+    if n_bars < 2:
+        return np.zeros(closes.shape[0], dtype=bool)
+
+    window = min(lookback_period, n_bars - 1)
+    prev_closes = closes[:, -window - 1 : -1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gaps = np.abs(opens[:, -window:] - prev_closes) / prev_closes
+    return np.any(gaps > threshold, axis=1)
@@ -0,0 +1,322 @@
+"""Load harness: serves main.app against local stand-ins and drives the API.
+
+    python loadtest.py --concurrency 16 --duration 30
+
+By default the app runs on a temporary SQLite database, the in-memory Redis
+substitute and the synthetic data source, so no external service is needed.
+Pass --database-url to load a local Postgres instead.
+"""
+
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+
+import click
+import httpx
+import numpy as np
+
+SCENARIOS = ("data_batch", "generate_signals", "rebalance", "portfolio_summary")
+MARKET_INDEX = "^GSPC"
+
+
+@dataclass
+class ScenarioStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    error_samples: list[str] = field(default_factory=list)
+
+    def record(self, seconds: float, error: str | None = None) -> None:
+        self.latencies.append(seconds)
+        if error is not None:
+            self.errors += 1
+            if len(self.error_samples) < 3:
+                self.error_samples.append(error)
+
+
+def summarize(stats: ScenarioStats, elapsed: float) -> dict[str, float]:
+    latencies = np.array(stats.latencies) * 1000
+    requests = len(latencies)
+    p50, p95, p99 = (
+        np.percentile(latencies, [50, 95, 99]) if requests else (np.nan,) * 3
+    )
+    return {
+        "requests": requests,
+        "errors": stats.errors,
+        "error_rate": stats.errors / requests if requests else 0.0,
+        "throughput_rps": requests / elapsed if elapsed else 0.0,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(latencies.max()) if requests else float("nan"),
+    }
+
+
+@dataclass
+class Workload:
+    symbols: list[str]
+    portfolio_ids: list[str]
+    as_of: date
+    batch_size: int
+
+    def request(self, scenario: str, rng: random.Random) -> tuple[str, str, dict]:
+        if scenario == "data_batch":
+            return (
+                "POST",
+                "/api/v1/data/batch",
+                {
+                    "json": {
+                        "symbols": rng.sample(self.symbols, self.batch_size),
+                        "start_date": str(self.as_of - timedelta(days=365)),
+                        "end_date": str(self.as_of),
+                        "interval": "1d",
+                    }
+                },
+            )
+        if scenario == "generate_signals":
+            return (
+                "POST",
+                "/api/v1/strategy/generate_signals",
+                {"json": self._signal_payload()},
+            )
+        if scenario == "rebalance":
+            return (
+                "POST",
+                "/api/v1/portfolio/rebalance",
+                {"json": self._rebalance_payload(rng.choice(self.portfolio_ids))},
+            )
+        if scenario == "portfolio_summary":
+            return (
+                "GET",
+                f"/api/v1/portfolio/summary/{self.as_of}",
+                {"params": {"portfolio_id": rng.choice(self.portfolio_ids)}},
+            )
+        raise ValueError(f"Unknown scenario: {scenario}")
+
+    def _signal_payload(self) -> dict:
+        return {
+            "symbols": self.symbols,
+            "date": str(self.as_of),
+            "interval": "1d",
+            "market_index": MARKET_INDEX,
+        }
+
+    def _rebalance_payload(self, portfolio_id: str) -> dict:
+        return {"portfolio_id": portfolio_id, **self._signal_payload()}
+
+
+def _response_error(scenario: str, response: httpx.Response) -> str | None:
+    if response.status_code >= 400:
+        return f"HTTP {response.status_code}: {response.text[:200]}"
+    # Rebalance reports failures in the body with a 200
+    if scenario == "rebalance" and not response.json().get("success", False):
+        return response.json().get("message", "rebalance failed")
+    return None
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    scenario: str,
+    rng: random.Random,
+) -> tuple[float, str | None]:
+    method, url, kwargs = workload.request(scenario, rng)
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        error = _response_error(scenario, response)
+    except httpx.HTTPError as e:
+        error = f"{type(e).__name__}: {e}"
+    return time.perf_counter() - start, error
+
+
+async def _prepare(client: httpx.AsyncClient, workload: Workload) -> None:
+    for portfolio_id in workload.portfolio_ids:
+        response = await client.post(
+            "/api/v1/portfolio_state/initiate_portfolio_state",
+            json={"portfolio_id": portfolio_id, "initial_cash_balance": 1_000_000},
+        )
+        response.raise_for_status()
+    # A first rebalance gives every portfolio a state on the as-of date
+    for portfolio_id in workload.portfolio_ids:
+        response = await client.post(
+            "/api/v1/portfolio/rebalance",
+            json=workload._rebalance_payload(portfolio_id),
+        )
+        response.raise_for_status()
+
+
+async def run_load(
+    base_url: str,
+    workload: Workload,
+    scenarios: tuple[str, ...],
+    concurrency: int,
+    duration: float,
+    max_requests: int | None,
+    seed: int,
+) -> tuple[dict[str, ScenarioStats], float]:
+    stats = {scenario: ScenarioStats() for scenario in scenarios}
+    sent = 0
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=120, limits=limits
+    ) as client:
+        await _prepare(client, workload)
+        deadline = time.perf_counter() + duration
+
+        async def worker(worker_id: int) -> None:
+            nonlocal sent
+            rng = random.Random(seed + worker_id)
+            while time.perf_counter() < deadline:
+                if max_requests is not None and sent >= max_requests:
+                    return
+                sent += 1
+                scenario = rng.choice(scenarios)
+                seconds, error = await _send(client, workload, scenario, rng)
+                stats[scenario].record(seconds, error)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return stats, elapsed
+
+
+def _configure_environment(database_url: str | None, workdir: Path) -> None:
+    # Settings are read when the app is imported, so this must come first
+    os.environ["POSTGRES_URL"] = database_url or f"sqlite:///{workdir / 'load.db'}"
+    os.environ.setdefault("REDIS_URL", "memory://")
+    os.environ.setdefault("DATA_SOURCE", "synthetic")
+    os.environ.setdefault("CREATE_SCHEMA_ON_STARTUP", "true")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ServerThread:
+    def __init__(self, port: int):
+        import uvicorn
+
+        from main import app
+
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self) -> "ServerThread":
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("API server failed to start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+def _print_report(report: dict[str, dict[str, float]], concurrency: int) -> None:
+    click.echo(f"\nConcurrency {concurrency}")
+    header = f"{'scenario':<20}{'requests':>10}{'errors':>8}{'err %':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    click.echo(header)
+    click.echo("-" * len(header))
+    for scenario, row in report.items():
+        click.echo(
+            f"{scenario:<20}{row['requests']:>10}{row['errors']:>8}"
+            f"{row['error_rate'] * 100:>8.1f}{row['throughput_rps']:>9.1f}"
+            f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+        )
+
+
+@click.command()
+@click.option("--concurrency", "-c", default=8, show_default=True)
+@click.option("--duration", "-d", default=30.0, show_default=True, help="Seconds")
+@click.option("--max-requests", type=int, help="Stop after this many requests")
+@click.option(
+    "--scenario",
+    "scenarios",
+    multiple=True,
+    type=click.Choice(SCENARIOS),
+    help="Scenarios to mix uniformly (default: all)",
+)
+@click.option("--symbols", "n_symbols", default=50, show_default=True)
+@click.option("--batch-size", default=10, show_default=True)
+@click.option("--portfolios", "n_portfolios", default=4, show_default=True)
+@click.option("--as-of", type=click.DateTime(["%Y-%m-%d"]), help="Default: today")
+@click.option("--database-url", help="Default: a temporary SQLite database")
+@click.option("--seed", default=0, show_default=True)
+@click.option("--log-level", default="WARNING", show_default=True)
+@click.option("--output", type=click.Path(dir_okay=False), help="Write JSON report")
+def main(
+    concurrency: int,
+    duration: float,
+    max_requests: int | None,
+    scenarios: tuple[str, ...],
+    n_symbols: int,
+    batch_size: int,
+    n_portfolios: int,
+    as_of,
+    database_url: str | None,
+    seed: int,
+    log_level: str,
+    output: str | None,
+) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        _configure_environment(database_url, Path(workdir))
+
+        from loguru import logger
+
+        logger.remove()
+        logger.add(sys.stderr, level=log_level)
+
+        workload = Workload(
+            symbols=[f"SYN{i:04d}" for i in range(n_symbols)],
+            portfolio_ids=[f"load-{i}" for i in range(n_portfolios)],
+            as_of=as_of.date() if as_of else date.today(),
+            batch_size=min(batch_size, n_symbols),
+        )
+        port = _free_port()
+        with ServerThread(port):
+            stats, elapsed = asyncio.run(
+                run_load(
+                    f"http://127.0.0.1:{port}",
+                    workload,
+                    scenarios or SCENARIOS,
+                    concurrency,
+                    duration,
+                    max_requests,
+                    seed,
+                )
+            )
+
+    total = ScenarioStats()
+    for scenario_stats in stats.values():
+        total.latencies.extend(scenario_stats.latencies)
+        total.errors += scenario_stats.errors
+    report = {scenario: summarize(s, elapsed) for scenario, s in stats.items()}
+    report["total"] = summarize(total, elapsed)
+
+    _print_report(report, concurrency)
+    for scenario, scenario_stats in stats.items():
+        for sample in scenario_stats.error_samples:
+            click.echo(f"{scenario} error: {sample}", err=True)
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,36 @@
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from loguru import logger
+from prometheus_client import CONTENT_TYPE_LATEST
 
+from app.config import settings
 from app.data.router import router as data_router
-from app.database import Base, engine
+from app.database import get_pool_metrics
+from app.metrics import render_metrics
 from app.portfolio.router import router as portfolio_router
 from app.portfolio_state.router import router as portfolio_state_router
+from app.profiling import profile_request
+from app.schema import create_schema
 from app.strategy.router import router as strategy_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup logic
-    Base.metadata.create_all(bind=engine)
+    if settings.create_schema_on_startup:
+        create_schema()
     logger.info("Application started")
     yield
 
 
 app = FastAPI(lifespan=lifespan)
 
+# Only installed when allowed by config, so other deployments pay nothing
+if settings.profiling_enabled:
+    app.middleware("http")(profile_request)
+
 app.include_router(data_router, prefix="/api/v1/data", tags=["data"])
 app.include_router(strategy_router, prefix="/api/v1/strategy", tags=["strategy"])
 app.include_router(
@@ -28,6 +39,16 @@ app.include_router(
 app.include_router(portfolio_router, prefix="/api/v1/portfolio", tags=["portfolio"])
 
 
+@app.get("/metrics", tags=["metrics"], response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/api/v1/metrics/db_pool", tags=["metrics"])
+async def db_pool_metrics():
+    return get_pool_metrics()
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,108 @@
+"""Baseline schema
+
+Tables as they were created by Base.metadata.create_all before migrations
+were introduced. Only missing tables are created here; tables that already
+exist in an older layout are brought up to date by the later revisions
+(0002 for stock_data, 0004 for portfolio_state_data), so databases created
+by create_all at any earlier point can be upgraded in place.
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-08-19
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# SQLite only autoincrements INTEGER PRIMARY KEY columns
+BigIntegerPrimaryKey = sa.BigInteger().with_variant(sa.Integer(), "sqlite")
+
+
+def _missing(table: str) -> bool:
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade() -> None:
+    if _missing("stock_data"):
+        op.create_table(
+            "stock_data",
+            sa.Column("id", BigIntegerPrimaryKey, primary_key=True),
+            sa.Column("symbol", sa.String()),
+            sa.Column("date", sa.Date()),
+            sa.Column("open", sa.Float()),
+            sa.Column("high", sa.Float()),
+            sa.Column("low", sa.Float()),
+            sa.Column("close", sa.Float()),
+            sa.Column("volume", sa.BigInteger()),
+        )
+        op.create_index("ix_stock_data_id", "stock_data", ["id"])
+        op.create_index("ix_stock_data_symbol", "stock_data", ["symbol"])
+        op.create_index("ix_stock_data_date", "stock_data", ["date"])
+
+    if _missing("portfolio_state_data"):
+        op.create_table(
+            "portfolio_state_data",
+            sa.Column("id", BigIntegerPrimaryKey, primary_key=True),
+            sa.Column(
+                "portfolio_id", sa.String(), nullable=False, server_default="default"
+            ),
+            sa.Column("date", sa.Date()),
+            sa.Column("timestamp", sa.DateTime()),
+            sa.Column("cash_balance", sa.Float()),
+            sa.Column("total_value", sa.Float()),
+        )
+        op.create_index(
+            "ix_portfolio_state_data_portfolio_date_timestamp",
+            "portfolio_state_data",
+            ["portfolio_id", "date", "timestamp"],
+        )
+
+    if _missing("portfolio_position_data"):
+        op.create_table(
+            "portfolio_position_data",
+            sa.Column(
+                "state_id",
+                sa.BigInteger(),
+                sa.ForeignKey("portfolio_state_data.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+            sa.Column("symbol", sa.String(), primary_key=True),
+            sa.Column("quantity", sa.Float(), nullable=False),
+            sa.Column("price", sa.Float(), nullable=False),
+            sa.Column("value", sa.Float(), nullable=False),
+        )
+        op.create_index(
+            "ix_portfolio_position_data_symbol_state_id",
+            "portfolio_position_data",
+            ["symbol", "state_id"],
+        )
+
+    if _missing("universe_eligibility"):
+        op.create_table(
+            "universe_eligibility",
+            sa.Column("symbol", sa.String(), primary_key=True),
+            sa.Column("date", sa.Date(), primary_key=True),
+            sa.Column("passes_gap", sa.Boolean(), nullable=False),
+            sa.Column("passes_moving_average", sa.Boolean(), nullable=False),
+            sa.Column("passes_momentum", sa.Boolean(), nullable=False),
+            sa.Column("eligible", sa.Boolean(), nullable=False),
+            sa.Column("momentum_score", sa.Float()),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+        op.create_index(
+            "ix_universe_eligibility_date_eligible",
+            "universe_eligibility",
+            ["date", "eligible"],
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("universe_eligibility")
+    op.drop_table("portfolio_position_data")
+    op.drop_table("portfolio_state_data")
+    op.drop_table("stock_data")
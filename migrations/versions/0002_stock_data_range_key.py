@@ -0,0 +1,129 @@
+"""Key stock_data by (symbol, interval, date) for range scans
+
+Replaces the surrogate id and single-column indexes with one composite key
+that range reads can walk in date order. Existing rows are taken to be daily
+bars; duplicates of a (symbol, date) keep the most recently inserted row.
+
+On Postgres the table can be partitioned by year:
+
+    alembic -x stock_data_partitions=2000-2030 upgrade head
+
+creates one partition per year in that range plus a default partition.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-08-19
+"""
+
+import sqlalchemy as sa
+from alembic import context, op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+PRICE_COLUMNS = "open, high, low, close, volume"
+
+
+def _partition_years() -> range | None:
+    value = context.get_x_argument(as_dictionary=True).get("stock_data_partitions")
+    if not value:
+        return None
+    first, last = (int(year) for year in value.split("-"))
+    return range(first, last + 1)
+
+
+def _create_postgres_table(name: str, years: range | None) -> None:
+    partitioning = " PARTITION BY RANGE (date)" if years else ""
+    op.execute(
+        f"""
+        CREATE TABLE {name} (
+            symbol VARCHAR NOT NULL,
+            interval VARCHAR NOT NULL DEFAULT '1d',
+            date DATE NOT NULL,
+            open FLOAT,
+            high FLOAT,
+            low FLOAT,
+            close FLOAT,
+            volume BIGINT,
+            CONSTRAINT pk_stock_data PRIMARY KEY (symbol, interval, date)
+        ){partitioning}
+        """
+    )
+    for year in years or ():
+        op.execute(
+            f"CREATE TABLE stock_data_y{year} PARTITION OF {name} "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        )
+    if years:
+        op.execute(f"CREATE TABLE stock_data_default PARTITION OF {name} DEFAULT")
+
+
+def _create_table(name: str) -> None:
+    op.create_table(
+        name,
+        sa.Column("symbol", sa.String(), nullable=False),
+        sa.Column("interval", sa.String(), nullable=False, server_default="1d"),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("open", sa.Float()),
+        sa.Column("high", sa.Float()),
+        sa.Column("low", sa.Float()),
+        sa.Column("close", sa.Float()),
+        sa.Column("volume", sa.BigInteger()),
+        sa.PrimaryKeyConstraint("symbol", "interval", "date", name="pk_stock_data"),
+        sqlite_with_rowid=False,
+    )
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        _create_postgres_table("stock_data_new", _partition_years())
+    else:
+        _create_table("stock_data_new")
+
+    op.execute(
+        f"""
+        INSERT INTO stock_data_new (symbol, interval, date, {PRICE_COLUMNS})
+        SELECT symbol, '1d', date, {PRICE_COLUMNS}
+        FROM stock_data
+        WHERE id IN (
+            SELECT MAX(id) FROM stock_data
+            WHERE symbol IS NOT NULL AND date IS NOT NULL
+            GROUP BY symbol, date
+        )
+        """
+    )
+    op.drop_table("stock_data")
+    op.rename_table("stock_data_new", "stock_data")
+
+
+def downgrade() -> None:
+    op.create_table(
+        "stock_data_old",
+        sa.Column(
+            "id",
+            sa.BigInteger().with_variant(sa.Integer(), "sqlite"),
+            primary_key=True,
+        ),
+        sa.Column("symbol", sa.String()),
+        sa.Column("date", sa.Date()),
+        sa.Column("open", sa.Float()),
+        sa.Column("high", sa.Float()),
+        sa.Column("low", sa.Float()),
+        sa.Column("close", sa.Float()),
+        sa.Column("volume", sa.BigInteger()),
+    )
+    op.execute(
+        f"""
+        INSERT INTO stock_data_old (symbol, date, {PRICE_COLUMNS})
+        SELECT symbol, date, {PRICE_COLUMNS} FROM stock_data
+        WHERE interval = '1d'
+        ORDER BY symbol, date
+        """
+    )
+    op.drop_table("stock_data")
+    op.rename_table("stock_data_old", "stock_data")
+    op.create_index("ix_stock_data_id", "stock_data", ["id"])
+    op.create_index("ix_stock_data_symbol", "stock_data", ["symbol"])
+    op.create_index("ix_stock_data_date", "stock_data", ["date"])
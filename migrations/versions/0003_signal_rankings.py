@@ -0,0 +1,49 @@
+"""Store per-date signal rankings
+
+Each signal run writes the full ranking of its universe, so past rankings are
+read back through the (date, ranking_id, rank) and (symbol, date) indexes
+instead of being recomputed.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-08-19
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "signal_rankings",
+        sa.Column("ranking_id", sa.String(), primary_key=True),
+        sa.Column("date", sa.Date(), primary_key=True),
+        sa.Column("symbol", sa.String(), primary_key=True),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("selected", sa.Boolean(), nullable=False),
+        sa.Column("eligible", sa.Boolean(), nullable=False),
+        sa.Column("passes_gap", sa.Boolean()),
+        sa.Column("passes_moving_average", sa.Boolean()),
+        sa.Column("passes_momentum", sa.Boolean()),
+        sa.Column("momentum_score", sa.Float()),
+        sa.Column("risk_unit", sa.Float()),
+        sa.Column("current_price", sa.Float()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index(
+        "ix_signal_rankings_date_ranking_rank",
+        "signal_rankings",
+        ["date", "ranking_id", "rank"],
+    )
+    op.create_index(
+        "ix_signal_rankings_symbol_date", "signal_rankings", ["symbol", "date"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("signal_rankings")
@@ -0,0 +1,101 @@
+"""Move legacy JSON portfolio positions into portfolio_position_data
+
+Databases created before portfolio ids and the positions table still keep
+each state's positions in a JSON ``positions`` column. This adds
+``portfolio_id`` (existing states belong to the default portfolio), copies
+every JSON position into its own row and drops the column. Databases already
+on the current layout are left alone.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-08-19
+"""
+
+import json
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Single-column indexes the legacy models created on portfolio_state_data
+LEGACY_INDEXES = (
+    "ix_portfolio_state_data_id",
+    "ix_portfolio_state_data_date",
+    "ix_portfolio_state_data_timestamp",
+)
+
+positions_table = sa.table(
+    "portfolio_position_data",
+    sa.column("state_id", sa.BigInteger()),
+    sa.column("symbol", sa.String()),
+    sa.column("quantity", sa.Float()),
+    sa.column("price", sa.Float()),
+    sa.column("value", sa.Float()),
+)
+
+
+def _position_rows(bind: sa.Connection) -> list[dict]:
+    rows = []
+    states = bind.execute(
+        sa.text(
+            "SELECT id, positions FROM portfolio_state_data WHERE positions IS NOT NULL"
+        )
+    )
+    for state_id, positions in states:
+        # SQLite hands JSON back as text, Postgres already decoded
+        if isinstance(positions, str):
+            positions = json.loads(positions)
+        # The key is (state_id, symbol); a repeated symbol keeps its last entry
+        by_symbol = {position["symbol"]: position for position in positions or []}
+        rows.extend(
+            {
+                "state_id": state_id,
+                "symbol": symbol,
+                "quantity": position["quantity"],
+                "price": position["price"],
+                "value": position["value"],
+            }
+            for symbol, position in by_symbol.items()
+        )
+    return rows
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {c["name"] for c in inspector.get_columns("portfolio_state_data")}
+    if "positions" not in columns:
+        return
+
+    rows = _position_rows(bind)
+    if rows:
+        op.bulk_insert(positions_table, rows)
+
+    existing = {
+        index["name"] for index in inspector.get_indexes("portfolio_state_data")
+    }
+    with op.batch_alter_table("portfolio_state_data") as batch:
+        for name in LEGACY_INDEXES:
+            if name in existing:
+                batch.drop_index(name)
+        batch.add_column(
+            sa.Column(
+                "portfolio_id", sa.String(), nullable=False, server_default="default"
+            )
+        )
+        batch.drop_column("positions")
+    op.create_index(
+        "ix_portfolio_state_data_portfolio_date_timestamp",
+        "portfolio_state_data",
+        ["portfolio_id", "date", "timestamp"],
+    )
+
+
+def downgrade() -> None:
+    # The legacy JSON layout is not restored; databases already on the
+    # current layout had nothing to undo
+    pass
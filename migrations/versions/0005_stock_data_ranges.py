@@ -0,0 +1,33 @@
+"""Record the date ranges fetched from the data source
+
+The data service decides whether a range is already stored from these
+records instead of counting bars, so symbols with gaps in their history are
+not fetched again on every cache miss. Existing databases start without
+records and fill them as ranges are fetched once more.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-08-19
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_data_ranges",
+        sa.Column("symbol", sa.String(), primary_key=True),
+        sa.Column("interval", sa.String(), primary_key=True),
+        sa.Column("start_date", sa.Date(), primary_key=True),
+        sa.Column("end_date", sa.Date(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stock_data_ranges")
@@ -0,0 +1,107 @@
+"""Key signal rankings by interval and market index too
+
+Runs on other bars or against another market index for the same universe
+and date used to replace each other's rows. Both become part of the key, and
+a reason column records why a symbol was held back or never scored. Rows
+stored before this revision are taken to be daily runs; their market index
+was not recorded and is left empty.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2024-08-19
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    "ranking_id, date, symbol, rank, selected, eligible, passes_gap, "
+    "passes_moving_average, passes_momentum, momentum_score, risk_unit, "
+    "current_price, created_at"
+)
+
+
+def _value_columns() -> list[sa.Column]:
+    return [
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("selected", sa.Boolean(), nullable=False),
+        sa.Column("eligible", sa.Boolean(), nullable=False),
+        sa.Column("passes_gap", sa.Boolean()),
+        sa.Column("passes_moving_average", sa.Boolean()),
+        sa.Column("passes_momentum", sa.Boolean()),
+        sa.Column("momentum_score", sa.Float()),
+        sa.Column("risk_unit", sa.Float()),
+        sa.Column("current_price", sa.Float()),
+    ]
+
+
+def _create_symbol_index() -> None:
+    op.create_index(
+        "ix_signal_rankings_symbol_date", "signal_rankings", ["symbol", "date"]
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "signal_rankings_new",
+        sa.Column("ranking_id", sa.String(), primary_key=True),
+        sa.Column("interval", sa.String(), primary_key=True),
+        sa.Column("market_index", sa.String(), primary_key=True),
+        sa.Column("date", sa.Date(), primary_key=True),
+        sa.Column("symbol", sa.String(), primary_key=True),
+        *_value_columns(),
+        sa.Column("reason", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.execute(
+        f"""
+        INSERT INTO signal_rankings_new (interval, market_index, {COLUMNS})
+        SELECT '1d', '', {COLUMNS} FROM signal_rankings
+        """
+    )
+    op.drop_table("signal_rankings")
+    op.rename_table("signal_rankings_new", "signal_rankings")
+    op.create_index(
+        "ix_signal_rankings_date_run_rank",
+        "signal_rankings",
+        ["date", "ranking_id", "interval", "market_index", "rank"],
+    )
+    _create_symbol_index()
+
+
+def downgrade() -> None:
+    op.create_table(
+        "signal_rankings_old",
+        sa.Column("ranking_id", sa.String(), primary_key=True),
+        sa.Column("date", sa.Date(), primary_key=True),
+        sa.Column("symbol", sa.String(), primary_key=True),
+        *_value_columns(),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    # The old key holds one daily run per ranking and date
+    op.execute(
+        f"""
+        INSERT INTO signal_rankings_old ({COLUMNS})
+        SELECT {COLUMNS} FROM signal_rankings
+        WHERE interval = '1d'
+        AND market_index = (
+            SELECT MIN(r.market_index) FROM signal_rankings r
+            WHERE r.ranking_id = signal_rankings.ranking_id
+            AND r.date = signal_rankings.date
+            AND r.interval = '1d'
+        )
+        """
+    )
+    op.drop_table("signal_rankings")
+    op.rename_table("signal_rankings_old", "signal_rankings")
+    op.create_index(
+        "ix_signal_rankings_date_ranking_rank",
+        "signal_rankings",
+        ["date", "ranking_id", "rank"],
+    )
+    _create_symbol_index()
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import app.cache
+from app.cache import (
+    InMemoryRedis,
+    create_redis_client,
+    get_cache_entry,
+    schedule_refresh,
+    set_cache_entry,
+    set_cache_if_newer,
+)
+
+
+def test_memory_url_selects_in_memory_client():
+    assert isinstance(create_redis_client("memory://"), InMemoryRedis)
+
+
+def test_values_expire_and_respect_nx():
+    client = InMemoryRedis()
+    client.setex("key", 60, "value")
+    assert client.get("key") == b"value"
+    assert client.set("key", "other", nx=True) is None
+
+    client.set("short", "value", ex=0)
+    assert client.get("short") is None
+
+
+def test_scan_and_delete_by_pattern():
+    client = InMemoryRedis()
+    for key in ("state:a:latest", "state:a:date:1", "state:b:latest"):
+        client.set(key, "1")
+
+    assert sorted(client.scan_iter(match="state:a:*")) == [
+        "state:a:date:1",
+        "state:a:latest",
+    ]
+    assert client.delete(*client.scan_iter(match="state:a:*")) == 2
+    assert client.get("state:b:latest") == b"1"
+
+
+def test_blpop_waits_for_a_push():
+    client = InMemoryRedis()
+    assert client.blpop(["queue"], timeout=0.01) is None
+
+    threading.Timer(0.05, client.rpush, args=("queue", "job")).start()
+    start = time.monotonic()
+    assert client.blpop(["queue"], timeout=2) == (b"queue", b"job")
+    assert time.monotonic() - start < 1
+
+
+@pytest.fixture
+def redis(monkeypatch) -> InMemoryRedis:
+    client = InMemoryRedis()
+    monkeypatch.setattr(app.cache, "redis_client", client)
+    return client
+
+
+def test_entries_turn_stale_after_soft_ttl(redis):
+    set_cache_entry("fresh", "value", soft_ttl=60, hard_ttl=120)
+    set_cache_entry("stale", "value", soft_ttl=0, hard_ttl=120)
+    redis.set("legacy", "value")
+
+    assert get_cache_entry("fresh") == (b"value", False)
+    assert get_cache_entry("stale") == (b"value", True)
+    assert get_cache_entry("legacy") == (None, False)
+    assert get_cache_entry("missing") == (None, False)
+
+
+def test_conditional_sets_never_go_back_to_an_older_order(redis):
+    assert set_cache_if_newer("key", "b", "0002")
+    assert not set_cache_if_newer("key", "a", "0001")
+    assert redis.get("key") == b"b"
+    assert set_cache_if_newer("key", "c", "0002")
+    assert redis.get("key") == b"c"
+
+    # Without fill a missing key stays missing, but older values are refused
+    assert not set_cache_if_newer("missing", "b", "0002", fill=False)
+    assert redis.get("missing") is None
+    assert not set_cache_if_newer("missing", "a", "0001")
+    assert set_cache_if_newer("missing", "b", "0002")
+
+
+def test_concurrent_stale_reads_run_one_refresh(redis):
+    set_cache_entry("hot", "old", soft_ttl=0, hard_ttl=120)
+    refreshes = []
+
+    async def refresh():
+        refreshes.append(1)
+        await asyncio.sleep(0.01)
+        set_cache_entry("hot", "new", soft_ttl=60, hard_ttl=120)
+
+    async def read():
+        value, stale = get_cache_entry("hot")
+        if stale:
+            schedule_refresh("test", "hot", refresh)
+        return value
+
+    async def burst():
+        values = await asyncio.gather(*(read() for _ in range(50)))
+        await asyncio.gather(*app.cache._refresh_tasks)
+        return values
+
+    assert set(asyncio.run(burst())) == {b"old"}
+    assert len(refreshes) == 1
+    assert get_cache_entry("hot") == (b"new", False)
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,38 @@
+from datetime import date
+
+import pytest
+
+from app.data.calendar import nyse_calendar, nyse_holidays
+
+
+def test_nyse_holidays_follow_observance_rules():
+    assert nyse_holidays(2024) == [
+        date(2024, 1, 1),
+        date(2024, 1, 15),
+        date(2024, 2, 19),
+        date(2024, 3, 29),
+        date(2024, 5, 27),
+        date(2024, 6, 19),
+        date(2024, 7, 4),
+        date(2024, 9, 2),
+        date(2024, 11, 28),
+        date(2024, 12, 25),
+    ]
+    # New Year's Day on a Saturday is not observed; Juneteenth moves to Monday
+    holidays_2022 = nyse_holidays(2022)
+    assert date(2021, 12, 31) not in holidays_2022
+    assert date(2022, 6, 20) in holidays_2022
+
+
+@pytest.mark.parametrize("end", [date(2024, 6, 3), date(2024, 6, 1), date(2024, 7, 4)])
+@pytest.mark.parametrize("bars", [1, 5, 200])
+def test_window_start_spans_exactly_the_requested_sessions(end, bars):
+    calendar = nyse_calendar()
+    start = calendar.window_start(end, bars)
+
+    assert calendar.is_session(start)
+    assert calendar.session_count(start, end) == bars
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,95 @@
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.data.models import PRICE_FIELDS, StockData, StockDataDB, StockDataPoint
+from app.data.repository.database import DatabaseRepository
+from app.database import Base
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[StockDataDB.__table__])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _stock_data(symbol: str, closes: dict[date, float]) -> StockData:
+    return StockData(
+        symbol=symbol,
+        data_points=[
+            StockDataPoint(
+                date=day, open=close, high=close, low=close, close=close, volume=100
+            )
+            for day, close in closes.items()
+        ],
+    )
+
+
+def test_range_query_uses_primary_key_without_sort(db):
+    repo = DatabaseRepository(db)
+    for symbols in (["AAPL"], ["AAPL", "MSFT"]):
+        query = repo._range_query(
+            symbols, date(2024, 1, 1), date(2024, 6, 1), "1d", PRICE_FIELDS
+        )
+        sql = str(query.statement.compile(compile_kwargs={"literal_binds": True}))
+        plan = " ".join(
+            row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+        )
+        assert "USING PRIMARY KEY" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+def test_save_stock_data_upserts_bars(db):
+    repo = DatabaseRepository(db)
+    asyncio.run(
+        repo.save_stock_data(
+            _stock_data("AAPL", {date(2024, 1, 3): 2.0, date(2024, 1, 2): 1.0})
+        )
+    )
+    asyncio.run(repo.save_stock_data(_stock_data("AAPL", {date(2024, 1, 3): 3.0})))
+    asyncio.run(repo.save_stock_data(_stock_data("MSFT", {date(2024, 1, 2): 5.0})))
+
+    result = asyncio.run(
+        repo.get_batch_stock_data(
+            ["AAPL", "MSFT", "GOOG"], date(2024, 1, 1), date(2024, 1, 31), "1d"
+        )
+    )
+
+    aapl = result.stock_data["AAPL"].data_points
+    assert [(p.date, p.close) for p in aapl] == [
+        (date(2024, 1, 2), 1.0),
+        (date(2024, 1, 3), 3.0),
+    ]
+    assert len(result.stock_data["MSFT"].data_points) == 1
+    assert result.stock_data["GOOG"].data_points == []
+
+
+def test_get_stock_data_reads_only_selected_fields(db):
+    repo = DatabaseRepository(db)
+    asyncio.run(repo.save_stock_data(_stock_data("AAPL", {date(2024, 1, 2): 1.0})))
+
+    query = repo._range_query(
+        ["AAPL"], date(2024, 1, 1), date(2024, 1, 31), "1d", ("close",)
+    )
+    selected = [column["name"] for column in query.column_descriptions]
+    assert selected == ["symbol", "date", "close"]
+
+    stock_data = asyncio.run(
+        repo.get_stock_data(
+            "AAPL", date(2024, 1, 1), date(2024, 1, 31), "1d", ["close"]
+        )
+    )
+    assert stock_data.data_points[0].model_dump(exclude_none=True) == {
+        "date": date(2024, 1, 2),
+        "close": 1.0,
+    }
+
+
+if __name__ == "__main__":
+    pytest.main()
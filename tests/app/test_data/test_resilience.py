@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from app.data.exceptions import CircuitOpenError
+from app.data.resilience import CircuitBreaker, ResilientFetcher, TokenBucket
+from app.metrics import UPSTREAM_REQUESTS, counter_value
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_fetcher(**overrides) -> ResilientFetcher:
+    options = {
+        "rate": 1000.0,
+        "burst": 10,
+        "max_attempts": 3,
+        "backoff_base": 0.0,
+        "backoff_max": 0.0,
+        "failure_threshold": 2,
+        "reset_timeout": 60.0,
+    } | overrides
+    return ResilientFetcher("test_upstream", **options)
+
+
+def flaky(failures: int, error: Exception | None = None):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error or ConnectionError("upstream down")
+        return "bars"
+
+    return fetch, calls
+
+
+def test_token_bucket_queues_reservations_at_the_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=2, clock=clock)
+
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays == pytest.approx([0.0, 0.0, 0.1, 0.2])
+
+    clock.now = 1.0
+    # Refills up to the burst capacity only
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([0.0, 0.0, 0.1])
+
+
+def test_retries_transient_failures():
+    fetcher = make_fetcher()
+    fetch, calls = flaky(2)
+
+    assert asyncio.run(fetcher.call(fetch)) == "bars"
+    assert len(calls) == 3
+    assert fetcher.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_does_not_retry_bad_requests():
+    fetcher = make_fetcher(is_retryable=lambda e: not isinstance(e, ValueError))
+    fetch, calls = flaky(5, ValueError("bad range"))
+
+    with pytest.raises(ValueError):
+        asyncio.run(fetcher.call(fetch))
+    assert len(calls) == 1
+    assert fetcher.breaker.failures == 0
+
+
+def test_circuit_opens_fails_fast_and_recovers():
+    fetcher = make_fetcher(max_attempts=1)
+    clock = FakeClock()
+    fetcher.breaker.clock = clock
+    fetch, calls = flaky(2)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            asyncio.run(fetcher.call(fetch))
+    rejected = counter_value(
+        UPSTREAM_REQUESTS, upstream="test_upstream", outcome="rejected"
+    )
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(fetcher.call(fetch))
+    assert len(calls) == 2
+    assert (
+        counter_value(UPSTREAM_REQUESTS, upstream="test_upstream", outcome="rejected")
+        == rejected + 1
+    )
+
+    # After the reset timeout a trial call goes through and closes the circuit
+    clock.now = 61.0
+    assert asyncio.run(fetcher.call(fetch)) == "bars"
+    assert fetcher.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_trial_reopens_the_circuit():
+    fetcher = make_fetcher(max_attempts=1)
+    clock = FakeClock()
+    fetcher.breaker.clock = clock
+    fetch, _ = flaky(2)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            asyncio.run(fetcher.call(fetch))
+
+    async def stalled():
+        await asyncio.sleep(60)
+
+    async def cancel_trial():
+        trial = asyncio.ensure_future(fetcher.call(stalled))
+        await asyncio.sleep(0)
+        assert fetcher.breaker.state == CircuitBreaker.HALF_OPEN
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    clock.now = 61.0
+    asyncio.run(cancel_trial())
+    assert fetcher.breaker.state == CircuitBreaker.OPEN
+
+    # No verdict was reached, so the next call is the trial at once
+    assert asyncio.run(fetcher.call(fetch)) == "bars"
+    assert fetcher.breaker.state == CircuitBreaker.CLOSED
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,232 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.cache
+from app.cache import InMemoryRedis, get_cache_entry
+from app.data.exceptions import SymbolUnavailableError
+from app.data.models import BatchStockRequest, StockData
+from app.data.repository.synthetic import SyntheticDataRepository
+from app.data.service import DataService
+from app.database import Base, get_session, session_scope
+from app.strategy.models import UniverseEligibilityDB
+
+START, END = date(2024, 1, 1), date(2024, 2, 1)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = InMemoryRedis()
+    monkeypatch.setattr(app.cache, "redis_client", client)
+    return client
+
+
+@pytest.fixture
+def data_service():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with session_scope(sessionmaker(bind=engine)):
+        yield DataService(data_source="synthetic")
+
+
+def test_projected_read_saves_full_bars_and_caches_projection(data_service, redis):
+    closes = asyncio.run(
+        data_service.get_stock_data("AAPL", START, END, "1d", ["close"])
+    )
+    assert all(
+        point.model_dump(exclude_none=True).keys() == {"date", "close"}
+        for point in closes.data_points
+    )
+    assert redis.get("AAPL_2024-01-01_2024-02-01_1d_close") is not None
+    assert redis.get("AAPL_2024-01-01_2024-02-01_1d") is None
+
+    full = asyncio.run(data_service.get_stock_data("AAPL", START, END, "1d"))
+    assert [p.close for p in full.data_points] == [p.close for p in closes.data_points]
+    assert all(p.volume is not None for p in full.data_points)
+
+
+def test_unknown_fields_are_rejected(data_service, redis):
+    with pytest.raises(ValueError, match="Unknown fields: adj_close"):
+        asyncio.run(
+            data_service.get_stock_data("AAPL", START, END, "1d", ["adj_close"])
+        )
+
+
+def test_stale_entry_is_served_and_refreshed_in_background(data_service, redis):
+    key = "AAPL_2024-01-01_2024-02-01_1d"
+    fresh = asyncio.run(data_service.get_stock_data("AAPL", START, END, "1d"))
+    _, _, value = redis.get(key).partition(b"|")
+    redis.set(key, b"0|" + value)
+
+    async def read_stale():
+        stock_data = await data_service.get_stock_data("AAPL", START, END, "1d")
+        await asyncio.gather(*app.cache._refresh_tasks)
+        return stock_data
+
+    assert asyncio.run(read_stale()) == fresh
+    assert get_cache_entry(key)[1] is False
+
+
+class LateListingSource(SyntheticDataRepository):
+    """Bars only from mid-January 2024 on, as for a symbol listed then."""
+
+    def __init__(self):
+        super().__init__()
+        self.fetches = 0
+
+    async def get_stock_data(self, symbol, start_date, end_date, interval, fields=None):
+        self.fetches += 1
+        stock_data = await super().get_stock_data(
+            symbol, start_date, end_date, interval
+        )
+        stock_data.data_points = [
+            p for p in stock_data.data_points if p.date >= date(2024, 1, 16)
+        ]
+        return stock_data
+
+
+def test_fetched_ranges_with_gaps_are_not_fetched_again(data_service, redis):
+    source = LateListingSource()
+    data_service.source_repo = source
+
+    for _ in range(3):
+        redis.delete(*redis.scan_iter(match="LATE_*"))
+        stock_data = asyncio.run(data_service.get_stock_data("LATE", START, END, "1d"))
+        assert stock_data.data_points[0].date == date(2024, 1, 16)
+    assert source.fetches == 1
+
+    # Narrower ranges are served from the database, wider ones are fetched
+    asyncio.run(data_service.get_stock_data("LATE", date(2024, 1, 8), END, "1d"))
+    assert source.fetches == 1
+    asyncio.run(data_service.get_stock_data("LATE", START, date(2024, 3, 1), "1d"))
+    assert source.fetches == 2
+    asyncio.run(
+        data_service.get_stock_data("LATE", date(2024, 1, 20), date(2024, 2, 20), "1d")
+    )
+    assert source.fetches == 2
+
+
+class DeadTickerSource(SyntheticDataRepository):
+    """No bars for DEAD at all, none for NEW before 2024, BAD requests fail."""
+
+    def __init__(self):
+        super().__init__()
+        self.fetched: list[str] = []
+
+    async def get_stock_data(self, symbol, start_date, end_date, interval, fields=None):
+        self.fetched.append(symbol)
+        if symbol == "BAD":
+            raise ValueError("invalid period")
+        if symbol == "DEAD" or (symbol == "NEW" and end_date <= date(2024, 1, 1)):
+            return StockData(symbol=symbol, data_points=[])
+        return await super().get_stock_data(symbol, start_date, end_date, interval)
+
+
+def test_empty_symbols_are_skipped_until_the_negative_entry_expires(
+    data_service, redis
+):
+    # The range has to reach the latest session to mark the symbol
+    end = date.today() + timedelta(days=1)
+    start = end - timedelta(days=30)
+    data_service.source_repo = DeadTickerSource()
+    with pytest.raises(SymbolUnavailableError, match="returned no bars"):
+        asyncio.run(data_service.get_stock_data("DEAD", start, end, "1d"))
+
+    batch = asyncio.run(
+        data_service.get_batch_stock_data(
+            BatchStockRequest(
+                symbols=["DEAD", "AAPL"], start_date=start, end_date=end, interval="1d"
+            )
+        )
+    )
+    assert list(batch.stock_data) == ["AAPL"]
+    assert "returned no bars" in batch.errors["DEAD"]
+    assert data_service.source_repo.fetched == ["DEAD", "AAPL"]
+
+    redis.delete("unavailable:1d:DEAD")
+    with pytest.raises(SymbolUnavailableError):
+        asyncio.run(data_service.get_stock_data("DEAD", start, end, "1d"))
+    assert data_service.source_repo.fetched.count("DEAD") == 2
+
+
+def test_empty_past_ranges_and_errors_are_not_remembered(data_service, redis):
+    data_service.source_repo = DeadTickerSource()
+    with pytest.raises(SymbolUnavailableError):
+        asyncio.run(
+            data_service.get_stock_data("NEW", date(2020, 1, 1), date(2020, 6, 1), "1d")
+        )
+    later = asyncio.run(
+        data_service.get_stock_data("NEW", date(2024, 2, 1), date(2024, 6, 1), "1d")
+    )
+    assert later.data_points
+
+    with pytest.raises(ValueError):
+        asyncio.run(data_service.get_stock_data("BAD", START, END, "1d"))
+    with pytest.raises(ValueError):
+        asyncio.run(data_service.get_stock_data("BAD", START, END, "1d"))
+    assert data_service.source_repo.fetched.count("BAD") == 2
+    assert list(redis.scan_iter(match="unavailable:*")) == []
+
+
+def test_stored_symbols_of_a_batch_are_read_in_one_query(data_service, redis):
+    source = LateListingSource()
+    data_service.source_repo = source
+    request = BatchStockRequest(
+        symbols=["LATE", "AAPL", "MSFT"], start_date=START, end_date=END, interval="1d"
+    )
+    asyncio.run(data_service.get_stock_data("MSFT", START, END, "1d"))
+    asyncio.run(data_service.get_stock_data("LATE", START, END, "1d"))
+    assert source.fetches == 2
+
+    async def single_read(*args, **kwargs):
+        raise AssertionError("stored symbols are read one by one")
+
+    data_service.db_repo.get_stock_data = single_read
+    redis.delete(*redis.scan_iter(match="*"))
+    progress = []
+    batch = asyncio.run(
+        data_service.get_batch_stock_data(
+            request, on_progress=lambda stage, details: progress.append(details)
+        )
+    )
+    # Only AAPL was never fetched
+    assert source.fetches == 3
+    assert list(batch.stock_data) == ["LATE", "AAPL", "MSFT"]
+    assert batch.stock_data["LATE"].data_points[0].date == date(2024, 1, 16)
+    assert [d["done"] for d in progress] == [1, 2, 3]
+
+
+def test_failed_ingest_hooks_are_rolled_back(data_service, redis):
+    seen = []
+
+    async def failing_hook(stock_data, interval):
+        seen.append((stock_data.symbol, interval))
+        row = {
+            "symbol": stock_data.symbol,
+            "date": START,
+            "passes_gap": True,
+            "passes_moving_average": True,
+            "passes_momentum": True,
+            "eligible": True,
+        }
+        session = get_session()
+        session.add(UniverseEligibilityDB(**row))
+        session.add(UniverseEligibilityDB(**row))
+        session.flush()
+
+    data_service.register_ingest_hook(failing_hook)
+    stock_data = asyncio.run(data_service.get_stock_data("AAPL", START, END, "1d"))
+    assert seen == [("AAPL", "1d")]
+
+    # The bars saved before the hook stay, and the session is still usable
+    session = get_session()
+    assert session.query(UniverseEligibilityDB).count() == 0
+    stored = asyncio.run(data_service.db_repo.get_stock_data("AAPL", START, END, "1d"))
+    assert stored.data_points == stock_data.data_points
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,71 @@
+import asyncio
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.data.repository.synthetic import SyntheticDataRepository
+
+
+def fetch(repository, symbol, start, end):
+    return asyncio.run(repository.get_stock_data(symbol, start, end, "1d"))
+
+
+def test_bars_are_deterministic_across_ranges():
+    repository = SyntheticDataRepository(seed=1)
+    full = fetch(repository, "AAPL", date(2023, 1, 2), date(2023, 7, 1))
+    part = fetch(repository, "AAPL", date(2023, 3, 1), date(2023, 4, 1))
+    again = fetch(
+        SyntheticDataRepository(seed=1), "AAPL", date(2023, 3, 1), date(2023, 4, 1)
+    )
+
+    assert part == again
+    by_date = {p.date: p for p in full.data_points}
+    assert all(by_date[p.date] == p for p in part.data_points)
+
+
+def test_symbols_and_seeds_get_different_paths():
+    start, end = date(2023, 1, 2), date(2023, 2, 1)
+    a = fetch(SyntheticDataRepository(seed=1), "AAPL", start, end)
+    b = fetch(SyntheticDataRepository(seed=1), "MSFT", start, end)
+    c = fetch(SyntheticDataRepository(seed=2), "AAPL", start, end)
+
+    assert a.data_points[0].close != b.data_points[0].close
+    assert a.data_points[0].close != c.data_points[0].close
+
+
+def test_bars_fall_on_sessions_with_exclusive_end():
+    stock_data = fetch(
+        SyntheticDataRepository(), "SPY", date(2023, 1, 2), date(2023, 1, 16)
+    )
+
+    # 2023-01-02 is the observed New Year's Day holiday
+    dates = [p.date for p in stock_data.data_points]
+    assert dates[0] == date(2023, 1, 3)
+    assert dates[-1] == date(2023, 1, 13)
+    assert len(dates) == 9
+    assert all(d.weekday() < 5 for d in dates)
+
+
+def test_bars_are_consistent_ohlc_with_injected_gaps():
+    repository = SyntheticDataRepository(gap_probability=0.05)
+    dates, bars = repository.generate_bars("GAPPY", date(2020, 1, 1), date(2023, 1, 1))
+
+    assert len(dates) == len(bars["close"])
+    assert (bars["high"] >= np.maximum(bars["open"], bars["close"])).all()
+    assert (bars["low"] <= np.minimum(bars["open"], bars["close"])).all()
+    gaps = np.abs(bars["open"][1:] / bars["close"][:-1] - 1)
+    assert (gaps > 0.05).any()
+
+
+def test_only_daily_bars_are_supported():
+    with pytest.raises(ValueError):
+        asyncio.run(
+            SyntheticDataRepository().get_stock_data(
+                "AAPL", date(2023, 1, 2), date(2023, 2, 1), "1h"
+            )
+        )
+
+
+if __name__ == "__main__":
+    pytest.main()
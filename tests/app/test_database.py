@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import SessionBound, get_session, session_scope
+
+
+@pytest.fixture
+def session_factory():
+    return sessionmaker(bind=create_engine("sqlite://"))
+
+
+def test_session_scope_binds_and_releases_session(session_factory):
+    with session_scope(session_factory) as db:
+        assert get_session() is db
+        assert SessionBound().db is db
+
+    with pytest.raises(RuntimeError):
+        get_session()
+
+
+def test_concurrent_scopes_get_their_own_session(session_factory):
+    service = SessionBound()
+
+    async def unit_of_work():
+        with session_scope(session_factory) as db:
+            await asyncio.sleep(0)
+            assert service.db is db
+            return db
+
+    async def run_both():
+        return await asyncio.gather(unit_of_work(), unit_of_work())
+
+    first, second = asyncio.run(run_both())
+    assert first is not second
+
+
+if __name__ == "__main__":
+    pytest.main()
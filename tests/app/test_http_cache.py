@@ -0,0 +1,68 @@
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.cache
+from app.cache import InMemoryRedis, bump_version
+from app.data.models import StockData, StockDataPoint
+from app.data.router import get_data_service, router
+from app.data.service import version_scope
+
+URL = "/stock/AAPL?start_date=2024-01-01&end_date=2024-02-01&interval=1d"
+
+
+class CountingDataService:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_stock_data(self, symbol, start_date, end_date, interval, fields):
+        self.calls += 1
+        point = StockDataPoint(date=date(2024, 1, 2), close=1.0)
+        return StockData(symbol=symbol, data_points=[point])
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(app.cache, "redis_client", InMemoryRedis())
+    return CountingDataService()
+
+
+@pytest.fixture
+def client(service):
+    api = FastAPI()
+    api.include_router(router)
+    api.dependency_overrides[get_data_service] = lambda: service
+    return TestClient(api)
+
+
+def test_matching_etag_gets_304_without_running_service(client, service):
+    first = client.get(URL)
+    assert first.status_code == 200
+    assert first.headers["cache-control"].startswith("public, max-age=")
+
+    second = client.get(URL, headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert service.calls == 1
+
+    since = client.get(
+        URL, headers={"If-Modified-Since": first.headers["last-modified"]}
+    )
+    assert since.status_code == 304
+
+
+def test_etag_changes_with_data_version_and_parameters(client, service):
+    etag = client.get(URL).headers["etag"]
+    assert client.get(URL + "&fields=close").headers["etag"] != etag
+
+    bump_version(version_scope("AAPL"))
+    response = client.get(URL, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert service.calls == 3
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,66 @@
+import pytest
+
+from app.metrics import (
+    REGISTRY,
+    STAGE_ERRORS,
+    counter_value,
+    record_cache_lookup,
+    render_metrics,
+    timed,
+)
+
+
+def stage_count(stage: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "py_momentum_stage_duration_seconds_count", {"stage": stage}
+    )
+    return value or 0.0
+
+
+def test_timed_records_latency_and_errors():
+    before = stage_count("test_stage")
+    with pytest.raises(ValueError), timed("test_stage"):
+        raise ValueError("boom")
+
+    assert stage_count("test_stage") == before + 1
+    assert counter_value(STAGE_ERRORS, stage="test_stage") >= 1
+
+
+def test_render_includes_histogram_buckets():
+    with timed("render_stage"):
+        pass
+
+    text = render_metrics().decode()
+    assert (
+        'py_momentum_stage_duration_seconds_bucket{le="+Inf",stage="render_stage"} 1.0'
+        in text
+    )
+    assert "# TYPE py_momentum_stage_duration_seconds histogram" in text
+
+
+def test_cache_hit_ratio_is_exported():
+    record_cache_lookup("test_cache", True)
+    record_cache_lookup("test_cache", False)
+
+    assert (
+        REGISTRY.get_sample_value(
+            "py_momentum_cache_hit_ratio", {"cache": "test_cache"}
+        )
+        == 0.5
+    )
+
+
+def test_pool_events_are_counters():
+    from app.database import _on_checkout, get_pool_metrics
+
+    before = get_pool_metrics()["checkouts"]
+    _on_checkout()
+
+    assert get_pool_metrics()["checkouts"] == before + 1
+    text = render_metrics().decode()
+    assert "# TYPE py_momentum_db_pool_events_total counter" in text
+    assert "# TYPE py_momentum_db_pool gauge" in text
+
+
+if __name__ == "__main__":
+    pytest.main()
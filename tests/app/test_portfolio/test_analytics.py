@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from app.portfolio import analytics
+
+
+def test_drawdowns():
+    nav = np.array([100.0, 120.0, 90.0, 130.0, 117.0])
+    np.testing.assert_allclose(analytics.drawdowns(nav), [0.0, 0.0, -0.25, 0.0, -0.1])
+
+
+def test_rolling_returns():
+    nav = np.array([100.0, 110.0, 121.0])
+    result = analytics.rolling_returns(nav, 2)
+    assert np.isnan(result[:2]).all()
+    assert result[2] == pytest.approx(0.21)
+
+
+def test_sharpe_and_volatility():
+    returns = np.array([0.01, -0.005, 0.02, 0.0])
+    periods = 252.0
+    expected_vol = np.std(returns, ddof=1) * np.sqrt(periods)
+    assert analytics.annualized_volatility(returns, periods) == pytest.approx(
+        expected_vol
+    )
+    assert analytics.sharpe_ratio(returns, periods) == pytest.approx(
+        returns.mean() / np.std(returns, ddof=1) * np.sqrt(periods)
+    )
+    assert analytics.sharpe_ratio(np.array([0.01, 0.01]), periods) is None
+
+
+def test_periods_per_year_follows_sampling_frequency():
+    weekly = np.arange(0, 7 * 53, 7)
+    assert analytics.periods_per_year(weekly) == pytest.approx(365.25 / 7)
+    assert analytics.periods_per_year(np.array([5])) == 252
+
+
+if __name__ == "__main__":
+    pytest.main()
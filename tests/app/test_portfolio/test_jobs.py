@@ -0,0 +1,203 @@
+import asyncio
+import time
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.cache
+from app.cache import InMemoryRedis
+from app.config import settings
+from app.portfolio import jobs, worker
+from app.portfolio.models import RebalanceJobStatus, RebalanceResponse
+from app.portfolio.router import router
+from app.progress import DATA_FETCHED, SIGNALS_COMPUTED, report
+
+REQUEST = {
+    "date": "2024-07-05",
+    "symbols": ["AAA", "BBB"],
+    "interval": "1d",
+    "market_index": "^GSPC",
+}
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch) -> InMemoryRedis:
+    client = InMemoryRedis()
+    monkeypatch.setattr(app.cache, "redis_client", client)
+    return client
+
+
+@pytest.fixture
+def client() -> TestClient:
+    api = FastAPI()
+    api.include_router(router)
+    return TestClient(api)
+
+
+class FakePortfolioService:
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+
+    async def rebalance(self, request, on_progress=None):
+        report(on_progress, DATA_FETCHED)
+        if self.error is not None:
+            raise self.error
+        report(on_progress, SIGNALS_COMPUTED)
+        return RebalanceResponse(success=True, message=f"Rebalanced {request.date}")
+
+
+def test_queued_jobs_report_their_status(client):
+    response = client.post("/rebalance_jobs", json=REQUEST)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "QUEUED"
+    assert app.cache.queue_items(jobs.QUEUE_NAME) == [job["job_id"]]
+
+    status = client.get(f"/rebalance_jobs/{job['job_id']}").json()
+    assert status["status"] == "QUEUED"
+    assert status["request"]["date"] == "2024-07-05"
+    assert client.get("/rebalance_jobs/missing").status_code == 404
+
+
+def test_worker_runs_jobs_to_their_result(client):
+    job_id = client.post("/rebalance_jobs", json=REQUEST).json()["job_id"]
+
+    job = jobs.next_rebalance_job(timeout=1)
+    assert job.job_id == job_id
+    assert app.cache.queue_items(jobs.PROCESSING_NAME) == [job_id]
+    asyncio.run(worker.run_rebalance_job(job, FakePortfolioService()))
+
+    status = client.get(f"/rebalance_jobs/{job_id}").json()
+    assert status["status"] == "SUCCEEDED"
+    assert status["progress"] == [DATA_FETCHED, SIGNALS_COMPUTED]
+    assert status["result"]["message"] == f"Rebalanced {date(2024, 7, 5)}"
+    assert status["attempts"] == 1
+    # Finished jobs leave the processing list and are never requeued
+    assert app.cache.queue_items(jobs.PROCESSING_NAME) == []
+    assert jobs.requeue_stalled_jobs() == 0
+    assert jobs.next_rebalance_job(timeout=0.01) is None
+
+
+def test_crashed_rebalances_fail_the_job(client):
+    job_id = client.post("/rebalance_jobs", json=REQUEST).json()["job_id"]
+    job = jobs.next_rebalance_job(timeout=1)
+    asyncio.run(worker.run_rebalance_job(job, FakePortfolioService(KeyError("x"))))
+
+    status = client.get(f"/rebalance_jobs/{job_id}").json()
+    assert status["status"] == "FAILED"
+    assert status["progress"] == [DATA_FETCHED]
+    assert status["result"]["message"].startswith("Rebalance failed")
+
+
+def test_jobs_of_dead_workers_are_requeued_then_failed(client, redis):
+    job_id = client.post("/rebalance_jobs", json=REQUEST).json()["job_id"]
+
+    for attempt in range(1, settings.rebalance_job_max_attempts + 1):
+        job = jobs.next_rebalance_job(timeout=1)
+        jobs.mark_running(job)
+        # A leased job is left to its worker
+        assert jobs.requeue_stalled_jobs() == 0
+        # The worker dies: nothing renews the lease until it runs out
+        redis.delete(jobs._lease_key(job_id))
+        requeued = jobs.requeue_stalled_jobs()
+        status = client.get(f"/rebalance_jobs/{job_id}").json()
+        assert status["attempts"] == attempt
+        if attempt < settings.rebalance_job_max_attempts:
+            assert requeued == 1
+            assert status["status"] == "QUEUED"
+            assert app.cache.queue_items(jobs.QUEUE_NAME) == [job_id]
+
+    assert requeued == 0
+    assert status["status"] == "FAILED"
+    assert "worker stopped" in status["result"]["message"]
+    assert app.cache.queue_items(jobs.QUEUE_NAME) == []
+    assert app.cache.queue_items(jobs.PROCESSING_NAME) == []
+
+
+def test_jobs_taken_but_never_leased_are_requeued(client):
+    job_id = client.post("/rebalance_jobs", json=REQUEST).json()["job_id"]
+    # The worker died right after taking the job off the queue
+    app.cache.move_queue(jobs.QUEUE_NAME, jobs.PROCESSING_NAME, timeout=1)
+
+    assert jobs.requeue_stalled_jobs() == 1
+    job = jobs.next_rebalance_job(timeout=1)
+    assert job.job_id == job_id
+    assert job.status == RebalanceJobStatus.QUEUED
+    assert jobs.renew_lease(job)
+
+
+def test_leases_are_lost_once_a_job_is_requeued(client, redis):
+    client.post("/rebalance_jobs", json=REQUEST)
+    job = jobs.next_rebalance_job(timeout=1)
+    redis.delete(jobs._lease_key(job.job_id))
+    jobs.requeue_stalled_jobs()
+
+    assert not jobs.renew_lease(job)
+
+
+def test_jobs_finished_while_being_reclaimed_keep_their_result(
+    client, redis, monkeypatch
+):
+    job_id = client.post("/rebalance_jobs", json=REQUEST).json()["job_id"]
+    job = jobs.next_rebalance_job(timeout=1)
+    jobs.mark_running(job)
+    redis.delete(jobs._lease_key(job_id))
+
+    # The worker finishes right after the record was read for the reclaim
+    read = jobs.get_rebalance_job
+
+    def read_then_finish(job_id):
+        record = read(job_id)
+        if job.status == RebalanceJobStatus.RUNNING:
+            jobs.mark_finished(job, RebalanceResponse(success=True, message="done"))
+        return record
+
+    monkeypatch.setattr(jobs, "get_rebalance_job", read_then_finish)
+    assert jobs.requeue_stalled_jobs() == 0
+    assert client.get(f"/rebalance_jobs/{job_id}").json()["status"] == "SUCCEEDED"
+
+
+def test_requeued_jobs_finished_by_their_first_worker_are_dropped(client, redis):
+    job_id = client.post("/rebalance_jobs", json=REQUEST).json()["job_id"]
+    job = jobs.next_rebalance_job(timeout=1)
+    jobs.mark_running(job)
+    redis.delete(jobs._lease_key(job_id))
+    assert jobs.requeue_stalled_jobs() == 1
+
+    # The slow first worker still finishes it
+    jobs.mark_finished(job, RebalanceResponse(success=True, message="done"))
+    assert jobs.next_rebalance_job(timeout=1) is None
+    assert client.get(f"/rebalance_jobs/{job_id}").json()["status"] == "SUCCEEDED"
+    assert app.cache.queue_items(jobs.PROCESSING_NAME) == []
+
+
+class BlockingPortfolioService:
+    """Blocks the event loop, as long synchronous rebalance steps do."""
+
+    def __init__(self, redis: InMemoryRedis, job_id: str, seconds: float):
+        self.redis = redis
+        self.job_id = job_id
+        self.seconds = seconds
+        self.leased = None
+
+    async def rebalance(self, request, on_progress=None):
+        time.sleep(self.seconds)
+        self.leased = bool(self.redis.exists(jobs._lease_key(self.job_id)))
+        return RebalanceResponse(success=True, message="done")
+
+
+def test_leases_are_renewed_while_the_event_loop_is_blocked(client, redis, monkeypatch):
+    monkeypatch.setattr(settings, "rebalance_job_lease_ttl", 1)
+    client.post("/rebalance_jobs", json=REQUEST)
+    job = jobs.next_rebalance_job(timeout=1)
+    service = BlockingPortfolioService(redis, job.job_id, seconds=1.5)
+
+    asyncio.run(worker.run_rebalance_job(job, service))
+    assert service.leased
+    assert job.status == RebalanceJobStatus.SUCCEEDED
+
+
+if __name__ == "__main__":
+    pytest.main()
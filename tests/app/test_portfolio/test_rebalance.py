@@ -0,0 +1,175 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.portfolio.models import Order, OrderType
+from app.portfolio.rebalance import PositionArrays, plan_rebalance
+from app.portfolio_state.models import PortfolioState, Position
+from app.strategy.models import SignalType, StockSignal
+
+
+def make_state(rng: np.random.Generator, symbols: list[str]) -> PortfolioState:
+    positions = []
+    for symbol in symbols:
+        quantity = float(rng.integers(1, 500))
+        price = float(np.round(rng.uniform(1, 500), 2))
+        positions.append(
+            Position(
+                symbol=symbol, quantity=quantity, price=price, value=quantity * price
+            )
+        )
+    return PortfolioState(
+        date=date(2023, 6, 1),
+        timestamp=datetime(2023, 6, 1),
+        positions=positions,
+        cash_balance=250_000.0,
+        total_value=250_000.0 + sum(p.value for p in positions),
+    )
+
+
+def make_signals(rng: np.random.Generator, symbols: list[str]) -> list[StockSignal]:
+    return [
+        StockSignal(
+            symbol=symbol,
+            signal=SignalType.BUY,
+            risk_unit=float(np.round(rng.uniform(0.001, 0.02), 4)),
+            momentum_score=float(rng.normal()),
+            current_price=float(np.round(rng.uniform(1, 500), 2)),
+        )
+        for symbol in symbols
+    ]
+
+
+# The object-based rebalance plan_rebalance replaced, kept as its reference
+def reference_target_positions(
+    signals: list[StockSignal], state: PortfolioState
+) -> dict[str, Position]:
+    total_value = Decimal(str(state.total_value))
+    target_positions: dict[str, Position] = {}
+    for signal in signals:
+        if signal.signal == SignalType.BUY:
+            allocation = Decimal(str(signal.risk_unit)) * total_value
+            quantity = int(allocation / Decimal(str(signal.current_price)))
+            target_positions[signal.symbol] = Position(
+                symbol=signal.symbol,
+                quantity=quantity,
+                price=float(signal.current_price),
+                value=float(quantity * Decimal(str(signal.current_price))),
+            )
+    return target_positions
+
+
+def reference_orders(
+    current_positions: dict[str, Position], target_positions: dict[str, Position]
+) -> list[Order]:
+    # Sells of positions outside the target first, then buys and adjustments
+    orders = [
+        Order(
+            symbol=symbol,
+            order_type=OrderType.MARKET,
+            quantity=-position.quantity,
+            price=position.price,
+        )
+        for symbol, position in current_positions.items()
+        if symbol not in target_positions
+    ]
+    for symbol, position in target_positions.items():
+        held = current_positions.get(symbol)
+        quantity = position.quantity - (held.quantity if held else 0)
+        if held is None or quantity != 0:
+            orders.append(
+                Order(
+                    symbol=symbol,
+                    order_type=OrderType.MARKET,
+                    quantity=quantity,
+                    price=position.price,
+                )
+            )
+    return orders
+
+
+def reference_execute(state: PortfolioState, orders: list[Order]) -> PortfolioState:
+    new_positions = {p.symbol: p for p in state.positions}
+    cash_balance = state.cash_balance
+    for order in orders:
+        position = new_positions.setdefault(
+            order.symbol,
+            Position(symbol=order.symbol, quantity=0, price=order.price, value=0.0),
+        )
+        position.quantity += order.quantity
+        position.price = order.price
+        position.value = position.quantity * position.price
+        cash_balance -= order.quantity * order.price
+        if position.quantity == 0:
+            del new_positions[order.symbol]
+
+    return PortfolioState(
+        portfolio_id=state.portfolio_id,
+        date=state.date,
+        timestamp=state.timestamp,
+        positions=list(new_positions.values()),
+        cash_balance=float(cash_balance),
+        total_value=float(cash_balance + sum(p.value for p in new_positions.values())),
+    )
+
+
+def legacy_plan(state: PortfolioState, signals: list[StockSignal]):
+    state = state.model_copy(deep=True)
+    target = reference_target_positions(signals, state)
+    orders = reference_orders({p.symbol: p for p in state.positions}, target)
+    return orders, reference_execute(state, orders)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_plan_matches_object_path(seed):
+    rng = np.random.default_rng(seed)
+    universe = [f"S{i}" for i in range(60)]
+    held = list(rng.choice(universe, size=25, replace=False))
+    signalled = list(rng.choice(universe, size=30, replace=False))
+    state = make_state(rng, held)
+    signals = make_signals(rng, signalled)
+    # Keep some holdings at exactly their target quantity
+    for position in state.positions[:3]:
+        for signal in signals:
+            if signal.symbol == position.symbol:
+                signal.current_price = position.price
+
+    expected_orders, expected_state = legacy_plan(state, signals)
+    plan = plan_rebalance(
+        PositionArrays.from_positions(state.positions),
+        PositionArrays.from_signals(signals, state.total_value),
+        state.cash_balance,
+    )
+
+    orders = plan.orders()
+    assert [(o.symbol, o.quantity, o.price) for o in orders] == [
+        (o.symbol, o.quantity, o.price) for o in expected_orders
+    ]
+    positions = plan.positions.to_positions()
+    assert [(p.symbol, p.quantity, p.price) for p in positions] == [
+        (p.symbol, p.quantity, p.price) for p in expected_state.positions
+    ]
+    np.testing.assert_allclose(
+        [p.value for p in positions], [p.value for p in expected_state.positions]
+    )
+    assert plan.cash_balance == pytest.approx(expected_state.cash_balance)
+    assert plan.total_value == pytest.approx(expected_state.total_value)
+
+
+def test_target_quantities_truncate_like_decimal():
+    signals = [
+        StockSignal(
+            symbol="A",
+            signal=SignalType.BUY,
+            risk_unit=0.3,
+            momentum_score=1.0,
+            current_price=0.1,
+        )
+    ]
+    assert PositionArrays.from_signals(signals, 1000.0).quantities.tolist() == [3000]
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,84 @@
+from datetime import date, datetime
+
+import pytest
+
+import app.cache
+from app.cache import InMemoryRedis
+from app.portfolio_state import cache
+from app.portfolio_state.models import PortfolioState
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch) -> InMemoryRedis:
+    client = InMemoryRedis()
+    monkeypatch.setattr(app.cache, "redis_client", client)
+    return client
+
+
+def state(
+    day: int, hour: int, total_value: float, portfolio_id: str = "a"
+) -> PortfolioState:
+    return PortfolioState(
+        portfolio_id=portfolio_id,
+        date=date(2024, 7, day),
+        timestamp=datetime(2024, 7, day, hour),
+        positions=[],
+        cash_balance=total_value,
+        total_value=total_value,
+    )
+
+
+def test_reads_loaded_before_a_write_do_not_overwrite_it():
+    old, new = state(1, 9, 100), state(2, 9, 200)
+    cache.cache_state(old, is_latest=True)
+    cache.write_through(new)
+    # A reader that loaded the old state before the write fills late
+    cache.cache_state(old, is_latest=True)
+    assert cache.get_cached_latest_state("a") == new
+
+    # The same day rewritten later in the day wins over an earlier read too
+    rewritten = state(2, 15, 250)
+    cache.write_through(rewritten)
+    cache.cache_state(new)
+    assert cache.get_cached_state("a", new.date) == rewritten
+
+
+def test_writes_without_a_cached_latest_state_block_older_fills():
+    old, new = state(1, 9, 100), state(2, 9, 200)
+    cache.write_through(new)
+    assert cache.get_cached_latest_state("a") is None
+
+    cache.cache_state(old, is_latest=True)
+    assert cache.get_cached_latest_state("a") is None
+    cache.cache_state(new, is_latest=True)
+    assert cache.get_cached_latest_state("a") == new
+
+
+def test_backfills_do_not_replace_the_latest_state():
+    latest = state(5, 9, 500)
+    cache.cache_state(latest, is_latest=True)
+    cache.write_through(state(1, 9, 100))
+    assert cache.get_cached_latest_state("a") == latest
+
+    # Initiation starts over, whatever was cached before
+    restarted = state(1, 10, 1000)
+    cache.reset_cache(restarted)
+    assert cache.get_cached_latest_state("a") == restarted
+
+
+@pytest.mark.parametrize("other_id", ["a:b", "a*"])
+def test_reset_leaves_other_portfolios_alone(other_id):
+    other = state(1, 9, 100, portfolio_id=other_id)
+    cache.cache_state(other, is_latest=True)
+
+    cache.reset_cache(state(1, 10, 1000))
+    assert cache.get_cached_latest_state(other_id) == other
+    assert cache.get_cached_state(other_id, other.date) == other
+
+    # Nor does resetting a portfolio whose id is a glob pattern
+    cache.reset_cache(state(1, 10, 1000, portfolio_id="*"))
+    assert cache.get_cached_latest_state(other_id) == other
+
+
+if __name__ == "__main__":
+    pytest.main()
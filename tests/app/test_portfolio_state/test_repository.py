@@ -0,0 +1,101 @@
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.portfolio_state.models import Position, UpdatePortfolioStateRequest
+from app.portfolio_state.repository.database import DatabaseRepository
+
+
+@pytest.fixture
+def repo():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield DatabaseRepository(session)
+    session.close()
+
+
+def position(symbol: str, quantity: float, price: float) -> Position:
+    return Position(
+        symbol=symbol, quantity=quantity, price=price, value=quantity * price
+    )
+
+
+def test_update_and_read_latest_state(repo):
+    asyncio.run(
+        repo.update_portfolio_state(
+            date(2023, 6, 1),
+            [position("MSFT", 2, 100), position("AAPL", 1, 50)],
+            750,
+            1000,
+        )
+    )
+
+    latest = asyncio.run(repo.get_latest_portfolio_state())
+    assert latest.date == date(2023, 6, 1)
+    assert [p.symbol for p in latest.positions] == ["AAPL", "MSFT"]
+    assert latest.cash_balance == 750
+
+
+def test_update_replaces_positions_for_same_date(repo):
+    asyncio.run(repo.initiate_portfolio_state(1000.0))
+    day = date(2023, 6, 1)
+    asyncio.run(repo.update_portfolio_state(day, [position("AAPL", 1, 50)], 950, 1000))
+    asyncio.run(repo.update_portfolio_state(day, [position("MSFT", 1, 80)], 920, 1000))
+
+    state = asyncio.run(repo.get_portfolio_state(day))
+    assert [p.symbol for p in state.positions] == ["MSFT"]
+
+
+def test_position_history(repo):
+    asyncio.run(repo.initiate_portfolio_state(1000.0))
+    for day, quantity in ((1, 1), (2, 3), (3, 0)):
+        held = [position("AAPL", quantity, 50)] if quantity else []
+        asyncio.run(repo.update_portfolio_state(date(2023, 6, day), held, 1000, 1000))
+
+    history = asyncio.run(
+        repo.get_position_history("AAPL", date(2023, 6, 1), date(2023, 6, 30))
+    )
+    assert [(h.date.day, h.quantity) for h in history] == [(1, 1), (2, 3)]
+
+
+def test_portfolios_are_isolated(repo):
+    day = date(2023, 6, 1)
+    asyncio.run(repo.initiate_portfolio_state(500.0, "b"))
+    asyncio.run(
+        repo.update_portfolio_states(
+            [
+                UpdatePortfolioStateRequest(
+                    portfolio_id="a",
+                    date=day,
+                    positions=[position("AAPL", 2, 50)],
+                    cash_balance=900,
+                    total_value=1000,
+                ),
+                UpdatePortfolioStateRequest(
+                    portfolio_id="b",
+                    date=day,
+                    positions=[position("AAPL", 1, 50)],
+                    cash_balance=450,
+                    total_value=500,
+                ),
+            ]
+        )
+    )
+    asyncio.run(repo.initiate_portfolio_state(700.0, "b"))
+
+    latest = asyncio.run(repo.get_latest_portfolio_states(["a", "b", "missing"]))
+    assert set(latest) == {"a", "b"}
+    assert latest["a"].date == day
+    assert latest["b"].total_value == 700
+
+    history = asyncio.run(repo.get_position_history("AAPL", day, day))
+    assert [h.portfolio_id for h in history] == ["a"]
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,77 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.metrics import timed
+from app.profiling import profile_request
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.middleware("http")(profile_request)
+
+    @app.get("/work")
+    async def work():
+        with timed("feature_computation"):
+            sum(range(1000))
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_requests_without_opt_in_are_not_profiled(client):
+    response = client.get("/work")
+    assert "Server-Timing" not in response.headers
+
+
+def test_opt_in_returns_stage_breakdown(client):
+    response = client.get("/work", params={"profile": "1"})
+    timing = response.headers["Server-Timing"]
+    assert "feature_computation;dur=" in timing
+    assert 'desc="1 calls"' in timing
+    assert "total;dur=" in timing
+    assert "X-Profile-Artifact" not in response.headers
+
+
+def test_full_profile_saves_artifact(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_token", "secret")
+    response = client.get(
+        "/work", headers={"X-Profile": "full", "X-Profile-Token": "secret"}
+    )
+    artifact = response.headers["X-Profile-Artifact"]
+    assert "/" not in artifact
+    assert (tmp_path / artifact).exists()
+
+
+@pytest.mark.parametrize("token", [None, "wrong"])
+def test_full_profile_needs_the_configured_token(client, tmp_path, monkeypatch, token):
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_token", "secret")
+    headers = {"X-Profile": "full"}
+    if token:
+        headers["X-Profile-Token"] = token
+    response = client.get("/work", headers=headers)
+    assert "Server-Timing" in response.headers
+    assert "X-Profile-Artifact" not in response.headers
+    assert not list(tmp_path.glob("*.prof"))
+
+
+def test_only_the_newest_artifacts_are_kept(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_token", "secret")
+    monkeypatch.setattr(settings, "profiling_max_artifacts", 2)
+    artifacts = [
+        client.get(
+            "/work", headers={"X-Profile": "full", "X-Profile-Token": "secret"}
+        ).headers["X-Profile-Artifact"]
+        for _ in range(3)
+    ]
+    assert len(list(tmp_path.glob("*.prof"))) == 2
+    assert (tmp_path / artifacts[-1]).exists()
+
+
+if __name__ == "__main__":
+    pytest.main()
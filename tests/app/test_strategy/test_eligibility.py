@@ -0,0 +1,85 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.strategy.eligibility import EligibilityIndex
+from app.strategy.models import StrategyParameters, UniverseEligibilityDB
+from app.strategy.momentum_strategy import MomentumStrategy
+
+from .test_panel import make_stock_data
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_index_matches_per_symbol_filters(db):
+    strategy = MomentumStrategy(StrategyParameters())
+    index = EligibilityIndex(strategy, db)
+    rising = make_stock_data("UP", 160, drift=0.003, seed=1)
+    falling = make_stock_data("DOWN", 160, drift=-0.003, seed=2)
+
+    asyncio.run(index.update(rising))
+    asyncio.run(index.update(falling))
+
+    assert db.query(UniverseEligibilityDB).count() == 2 * (160 - 100 + 1)
+    # The last bar, a Friday, is the last session before the Saturday after
+    as_of = rising.data_points[-1].date + timedelta(days=1)
+    disqualified = asyncio.run(index.get_disqualified(["UP", "DOWN", "NEW"], as_of))
+    assert disqualified == {
+        data.symbol
+        for data in (rising, falling)
+        if strategy._is_stock_disqualified(data)
+    }
+    assert "DOWN" in disqualified
+
+
+def test_only_the_row_of_the_last_session_before_as_of_is_used(db):
+    index = EligibilityIndex(MomentumStrategy(StrategyParameters()), db)
+    falling = make_stock_data("DOWN", 160, drift=-0.003, seed=2)
+    asyncio.run(index.update(falling))
+    # A Friday, so the Saturday after has it as its last session
+    last = falling.data_points[-1].date
+
+    # A later session has no row yet, so the symbol is scored in full
+    assert (
+        asyncio.run(index.get_disqualified(["DOWN"], last + timedelta(days=5))) == set()
+    )
+    # A run for the last bar's own date never sees that bar
+    db.query(UniverseEligibilityDB).filter(UniverseEligibilityDB.date < last).delete()
+    assert asyncio.run(index.get_disqualified(["DOWN"], last)) == set()
+    assert asyncio.run(index.get_disqualified(["DOWN"], last + timedelta(days=1))) == {
+        "DOWN"
+    }
+
+
+def test_reindexing_replaces_rows(db):
+    index = EligibilityIndex(MomentumStrategy(StrategyParameters()), db)
+    data = make_stock_data("UP", 120, drift=0.003, seed=1)
+    asyncio.run(index.update(data))
+    asyncio.run(index.update(data))
+    assert db.query(UniverseEligibilityDB).count() == 21
+
+
+def test_only_daily_bars_are_indexed(db):
+    index = EligibilityIndex(MomentumStrategy(StrategyParameters()), db)
+    data = make_stock_data("UP", 120, drift=0.003, seed=1)
+    asyncio.run(index.update(data, "1d"))
+    asyncio.run(index.update(make_stock_data("UP", 120, drift=-0.003, seed=3), "1wk"))
+
+    rows = db.query(UniverseEligibilityDB).order_by(UniverseEligibilityDB.date)
+    assert rows.count() == 21
+    assert rows.first().date == data.data_points[99].date
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,88 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.data.models import StockData, StockDataPoint
+from app.strategy.models import StrategyParameters
+from app.strategy.momentum_strategy import MomentumStrategy
+from app.strategy.panel import PricePanel
+from app.strategy.registry import available_strategies, get_strategy
+
+
+def make_stock_data(symbol: str, n_bars: int, drift: float, seed: int) -> StockData:
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(drift + 0.01 * rng.standard_normal(n_bars)))
+    opens = closes * (1 + 0.002 * rng.standard_normal(n_bars))
+    start = date(2023, 1, 1)
+    return StockData(
+        symbol=symbol,
+        data_points=[
+            StockDataPoint(
+                date=start + timedelta(days=i),
+                open=float(opens[i]),
+                high=float(max(opens[i], closes[i]) * 1.01),
+                low=float(min(opens[i], closes[i]) * 0.99),
+                close=float(closes[i]),
+                volume=1_000_000,
+            )
+            for i in range(n_bars)
+        ],
+    )
+
+
+@pytest.fixture
+def universe() -> dict[str, StockData]:
+    return {
+        f"S{i}": make_stock_data(f"S{i}", 150 + i, drift=0.002 * (i % 3 - 1), seed=i)
+        for i in range(12)
+    }
+
+
+@pytest.fixture
+def index_data() -> StockData:
+    return make_stock_data("^IDX", 250, drift=0.001, seed=99)
+
+
+def test_price_panel_is_right_aligned():
+    panel = PricePanel.from_stock_data(
+        {"A": make_stock_data("A", 3, 0.0, 0), "B": make_stock_data("B", 5, 0.0, 1)}
+    )
+    assert panel.close.shape == (2, 5)
+    assert panel.lengths.tolist() == [3, 5]
+    assert np.isnan(panel.close[0, :2]).all()
+    assert not np.isnan(panel.close[1]).any()
+
+
+def test_panel_signals_match_per_symbol_signals(universe, index_data):
+    strategy = MomentumStrategy(StrategyParameters())
+
+    expected = strategy.generate_signals(universe, index_data)
+    panel_signals = strategy.generate_panel_signals(
+        PricePanel.from_stock_data(universe), index_data
+    )
+    actual = strategy.select_signals(panel_signals)
+
+    assert expected
+    assert [s.symbol for s in actual] == [s.symbol for s in expected]
+    for a, e in zip(actual, expected, strict=True):
+        assert a.momentum_score == pytest.approx(e.momentum_score, rel=1e-9)
+        assert a.risk_unit == pytest.approx(e.risk_unit, rel=1e-9)
+        assert a.current_price == e.current_price
+
+
+def test_panel_marks_short_histories_ineligible(index_data):
+    strategy = MomentumStrategy(StrategyParameters())
+    panel = PricePanel.from_stock_data({"NEW": make_stock_data("NEW", 50, 0.01, 0)})
+    assert not strategy.generate_panel_signals(panel, index_data).eligible.any()
+
+
+def test_strategy_registry():
+    assert "momentum" in available_strategies()
+    assert isinstance(get_strategy("momentum"), MomentumStrategy)
+    with pytest.raises(ValueError):
+        get_strategy("does_not_exist")
+
+
+if __name__ == "__main__":
+    pytest.main()
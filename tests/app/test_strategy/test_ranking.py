@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+import app.cache
+from app.cache import InMemoryRedis
+from app.strategy.models import StrategyParameters
+from app.strategy.momentum_strategy import MomentumStrategy
+from app.strategy.panel import PricePanel
+from app.strategy.ranking import SignalRanking
+
+from .test_panel import make_stock_data
+
+
+@pytest.fixture
+def ranking(monkeypatch) -> SignalRanking:
+    monkeypatch.setattr(app.cache, "redis_client", InMemoryRedis())
+    return SignalRanking(MomentumStrategy(StrategyParameters()), "momentum")
+
+
+def test_refresh_ranks_eligible_symbols_by_score(ranking):
+    stock_data = {
+        "AAA": make_stock_data("AAA", 160, drift=0.003, seed=2),
+        "BBB": make_stock_data("BBB", 160, drift=0.003, seed=4),
+        "CCC": make_stock_data("CCC", 160, drift=0.003, seed=5),
+        "DOWN": make_stock_data("DOWN", 160, drift=-0.003, seed=2),
+    }
+    universe = list(stock_data)
+    assert ranking.top(universe, 10) is None
+
+    asyncio.run(ranking.refresh(universe, stock_data))
+
+    filters = ranking.strategy.evaluate_filters(PricePanel.from_stock_data(stock_data))
+    expected = sorted(
+        (
+            (float(score), symbol)
+            for symbol, score, eligible in zip(
+                universe, filters.momentum_score, filters.eligible, strict=True
+            )
+            if eligible
+        ),
+        reverse=True,
+    )
+    top = ranking.top(universe, 10)
+    assert [r.symbol for r in top] == [symbol for _, symbol in expected]
+    assert [r.momentum_score for r in top] == pytest.approx(
+        [score for score, _ in expected]
+    )
+    assert len(top) == 3
+    assert "DOWN" not in {r.symbol for r in top}
+    assert [r.symbol for r in ranking.top(universe, 1)] == [expected[0][1]]
+
+
+def test_ingest_rescores_only_newer_bars_of_its_symbol(ranking):
+    rising = make_stock_data("AAA", 160, drift=0.003, seed=4)
+    steady = make_stock_data("BBB", 160, drift=0.003, seed=5)
+    universe = ["AAA", "BBB"]
+    asyncio.run(ranking.refresh(universe, {"AAA": rising, "BBB": steady}))
+    before = {r.symbol: r.momentum_score for r in ranking.top(universe, 10)}
+    assert set(before) == {"AAA", "BBB"}
+
+    # A crash in newer bars drops the symbol; the other score is untouched
+    crashed = make_stock_data("AAA", 200, drift=-0.01, seed=4)
+    asyncio.run(ranking.update(crashed))
+    after = {r.symbol: r.momentum_score for r in ranking.top(universe, 10)}
+    assert after == {"BBB": before["BBB"]}
+
+    # Backfilled history older than the ranked bar is ignored
+    asyncio.run(ranking.update(rising))
+    assert {r.symbol for r in ranking.top(universe, 10)} == {"BBB"}
+
+
+def test_non_daily_bars_leave_rankings_unchanged(ranking):
+    universe = ["AAA", "BBB"]
+    asyncio.run(
+        ranking.refresh(
+            universe,
+            {
+                "AAA": make_stock_data("AAA", 160, drift=0.003, seed=4),
+                "BBB": make_stock_data("BBB", 160, drift=0.003, seed=5),
+            },
+        )
+    )
+    before = ranking.top(universe, 10)
+
+    # Weekly bars reach further ahead than the daily ones, and crash
+    weekly = make_stock_data("AAA", 200, drift=-0.01, seed=4)
+    asyncio.run(ranking.update(weekly, "1wk"))
+    assert ranking.top(universe, 10) == before
+    asyncio.run(ranking.update(weekly, "1d"))
+    assert ranking.top(universe, 10) != before
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,124 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.strategy.models import SignalRequest, SignalType, StockSignal
+from app.strategy.panel import PanelFilters, PanelSignals
+from app.strategy.ranking_history import RankingHistory
+
+
+@pytest.fixture
+def history():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield RankingHistory(session)
+    session.close()
+
+
+def make_panel_signals(scores: list[float], eligible: list[bool]) -> PanelSignals:
+    n = len(scores)
+    passes = np.array(eligible)
+    return PanelSignals(
+        symbols=[f"S{i}" for i in range(n)],
+        eligible=passes.copy(),
+        momentum_score=np.array(scores),
+        risk_unit=np.full(n, 0.5),
+        current_price=np.full(n, 10.0),
+        filters=PanelFilters(
+            passes_gap=np.ones(n, dtype=bool),
+            passes_moving_average=passes,
+            passes_momentum=np.ones(n, dtype=bool),
+            momentum_score=np.array(scores),
+        ),
+    )
+
+
+def signal(symbol: str) -> StockSignal:
+    return StockSignal(
+        symbol=symbol,
+        signal=SignalType.BUY,
+        risk_unit=0.5,
+        momentum_score=1.0,
+        current_price=10.0,
+    )
+
+
+def request_on(
+    day: date, interval: str = "1d", market_index: str = "^GSPC"
+) -> SignalRequest:
+    return SignalRequest(
+        symbols=["S0"], date=day, interval=interval, market_index=market_index
+    )
+
+
+def test_runs_store_full_ranking_per_date(history):
+    day = date(2024, 7, 5)
+    panel_signals = make_panel_signals(
+        [0.1, 0.3, np.nan, 0.9, 0.2], [True, True, False, False, True]
+    )
+    history.save("run", request_on(day), panel_signals, [signal("S1")], {})
+    # A rerun replaces the rows of that date
+    history.save(
+        "run",
+        request_on(day),
+        panel_signals,
+        [signal("S1")],
+        {"S5": "eligibility_index"},
+    )
+
+    page = history.get_page(ranking_date=day, limit=3)
+    assert [e.symbol for e in page.entries] == ["S1", "S4", "S0"]
+    assert [e.rank for e in page.entries] == [1, 2, 3]
+    assert [e.selected for e in page.entries] == [True, False, False]
+    assert page.next_offset == 3
+
+    rest = history.get_page(ranking_date=day, limit=3, offset=page.next_offset)
+    # Ineligible symbols follow by score, NaN scores last, then
+    # symbols that never reached scoring come last, with the reason
+    assert [(e.symbol, e.momentum_score) for e in rest.entries] == [
+        ("S3", 0.9),
+        ("S2", None),
+        ("S5", None),
+    ]
+    assert rest.entries[0].passes_moving_average is False
+    assert rest.entries[0].reason == "moving_average"
+    assert (rest.entries[2].rank, rest.entries[2].reason) == (6, "eligibility_index")
+    assert rest.next_offset is None
+
+
+def test_runs_on_other_bars_or_indexes_keep_their_own_rows(history):
+    day = date(2024, 7, 5)
+    runs = [{}, {"interval": "1wk"}, {"market_index": "^NDX"}]
+    for i, run in enumerate(runs):
+        history.save(
+            "run", request_on(day, **run), make_panel_signals([0.1 * i], [True]), [], {}
+        )
+
+    page = history.get_page(ranking_date=day)
+    assert len(page.entries) == 3
+    weekly = history.get_page(ranking_date=day, interval="1wk")
+    assert [(e.interval, e.market_index) for e in weekly.entries] == [("1wk", "^GSPC")]
+    assert weekly.entries[0].momentum_score == pytest.approx(0.1)
+
+
+def test_symbol_pages_run_from_latest_date(history):
+    for day in (date(2024, 7, 1), date(2024, 7, 2), date(2024, 7, 3)):
+        history.save(
+            "run", request_on(day), make_panel_signals([0.1, 0.2], [True, True]), [], {}
+        )
+
+    page = history.get_page(symbol="S0", limit=2)
+    assert [(e.date.day, e.rank) for e in page.entries] == [(3, 2), (2, 2)]
+    assert page.next_offset == 2
+
+    with pytest.raises(ValueError):
+        history.get_page()
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,99 @@
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.cache
+from app.cache import InMemoryRedis, bump_version
+from app.data import cache
+from app.data.service import DataService, version_scope
+from app.database import Base, session_scope
+from app.strategy.models import SignalRequest
+from app.strategy.service import StrategyService
+
+
+@pytest.fixture
+def data_service(monkeypatch):
+    monkeypatch.setattr(app.cache, "redis_client", InMemoryRedis())
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with session_scope(sessionmaker(bind=engine)):
+        yield DataService(data_source="synthetic")
+
+
+def test_signals_fetch_exactly_the_bars_each_window_needs(data_service):
+    service = StrategyService(data_service, "momentum")
+    request = SignalRequest(
+        symbols=["AAA", "BBB"],
+        date=date(2024, 7, 5),
+        interval="1d",
+        market_index="^GSPC",
+    )
+    asyncio.run(service.generate_signals(request))
+
+    def bars(symbol):
+        cached = asyncio.run(
+            data_service.db_repo.get_stock_data(
+                symbol, date(2023, 1, 1), request.date, "1d"
+            )
+        )
+        return cached.data_points
+
+    index_bars = bars("^GSPC")
+    assert len(index_bars) == service.strategy.index_window
+    # The Independence Day holiday is not counted as a bar
+    assert index_bars[-1].date == date(2024, 7, 3)
+    assert len(bars("AAA")) == service.strategy.price_window
+
+
+def test_signal_runs_store_their_ranking(data_service):
+    service = StrategyService(data_service, "momentum")
+    request = SignalRequest(
+        symbols=["AAA", "BBB", "CCC", "DDD"],
+        date=date(2024, 7, 5),
+        interval="1d",
+        market_index="^GSPC",
+    )
+    cache.mark_unavailable("DDD", "1d", "synthetic returned no bars")
+    asyncio.run(service.generate_signals(request))
+
+    page = service.get_rankings(ranking_date=request.date)
+    assert {e.symbol for e in page.entries[:3]} == {"AAA", "BBB", "CCC"}
+    assert {e.ranking_id for e in page.entries} == {service.ranking_id(request.symbols)}
+    assert {(e.interval, e.market_index) for e in page.entries} == {("1d", "^GSPC")}
+    assert [e.rank for e in page.entries] == [1, 2, 3, 4]
+    # Symbols that never got scored are kept with the reason
+    unavailable = page.entries[3]
+    assert unavailable.symbol == "DDD"
+    assert unavailable.reason.startswith("unavailable:")
+
+
+def test_saved_bars_of_an_input_invalidate_cached_signals(data_service):
+    service = StrategyService(data_service, "momentum")
+    request = SignalRequest(
+        symbols=["AAA", "BBB"],
+        date=date(2024, 7, 5),
+        interval="1d",
+        market_index="^GSPC",
+    )
+    reads = []
+    redis = app.cache.redis_client
+    mget = redis.mget
+    redis.mget = lambda keys: reads.append(keys) or mget(keys)
+    key = service._signal_cache_key(request)
+    # One read for all versions, and building a key writes nothing
+    assert len(reads) == 1
+    assert list(redis.scan_iter(match="version:*")) == []
+    assert service._signal_cache_key(request) == key
+
+    bump_version(version_scope("BBB"))
+    assert service._signal_cache_key(request) != key
+    key = service._signal_cache_key(request)
+    bump_version(version_scope("^GSPC"))
+    assert service._signal_cache_key(request) != key
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,129 @@
+import asyncio
+import json
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.cache
+from app.cache import InMemoryRedis
+from app.data.service import DataService
+from app.database import Base, session_scope
+from app.progress import DATA_FETCHED, report
+from app.strategy.models import SignalRequest, SignalResponse
+from app.strategy.router import router, strategy_service_provider
+from app.strategy.service import StrategyService
+from app.strategy.stream import signal_events
+
+REQUEST = SignalRequest(
+    symbols=["AAA", "BBB", "CCC"],
+    date=date(2024, 7, 5),
+    interval="1d",
+    market_index="^GSPC",
+)
+
+
+def parse(chunks: list[str]) -> list[tuple[str, dict]]:
+    events = []
+    for chunk in chunks:
+        if chunk.startswith(":"):
+            continue
+        event, data = chunk.strip().split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data[6:])))
+    return events
+
+
+async def collect(events) -> list[str]:
+    return [chunk async for chunk in events]
+
+
+async def connected() -> bool:
+    return False
+
+
+def test_stream_reports_progress_then_signals(monkeypatch):
+    monkeypatch.setattr(app.cache, "redis_client", InMemoryRedis())
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with session_scope(sessionmaker(bind=engine)):
+        service = StrategyService(DataService(data_source="synthetic"), "momentum")
+        events = parse(asyncio.run(collect(signal_events(service, REQUEST, connected))))
+
+    stages = [event for event, _ in events]
+    assert stages == [
+        "symbols_screened",
+        "symbol_fetched",
+        "symbol_fetched",
+        "symbol_fetched",
+        "data_fetched",
+        "signals_computed",
+        "signals",
+    ]
+    assert events[3][1] == {"symbol": "CCC", "loaded": True, "done": 3, "total": 3}
+    computed = events[5][1]
+    assert computed["scored"] == 3
+    assert len(computed["disqualified"]) == 3 - computed["eligible"]
+    assert len(events[-1][1]["signals"]) == computed["selected"]
+
+
+class StalledService:
+    def __init__(self):
+        self.cancelled = False
+
+    async def generate_signals(self, request, on_progress=None):
+        report(on_progress, DATA_FETCHED, loaded=1)
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return SignalResponse(signals=[])
+
+
+def test_disconnect_cancels_the_run():
+    service = StalledService()
+
+    async def disconnected() -> bool:
+        return True
+
+    async def run():
+        chunks = await collect(
+            signal_events(service, REQUEST, disconnected, poll_interval=0.01)
+        )
+        # Let the cancellation reach the run
+        await asyncio.sleep(0)
+        return chunks
+
+    assert parse(asyncio.run(run())) == [("data_fetched", {"loaded": 1})]
+    assert service.cancelled
+
+
+class InstantService:
+    async def generate_signals(self, request, on_progress=None):
+        report(on_progress, DATA_FETCHED, loaded=3)
+        return SignalResponse(signals=[])
+
+
+def test_stream_endpoint_sends_event_stream():
+    api = FastAPI()
+    api.include_router(router)
+    api.dependency_overrides[strategy_service_provider.get_strategy_service] = lambda: (
+        InstantService()
+    )
+
+    response = TestClient(api).post(
+        "/generate_signals/stream", json=REQUEST.model_dump(mode="json")
+    )
+    assert response.headers["content-type"].startswith("text/event-stream")
+    chunks = [f"{chunk}\n\n" for chunk in response.text.split("\n\n") if chunk]
+    assert parse(chunks) == [
+        ("data_fetched", {"loaded": 3}),
+        ("signals", {"signals": []}),
+    ]
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,61 @@
+import pytest
+from loguru import logger
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.cache
+from app.cache import InMemoryRedis
+from app.database import Base, session_scope
+
+from .harness import BenchmarkSession
+
+_session: BenchmarkSession | None = None
+
+
+@pytest.fixture(scope="session")
+def benchmark_session(request) -> BenchmarkSession:
+    global _session
+    _session = BenchmarkSession(
+        tolerance=request.config.getoption("--benchmark-tolerance"),
+        update_baselines=request.config.getoption("--update-benchmark-baselines"),
+    )
+    yield _session
+    if _session.update_baselines:
+        _session.save_baselines()
+
+
+@pytest.fixture
+def benchmark(benchmark_session):
+    return benchmark_session.run
+
+
+def pytest_terminal_summary(terminalreporter):
+    if _session is None or not _session.results:
+        return
+    terminalreporter.section("benchmarks")
+    for line in _session.summary():
+        terminalreporter.write_line(line)
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    # Per-symbol log lines would dominate the timings
+    logger.disable("app")
+    yield
+    logger.enable("app")
+
+
+@pytest.fixture
+def fake_redis(monkeypatch) -> InMemoryRedis:
+    redis = InMemoryRedis()
+    monkeypatch.setattr(app.cache, "redis_client", redis)
+    return redis
+
+
+@pytest.fixture
+def db_session():
+    # SQLite in memory stands in for Postgres
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with session_scope(sessionmaker(bind=engine)) as db:
+        yield db
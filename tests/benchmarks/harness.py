@@ -0,0 +1,95 @@
+import json
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+
+
+def _median_seconds(fn: Callable[[], Any], rounds: int) -> tuple[float, Any]:
+    result = fn()  # warm-up, also primes caches the way a live process would
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def _reference_workload() -> None:
+    values = np.random.default_rng(0).standard_normal(200_000)
+    np.sort(values)
+    total = 0.0
+    for value in values[:100_000].tolist():
+        total += value
+
+
+def calibrate() -> float:
+    """Seconds taken by a fixed mixed numpy/Python workload on this machine.
+
+    Baselines are stored as multiples of it so they carry across machines.
+    """
+    seconds, _ = _median_seconds(_reference_workload, rounds=5)
+    return seconds
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    seconds: float
+    relative: float
+    baseline: float | None
+
+    @property
+    def slowdown(self) -> float | None:
+        if self.baseline is None:
+            return None
+        return self.relative / self.baseline - 1
+
+
+class BenchmarkSession:
+    def __init__(self, tolerance: float, update_baselines: bool):
+        self.tolerance = tolerance
+        self.update_baselines = update_baselines
+        self.reference = calibrate()
+        self.baselines: dict[str, float] = (
+            json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+        )
+        self.results: list[BenchmarkResult] = []
+
+    def run(self, name: str, fn: Callable[[], Any], rounds: int = 5) -> Any:
+        seconds, result = _median_seconds(fn, rounds)
+        benchmark = BenchmarkResult(
+            name=name,
+            seconds=seconds,
+            relative=seconds / self.reference,
+            baseline=self.baselines.get(name),
+        )
+        self.results.append(benchmark)
+
+        if self.update_baselines or benchmark.slowdown is None:
+            return result
+        assert benchmark.slowdown <= self.tolerance, (
+            f"{name} regressed {benchmark.slowdown:.0%} over its baseline "
+            f"({seconds * 1000:.2f}ms, tolerance {self.tolerance:.0%})"
+        )
+        return result
+
+    def save_baselines(self) -> None:
+        baselines = dict(self.baselines)
+        baselines.update({r.name: round(r.relative, 4) for r in self.results})
+        BASELINES_PATH.write_text(
+            json.dumps(baselines, indent=2, sort_keys=True) + "\n"
+        )
+
+    def summary(self) -> list[str]:
+        lines = [f"reference workload: {self.reference * 1000:.2f}ms"]
+        for r in sorted(self.results, key=lambda r: r.name):
+            change = "new" if r.slowdown is None else f"{r.slowdown:+.0%}"
+            lines.append(f"{r.name:<50} {r.seconds * 1000:>10.2f}ms  {change:>6}")
+        return lines
@@ -0,0 +1,88 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from app.data.models import StockData, StockDataPoint
+from app.portfolio_state.models import PortfolioState, Position
+from app.strategy.models import SignalType, StockSignal
+
+START_DATE = date(2022, 1, 3)
+
+
+def make_bars(
+    n_symbols: int, n_bars: int, seed: int = 0, drift: float | None = None
+) -> dict[str, np.ndarray]:
+    """Geometric random walks as (n_symbols, n_bars) OHLCV arrays."""
+    rng = np.random.default_rng(seed)
+    drifts = rng.normal(0.0005, 0.001, size=(n_symbols, 1)) if drift is None else drift
+    log_returns = drifts + 0.015 * rng.standard_normal((n_symbols, n_bars))
+    close = 100 * np.exp(np.cumsum(log_returns, axis=1))
+    open_ = close * (1 + 0.003 * rng.standard_normal((n_symbols, n_bars)))
+    spread = np.abs(0.01 * rng.standard_normal((n_symbols, n_bars)))
+    return {
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + spread),
+        "low": np.minimum(open_, close) * (1 - spread),
+        "close": close,
+        "volume": rng.integers(1e5, 1e7, size=(n_symbols, n_bars)).astype(float),
+    }
+
+
+def make_universe(
+    n_symbols: int, n_bars: int, seed: int = 0, drift: float | None = None
+) -> dict[str, StockData]:
+    bars = make_bars(n_symbols, n_bars, seed, drift)
+    dates = [START_DATE + timedelta(days=i) for i in range(n_bars)]
+    rows = np.stack(
+        [bars[name] for name in ("open", "high", "low", "close", "volume")], axis=-1
+    ).tolist()
+    return {
+        f"SYM{i:05d}": StockData(
+            symbol=f"SYM{i:05d}",
+            data_points=[
+                StockDataPoint(
+                    date=day, open=o, high=h, low=low, close=c, volume=int(v)
+                )
+                for day, (o, h, low, c, v) in zip(dates, rows[i], strict=True)
+            ],
+        )
+        for i in range(n_symbols)
+    }
+
+
+def make_signals(n_symbols: int, seed: int = 0) -> list[StockSignal]:
+    rng = np.random.default_rng(seed)
+    return [
+        StockSignal(
+            symbol=f"SYM{i:05d}",
+            signal=SignalType.BUY,
+            # Allocations sum to about half the portfolio, so repricing held
+            # positions never leaves the cash balance negative
+            risk_unit=float(rng.uniform(0.5, 1.5) * 0.5 / n_symbols),
+            momentum_score=float(rng.uniform(0, 0.01)),
+            current_price=float(rng.uniform(10, 500)),
+        )
+        for i in range(n_symbols)
+    ]
+
+
+def make_portfolio_state(n_positions: int, seed: int = 0) -> PortfolioState:
+    rng = np.random.default_rng(seed)
+    # Every other symbol, so a rebalance both keeps and replaces holdings
+    positions = [
+        Position(symbol=f"SYM{2 * i:05d}", quantity=q, price=p, value=q * p)
+        for i, (q, p) in enumerate(
+            zip(
+                rng.integers(1, 500, n_positions).tolist(),
+                rng.uniform(10, 500, n_positions).tolist(),
+                strict=True,
+            )
+        )
+    ]
+    return PortfolioState(
+        date=START_DATE,
+        timestamp=datetime.combine(START_DATE, datetime.min.time()),
+        positions=positions,
+        cash_balance=1_000_000.0,
+        total_value=1_000_000.0 + sum(p.value for p in positions),
+    )
@@ -0,0 +1,46 @@
+import pytest
+
+from app.cache import get_cache, set_cache
+from app.data.models import StockData
+from app.portfolio_state.models import PortfolioState
+from app.strategy.models import SignalResponse
+
+from .synthetic import make_portfolio_state, make_signals, make_universe
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_stock_data_round_trip(benchmark, fake_redis):
+    stock_data = make_universe(1, 250)["SYM00000"]
+    payload = stock_data.model_dump_json()
+
+    benchmark("cache.stock_data.encode", stock_data.model_dump_json)
+    benchmark("cache.stock_data.decode", lambda: StockData.model_validate_json(payload))
+
+    def round_trip():
+        set_cache("bench:stock_data", stock_data.model_dump_json())
+        return StockData.model_validate_json(get_cache("bench:stock_data"))
+
+    assert benchmark("cache.stock_data.round_trip", round_trip) == stock_data
+
+
+def test_signals_round_trip(benchmark, fake_redis):
+    response = SignalResponse(signals=make_signals(1_000))
+    payload = response.model_dump_json()
+
+    benchmark("cache.signals[1000].encode", response.model_dump_json)
+    benchmark(
+        "cache.signals[1000].decode",
+        lambda: SignalResponse.model_validate_json(payload),
+    )
+
+
+def test_portfolio_state_round_trip(benchmark, fake_redis):
+    state = make_portfolio_state(1_000)
+    payload = state.model_dump_json()
+
+    benchmark("cache.portfolio_state[1000].encode", state.model_dump_json)
+    benchmark(
+        "cache.portfolio_state[1000].decode",
+        lambda: PortfolioState.model_validate_json(payload),
+    )
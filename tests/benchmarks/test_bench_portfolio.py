@@ -0,0 +1,32 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.portfolio.rebalance import PositionArrays, plan_rebalance
+from app.portfolio.service import PortfolioService
+
+from .synthetic import make_portfolio_state, make_signals
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.mark.parametrize("n_positions", [100, 1_000, 5_000])
+def test_order_pipeline(benchmark, n_positions):
+    state = make_portfolio_state(n_positions)
+    signals = make_signals(n_positions)
+    service = PortfolioService(strategy_service=None, portfolio_state_service=None)
+
+    benchmark(
+        f"portfolio.plan_rebalance[{n_positions}]",
+        lambda: plan_rebalance(
+            PositionArrays.from_positions(state.positions),
+            PositionArrays.from_signals(signals, state.total_value),
+            state.cash_balance,
+        ),
+    )
+    update = benchmark(
+        f"portfolio.order_pipeline[{n_positions}]",
+        lambda: asyncio.run(service._plan_rebalance(signals, state, date(2022, 6, 1))),
+    )
+    assert update.positions
@@ -0,0 +1,65 @@
+import asyncio
+from datetime import timedelta
+from itertools import count
+
+import pytest
+
+from app.data.models import StockData
+from app.data.repository.database import DatabaseRepository as StockRepository
+from app.portfolio_state.models import UpdatePortfolioStateRequest
+from app.portfolio_state.repository.database import (
+    DatabaseRepository as PortfolioStateRepository,
+)
+
+from .synthetic import make_portfolio_state, make_universe
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_stock_data_reads_and_writes(benchmark, db_session):
+    repository = StockRepository()
+    stock_data = make_universe(1, 250)["SYM00000"]
+    first = stock_data.data_points[0].date
+    # The end of a range is exclusive
+    end = stock_data.data_points[-1].date + timedelta(days=1)
+    symbols = (f"W{i}" for i in count())
+
+    def write():
+        data = StockData(symbol=next(symbols), data_points=stock_data.data_points)
+        asyncio.run(repository.save_stock_data(data))
+
+    benchmark("repository.stock_data.save[250]", write)
+    asyncio.run(repository.save_stock_data(stock_data))
+    result = benchmark(
+        "repository.stock_data.get[250]",
+        lambda: asyncio.run(
+            repository.get_stock_data(stock_data.symbol, first, end, "1d")
+        ),
+    )
+    assert len(result.data_points) == 250
+
+
+def test_portfolio_state_reads_and_writes(benchmark, db_session):
+    repository = PortfolioStateRepository()
+    state = make_portfolio_state(500)
+    portfolio_ids = [f"P{i}" for i in range(20)]
+    updates = [
+        UpdatePortfolioStateRequest(
+            portfolio_id=portfolio_id,
+            date=state.date,
+            positions=state.positions,
+            cash_balance=state.cash_balance,
+            total_value=state.total_value,
+        )
+        for portfolio_id in portfolio_ids
+    ]
+
+    benchmark(
+        "repository.portfolio_state.update[20x500]",
+        lambda: asyncio.run(repository.update_portfolio_states(updates)),
+    )
+    states = benchmark(
+        "repository.portfolio_state.get_latest[20x500]",
+        lambda: asyncio.run(repository.get_latest_portfolio_states(portfolio_ids)),
+    )
+    assert len(states) == len(portfolio_ids)
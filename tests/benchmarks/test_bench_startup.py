@@ -0,0 +1,27 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _run(script: str) -> None:
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True)
+
+
+def test_cold_import(benchmark):
+    # A fresh interpreter each round, as a new replica would start
+    benchmark("startup.import_main", lambda: _run("import main"), rounds=3)
+
+
+def test_ready_to_serve(benchmark):
+    script = (
+        "from fastapi.testclient import TestClient; import main; "
+        "client = TestClient(main.app); client.__enter__(); "
+        "assert client.get('/metrics').status_code == 200"
+    )
+    benchmark("startup.ready_to_serve", lambda: _run(script), rounds=3)
@@ -0,0 +1,107 @@
+from functools import cache
+
+import numpy as np
+import pytest
+
+from app.data.models import StockData
+from app.strategy.models import StrategyParameters
+from app.strategy.momentum_strategy import MomentumStrategy
+from app.strategy.panel import PricePanel
+from app.strategy.utils import (
+    calculate_atr,
+    calculate_atrs,
+    calculate_momentum_score,
+    calculate_momentum_scores,
+    calculate_moving_average,
+    calculate_moving_averages,
+    has_recent_large_gap,
+    have_recent_large_gaps,
+)
+
+from .synthetic import make_bars, make_universe
+
+pytestmark = pytest.mark.benchmark
+
+N_BARS = 250
+
+
+@cache
+def universe(n_symbols: int) -> dict[str, StockData]:
+    return make_universe(n_symbols, N_BARS, seed=n_symbols)
+
+
+@cache
+def index_data() -> StockData:
+    # A steadily rising index keeps the regime bullish so signals are produced
+    return make_universe(1, N_BARS, seed=7, drift=0.003)["SYM00000"]
+
+
+def test_scalar_utils(benchmark):
+    stock_data = universe(100)["SYM00000"]
+    closes = np.array([p.close for p in stock_data.data_points])
+
+    benchmark(
+        "utils.calculate_momentum_score", lambda: calculate_momentum_score(closes)
+    )
+    benchmark(
+        "utils.calculate_moving_average",
+        # Distinct tuples defeat the lru_cache, as fresh prices would
+        lambda: calculate_moving_average(tuple(closes.tolist()), 100),
+    )
+    benchmark("utils.calculate_atr", lambda: calculate_atr(stock_data, 20))
+    benchmark(
+        "utils.has_recent_large_gap",
+        lambda: has_recent_large_gap(stock_data.data_points, 90, 0.15),
+    )
+
+
+@pytest.mark.parametrize("n_symbols", [1_000, 5_000])
+def test_panel_utils(benchmark, n_symbols):
+    bars = make_bars(n_symbols, N_BARS)
+    close = bars["close"]
+
+    benchmark(
+        f"utils.calculate_momentum_scores[{n_symbols}]",
+        lambda: calculate_momentum_scores(close, 90),
+    )
+    benchmark(
+        f"utils.calculate_moving_averages[{n_symbols}]",
+        lambda: calculate_moving_averages(close, 100),
+    )
+    benchmark(
+        f"utils.calculate_atrs[{n_symbols}]",
+        lambda: calculate_atrs(bars["high"], bars["low"], close, 20),
+    )
+    benchmark(
+        f"utils.have_recent_large_gaps[{n_symbols}]",
+        lambda: have_recent_large_gaps(bars["open"], close, 90, 0.15),
+    )
+
+
+@pytest.mark.parametrize("n_symbols", [100, 1_000, 5_000])
+def test_generate_signals(benchmark, n_symbols):
+    strategy = MomentumStrategy(StrategyParameters())
+    stock_data = universe(n_symbols)
+
+    rounds = 5 if n_symbols < 5_000 else 1
+    signals = benchmark(
+        f"strategy.generate_signals[{n_symbols}]",
+        lambda: strategy.generate_signals(stock_data, index_data()),
+        rounds=rounds,
+    )
+    assert signals
+
+
+@pytest.mark.parametrize("n_symbols", [100, 1_000, 5_000])
+def test_generate_panel_signals(benchmark, n_symbols):
+    strategy = MomentumStrategy(StrategyParameters())
+    stock_data = universe(n_symbols)
+
+    def run():
+        panel = PricePanel.from_stock_data(stock_data)
+        return strategy.select_signals(
+            strategy.generate_panel_signals(panel, index_data())
+        )
+
+    signals = benchmark(f"strategy.generate_panel_signals[{n_symbols}]", run)
+    assert signals
@@ -0,0 +1,34 @@
+import pytest
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--run-benchmarks",
+        action="store_true",
+        help="Run the performance benchmarks in tests/benchmarks",
+    )
+    group.addoption(
+        "--update-benchmark-baselines",
+        action="store_true",
+        help="Record the measured timings as the new benchmark baselines",
+    )
+    group.addoption(
+        "--benchmark-tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed slowdown over a baseline before a benchmark fails (0.5 = 50%%)",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks only run with --run-benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: performance benchmark")
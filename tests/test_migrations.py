@@ -0,0 +1,145 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    inspect,
+    text,
+)
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.portfolio_state.repository.database import DatabaseRepository
+from app.schema import import_models
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def alembic_config(url: str) -> Config:
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    return config
+
+
+def create_baseline_schema(url: str) -> None:
+    """The tables as the models created them before any migration existed."""
+    metadata = MetaData()
+    Table(
+        "stock_data",
+        metadata,
+        Column("id", BigInteger, primary_key=True, index=True),
+        Column("symbol", String, index=True),
+        Column("date", Date, index=True),
+        Column("open", Float),
+        Column("high", Float),
+        Column("low", Float),
+        Column("close", Float),
+        Column("volume", BigInteger),
+    )
+    Table(
+        "portfolio_state_data",
+        metadata,
+        Column("id", BigInteger, primary_key=True, index=True),
+        Column("date", Date, index=True),
+        Column("timestamp", DateTime, index=True),
+        Column("positions", JSON),
+        Column("cash_balance", Float),
+        Column("total_value", Float),
+    )
+    metadata.create_all(create_engine(url))
+
+
+def test_upgrade_keys_stock_data_and_drops_duplicates(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrate.db'}"
+    config = alembic_config(url)
+
+    command.upgrade(config, "0001")
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO stock_data (symbol, date, close) VALUES "
+                "('AAPL', '2024-01-02', 1.0), ('AAPL', '2024-01-02', 2.0)"
+            )
+        )
+
+    command.upgrade(config, "head")
+    assert inspect(engine).get_pk_constraint("stock_data")["constrained_columns"] == [
+        "symbol",
+        "interval",
+        "date",
+    ]
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT symbol, interval, close FROM stock_data"))
+        assert rows.all() == [("AAPL", "1d", 2.0)]
+    assert "signal_rankings" in inspect(engine).get_table_names()
+
+    command.downgrade(config, "0001")
+
+
+def test_upgrade_moves_baseline_json_positions_into_rows(tmp_path):
+    url = f"sqlite:///{tmp_path / 'baseline.db'}"
+    create_baseline_schema(url)
+    engine = create_engine(url)
+    positions = [
+        {"symbol": "MSFT", "quantity": 2.0, "price": 100.0, "value": 200.0},
+        {"symbol": "AAPL", "quantity": 1.0, "price": 50.0, "value": 50.0},
+    ]
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO portfolio_state_data "
+                "(id, date, timestamp, positions, cash_balance, total_value) VALUES "
+                "(1, '2023-06-01', '2023-06-01 16:00:00', :empty, 1000, 1000), "
+                "(2, '2023-06-02', '2023-06-02 16:00:00', :positions, 750, 1000)"
+            ),
+            {"empty": "[]", "positions": json.dumps(positions)},
+        )
+
+    command.upgrade(alembic_config(url), "head")
+
+    columns = {c["name"] for c in inspect(engine).get_columns("portfolio_state_data")}
+    assert "portfolio_id" in columns
+    assert "positions" not in columns
+    session = sessionmaker(bind=engine)()
+    latest = asyncio.run(DatabaseRepository(session).get_latest_portfolio_state())
+    session.close()
+    assert latest.portfolio_id == "default"
+    assert latest.date.isoformat() == "2023-06-02"
+    assert [(p.symbol, p.quantity, p.value) for p in latest.positions] == [
+        ("AAPL", 1.0, 50.0),
+        ("MSFT", 2.0, 200.0),
+    ]
+
+
+def test_baseline_database_upgrades_to_current_models(tmp_path):
+    url = f"sqlite:///{tmp_path / 'baseline.db'}"
+    create_baseline_schema(url)
+
+    command.upgrade(alembic_config(url), "head")
+
+    import_models()
+    inspector = inspect(create_engine(url))
+    for table in Base.metadata.sorted_tables:
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        assert columns == set(table.columns.keys()), table.name
+        primary_key = inspector.get_pk_constraint(table.name)["constrained_columns"]
+        assert primary_key == [c.name for c in table.primary_key], table.name
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ("sklearn", "yfinance", "pandas", "scipy")
+
+
+def test_importing_the_app_skips_heavy_dependencies():
+    script = (
+        "import sys, main; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_startup_does_not_create_the_schema(monkeypatch):
+    import main
+
+    calls = []
+    monkeypatch.setattr(main, "create_schema", lambda: calls.append(True))
+    from fastapi.testclient import TestClient
+
+    with TestClient(main.app):
+        pass
+    assert calls == []
+
+
+if __name__ == "__main__":
+    pytest.main()